@@ -9,6 +9,8 @@ import time
 from typing import Dict, List, Tuple, Any, Optional
 import numpy as np
 from agents.base_agent import BaseAgent
+from utils.grid_pathfinding import get_pathfinder
+from utils.sokoban_analysis import get_dead_squares
 
 
 class LLMBot(BaseAgent):
@@ -527,6 +529,7 @@ class AdvancedSokobanAI(BaseAgent):
             valid_actions = self._get_valid_actions(observation, env)
             if not valid_actions:
                 return None
+            valid_actions = self._filter_dead_square_pushes(observation, valid_actions)
             
             if self.strategy == 'hybrid':
                 return self._hybrid_decision(observation, env, valid_actions)
@@ -730,6 +733,26 @@ class AdvancedSokobanAI(BaseAgent):
         else:
             return ['UP', 'DOWN', 'LEFT', 'RIGHT']
     
+    def _filter_dead_square_pushes(self, observation: Dict[str, Any], valid_actions: List[str]) -> List[str]:
+        """剔除会把箱子推进死格的动作（全部被剔除时保留原动作）"""
+        player_pos = self._get_player_position(observation)
+        if not player_pos:
+            return valid_actions
+        
+        state_info = self._analyze_game_state(observation)
+        boxes = set(state_info['boxes'])
+        dead_squares = get_dead_squares(observation['board'], state_info['targets'])
+        directions = {'UP': (-1, 0), 'DOWN': (1, 0), 'LEFT': (0, -1), 'RIGHT': (0, 1)}
+        
+        safe_actions = []
+        for action in valid_actions:
+            dr, dc = directions.get(action, (0, 0))
+            box_pos = (player_pos[0] + dr, player_pos[1] + dc)
+            if box_pos in boxes and (box_pos[0] + dr, box_pos[1] + dc) in dead_squares:
+                continue
+            safe_actions.append(action)
+        return safe_actions or valid_actions
+    
     def _get_player_position(self, observation: Dict[str, Any]) -> Optional[Tuple[int, int]]:
         """获取玩家位置"""
         if self.player_id == 1:
@@ -908,7 +931,19 @@ class AdvancedSokobanAI(BaseAgent):
         best_position = max(valuable_positions, key=lambda x: x[1] - x[2] * 0.1)
         target_pos = best_position[0]
         
-        # 朝目标位置移动
+        # 沿绕开墙和箱子的最短路径移动
+        height, width = board.shape
+        blocked = bytearray((board == 1).astype(np.uint8).tobytes())
+        for box_row, box_col in boxes:
+            blocked[box_row * width + box_col] = 1
+        path = get_pathfinder(height, width).bfs(blocked, tuple(player_pos), tuple(target_pos))
+        if len(path) > 1:
+            step = (path[1][0] - player_pos[0], path[1][1] - player_pos[1])
+            for action, delta in directions.items():
+                if delta == step and action in valid_actions:
+                    return action
+        
+        # 不可达时朝目标位置贪心移动
         best_action = None
         min_distance = float('inf')
         
@@ -928,14 +963,11 @@ class AdvancedSokobanAI(BaseAgent):
     def _causes_deadlock(self, box_pos: Tuple[int, int], boxes: List[Tuple[int, int]], 
                         targets: List[Tuple[int, int]], board: np.ndarray) -> bool:
         """检查推动是否会导致死锁"""
-        row, col = box_pos
-        
-        # 基本死锁检测：角落死锁
-        if self._is_corner_deadlock(box_pos, board, targets):
-            return True
+        if box_pos in targets:
+            return False
         
-        # 墙边死锁检测
-        if self._is_wall_deadlock(box_pos, board, targets):
+        # 死格检测：角落、没有目标的墙边等（关卡静态分析，同一关卡只计算一次）
+        if box_pos in get_dead_squares(board, targets):
             return True
         
         # 多箱子死锁检测
@@ -944,64 +976,6 @@ class AdvancedSokobanAI(BaseAgent):
         
         return False
     
-    def _is_corner_deadlock(self, pos: Tuple[int, int], board: np.ndarray, targets: List[Tuple[int, int]]) -> bool:
-        """检查角落死锁"""
-        if pos in targets:
-            return False  # 在目标位置不算死锁
-        
-        row, col = pos
-        # 检查四个角落情况
-        corners = [
-            (row - 1, col - 1), (row - 1, col + 1),  # 上左, 上右
-            (row + 1, col - 1), (row + 1, col + 1)   # 下左, 下右
-        ]
-        
-        for corner_row, corner_col in corners:
-            # 检查是否被两面墙围住
-            wall_top = row - 1 < 0 or board[row - 1, col] == 1
-            wall_bottom = row + 1 >= board.shape[0] or board[row + 1, col] == 1
-            wall_left = col - 1 < 0 or board[row, col - 1] == 1
-            wall_right = col + 1 >= board.shape[1] or board[row, col + 1] == 1
-            
-            if (wall_top and wall_left) or (wall_top and wall_right) or \
-               (wall_bottom and wall_left) or (wall_bottom and wall_right):
-                return True
-        
-        return False
-    
-    def _is_wall_deadlock(self, pos: Tuple[int, int], board: np.ndarray, targets: List[Tuple[int, int]]) -> bool:
-        """检查墙边死锁"""
-        if pos in targets:
-            return False
-        
-        row, col = pos
-        
-        # 检查是否贴着墙且在该方向上没有目标
-        directions = [(0, 1), (0, -1), (1, 0), (-1, 0)]
-        
-        for dr, dc in directions:
-            wall_row, wall_col = row + dr, col + dc
-            
-            # 如果这个方向是墙
-            if (wall_row < 0 or wall_row >= board.shape[0] or 
-                wall_col < 0 or wall_col >= board.shape[1] or 
-                board[wall_row, wall_col] == 1):
-                
-                # 检查沿着墙的方向是否有目标
-                perpendicular_dirs = [(dc, dr), (-dc, -dr)] if dr == 0 else [(dr, dc), (-dr, -dc)]
-                
-                has_target_along_wall = False
-                for perp_dr, perp_dc in perpendicular_dirs:
-                    check_pos = (row + perp_dr, col + perp_dc)
-                    if check_pos in targets:
-                        has_target_along_wall = True
-                        break
-                
-                if not has_target_along_wall:
-                    return True
-        
-        return False
-    
     def _is_multi_box_deadlock(self, pos: Tuple[int, int], boxes: List[Tuple[int, int]], 
                               board: np.ndarray, targets: List[Tuple[int, int]]) -> bool:
         """检查多箱子死锁（简化版）"""
@@ -10,6 +10,7 @@ from typing import Dict, List, Tuple, Any, Optional
 from agents.base_agent import BaseAgent
 import config
 import copy
+from collections import deque
 
 
 class MCTSNode:
@@ -105,16 +106,188 @@ class MCTSNode:
         return self.total_value / self.visits
 
 
+class GomokuMCTSNode:
+    """五子棋MCTS节点（轻量版，不保存棋盘副本）"""
+    
+    __slots__ = ('move', 'parent', 'player', 'children', 'candidates',
+                 'visits', 'wins', 'rave_visits', 'rave_wins', 'terminal', 'winner')
+    
+    def __init__(self, move=None, parent=None, player=0):
+        self.move = move  # 到达此节点的落子（扁平索引）
+        self.parent = parent
+        self.player = player  # 下出move的玩家
+        self.children = []
+        self.candidates = None  # 按先验排序的候选落子，首次访问时生成
+        self.visits = 0
+        self.wins = 0.0  # 以player视角统计的胜场
+        self.rave_visits = 0
+        self.rave_wins = 0.0
+        self.terminal = False
+        self.winner = None
+    
+    def rave_value(self, exploration_weight, rave_equivalence, log_parent_visits):
+        """RAVE混合的UCT值"""
+        q = self.wins / self.visits
+        if self.rave_visits:
+            beta = math.sqrt(rave_equivalence / (3 * self.visits + rave_equivalence))
+            q = (1 - beta) * q + beta * (self.rave_wins / self.rave_visits)
+        return q + exploration_weight * math.sqrt(log_parent_visits / self.visits)
+
+
+class SnakeJointState:
+    """
+    双人贪吃蛇的紧凑搜索状态
+    
+    格子用扁平下标表示，蛇身为deque，占用网格为bytearray。一次step同时给出两条蛇的动作，
+    按真实对局的行动顺序依次移动（先手撞死时对局立即结束，后手不再移动），
+    因此一层联合动作对应真实对局的两步。搜索中被吃掉的食物不再刷新。
+    """
+    
+    __slots__ = ('size', 'grid', 'bodies', 'foods', 'directions', 'alive', 'move_count', 'order')
+    
+    DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+    
+    @classmethod
+    def from_game(cls, game) -> 'SnakeJointState':
+        """从SnakeGame构建，行动顺序从当前玩家开始"""
+        state = cls.__new__(cls)
+        size = game.board_size
+        state.size = size
+        state.grid = bytearray(size * size)
+        state.bodies = [None]
+        for snake in (game.snake1, game.snake2):
+            body = deque(x * size + y for x, y in snake)
+            for index in body:
+                state.grid[index] = 1
+            state.bodies.append(body)
+        state.foods = {x * size + y for x, y in game.foods}
+        state.directions = [None, game.direction1, game.direction2]
+        state.alive = [None, game.alive1, game.alive2]
+        state.move_count = game.move_count
+        state.order = (game.current_player, 3 - game.current_player)
+        return state
+    
+    def copy(self) -> 'SnakeJointState':
+        state = SnakeJointState.__new__(SnakeJointState)
+        state.size = self.size
+        state.grid = self.grid[:]
+        state.bodies = [None, self.bodies[1].copy(), self.bodies[2].copy()]
+        state.foods = self.foods.copy()
+        state.directions = self.directions[:]
+        state.alive = self.alive[:]
+        state.move_count = self.move_count
+        state.order = self.order
+        return state
+    
+    def legal_actions(self, player: int) -> List[Tuple[int, int]]:
+        """与SnakeGame.get_valid_actions一致：开局前两步任意方向，之后不能反向"""
+        move_count = self.move_count + (0 if player == self.order[0] else 1)
+        if move_count < 2:
+            return list(self.DIRECTIONS)
+        direction = self.directions[player]
+        reverse = (-direction[0], -direction[1])
+        return [action for action in self.DIRECTIONS if action != reverse]
+    
+    def is_terminal(self) -> bool:
+        return not (self.alive[1] and self.alive[2])
+    
+    def get_winner(self) -> Optional[int]:
+        if self.alive[1] and not self.alive[2]:
+            return 1
+        if self.alive[2] and not self.alive[1]:
+            return 2
+        return None
+    
+    def step(self, action1: Tuple[int, int], action2: Tuple[int, int]):
+        """两条蛇同时提交动作，按行动顺序结算"""
+        actions = (None, action1, action2)
+        for player in self.order:
+            self._move(player, actions[player])
+            self.move_count += 1
+            if not self.alive[player]:
+                break
+    
+    def _move(self, player: int, direction: Tuple[int, int]):
+        """与SnakeGame._move_snake相同的规则（尾部尚未移开时同样算碰撞）"""
+        self.directions[player] = direction
+        body = self.bodies[player]
+        size = self.size
+        x, y = divmod(body[0], size)
+        x += direction[0]
+        y += direction[1]
+        index = x * size + y
+        if x < 0 or x >= size or y < 0 or y >= size or self.grid[index]:
+            self.alive[player] = False
+            return
+        
+        body.appendleft(index)
+        self.grid[index] = 1
+        if index in self.foods:
+            self.foods.discard(index)
+        else:
+            self.grid[body.pop()] = 0
+    
+    def is_safe(self, player: int, direction: Tuple[int, int]) -> bool:
+        """一步内不会撞墙或撞蛇"""
+        size = self.size
+        x, y = divmod(self.bodies[player][0], size)
+        x += direction[0]
+        y += direction[1]
+        return 0 <= x < size and 0 <= y < size and not self.grid[x * size + y]
+
+
+class SnakeJointNode:
+    """解耦UCT节点：两名玩家各自保存按自己动作统计的访问次数和价值"""
+    
+    __slots__ = ('state', 'terminal', 'actions', 'visits', 'action_visits', 'action_values', 'children')
+    
+    def __init__(self, state: SnakeJointState):
+        self.state = state
+        self.terminal = state.is_terminal()
+        self.actions = [None, state.legal_actions(1), state.legal_actions(2)]
+        self.visits = 0
+        self.action_visits = [None, [0] * len(self.actions[1]), [0] * len(self.actions[2])]
+        self.action_values = [None, [0.0] * len(self.actions[1]), [0.0] * len(self.actions[2])]
+        self.children = {}  # (动作下标1, 动作下标2) -> 子节点
+
+
 class MCTSBot(BaseAgent):
     """MCTS Bot"""
     
     def __init__(self, name: str = "MCTSBot", player_id: int = 1, 
-                 simulation_count: int = 1000, timeout: float = 5.0):
+                 simulation_count: int = 1000, timeout: float = 5.0,
+                 gomoku_mode: Optional[bool] = None, candidate_radius: int = 2,
+                 rave_equivalence: float = 300.0, widening_base: float = 2.0,
+                 widening_exponent: float = 0.5, rollout_depth: int = 60,
+                 early_stop: bool = True, confidence_stop: Optional[float] = None,
+                 early_stop_check_interval: int = 32, simultaneous_mode: Optional[bool] = None,
+                 joint_rollout_depth: int = 25):
         super().__init__(name, player_id)
         self.simulation_count = simulation_count
         self.timeout = timeout
         self.exploration_weight = math.sqrt(2)
         
+        # 五子棋模式参数（None表示根据游戏类型自动判断）
+        self.gomoku_mode = gomoku_mode
+        self.candidate_radius = candidate_radius  # 只扩展离已有棋子该距离内的空位
+        self.rave_equivalence = rave_equivalence  # RAVE权重衰减常数
+        self.widening_base = widening_base  # 渐进展开: 允许子节点数 = base * visits^exponent
+        self.widening_exponent = widening_exponent
+        self.rollout_depth = rollout_depth
+        self.gomoku_exploration_weight = 0.4
+        self._gomoku_tables = {}  # (board_size, win_length) -> 预计算的邻域/射线表
+        
+        # 贪吃蛇同时行动模式（解耦UCT，None表示根据游戏类型自动判断）
+        self.simultaneous_mode = simultaneous_mode
+        self.joint_rollout_depth = joint_rollout_depth  # 每层联合动作相当于交替模式的两步
+        
+        # 提前终止参数
+        self.early_stop = early_stop  # 领先者访问次数优势超过剩余模拟数时停止
+        self.confidence_stop = confidence_stop  # 置信界停止的z值，None表示关闭
+        self.early_stop_check_interval = early_stop_check_interval
+        self.last_search_stats = {}
+        self.total_simulations_saved = 0
+        
         # 从配置获取参数
         try:
             ai_config = config.AI_CONFIGS.get('mcts', {})
@@ -145,13 +318,26 @@ class MCTSBot(BaseAgent):
         if len(valid_actions) == 1:
             return valid_actions[0]
         
+        if self._use_gomoku_mode(env.game):
+            return self._gomoku_get_action(env, start_time)
+        
+        if self._use_simultaneous_mode(env.game):
+            return self._simultaneous_get_action(env, valid_actions, start_time)
+        
         # 创建根节点
         root = MCTSNode(env.game.clone(), player_id=self.player_id)
         
         simulations = 0
         
+        stop_reason = None
+        
         # MCTS主循环
         while simulations < self.simulation_count and time.time() - start_time < self.timeout:
+            if simulations and simulations % self.early_stop_check_interval == 0:
+                stop_reason = self._check_early_stop(self._root_child_stats(root), simulations, start_time)
+                if stop_reason:
+                    break
+            
             # 1. 选择 (Selection)
             node = self._select(root)
             
@@ -176,10 +362,12 @@ class MCTSBot(BaseAgent):
         best_action = max(root.children.keys(), 
                          key=lambda action: root.children[action].visits)
         
-        print(f"MCTSBot: {simulations} simulations in {time.time() - start_time:.3f}s")
-        
         # 更新统计
         move_time = time.time() - start_time
+        saved = self._record_search_stats(simulations, move_time, stop_reason)
+        print(f"MCTSBot: {simulations} simulations in {move_time:.3f}s"
+              + (f" (early stop: {stop_reason}, saved ~{saved})" if stop_reason else ""))
+        
         self.total_moves += 1
         self.total_time += move_time
         
@@ -391,9 +579,476 @@ class MCTSBot(BaseAgent):
                 node.update(value)
             node = node.parent
     
+    # ------------------------------------------------------------------
+    # 五子棋模式：候选裁剪 + RAVE + 渐进展开
+    # ------------------------------------------------------------------
+    
+    def _use_gomoku_mode(self, game) -> bool:
+        """判断是否使用五子棋专用搜索"""
+        if self.gomoku_mode is not None:
+            return self.gomoku_mode
+        return hasattr(game, 'win_length') and hasattr(game, 'board')
+    
+    def _get_gomoku_tables(self, board_size: int, win_length: int):
+        """获取（并缓存）棋盘的邻域表和四方向射线表"""
+        key = (board_size, win_length)
+        tables = self._gomoku_tables.get(key)
+        if tables is not None:
+            return tables
+        
+        radius = self.candidate_radius
+        directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
+        near = []  # 候选邻域（切比雪夫距离 <= candidate_radius）
+        adjacent = []  # 模拟用的8邻域
+        rays = []  # 每个格子四个方向的 (正向, 反向) 射线
+        for r in range(board_size):
+            for c in range(board_size):
+                cells_near = []
+                cells_adjacent = []
+                for dr in range(-radius, radius + 1):
+                    for dc in range(-radius, radius + 1):
+                        if dr == 0 and dc == 0:
+                            continue
+                        nr, nc = r + dr, c + dc
+                        if 0 <= nr < board_size and 0 <= nc < board_size:
+                            cells_near.append(nr * board_size + nc)
+                            if abs(dr) <= 1 and abs(dc) <= 1:
+                                cells_adjacent.append(nr * board_size + nc)
+                near.append(cells_near)
+                adjacent.append(cells_adjacent)
+                
+                cell_rays = []
+                for dr, dc in directions:
+                    forward, backward = [], []
+                    for k in range(1, win_length):
+                        nr, nc = r + dr * k, c + dc * k
+                        if not (0 <= nr < board_size and 0 <= nc < board_size):
+                            break
+                        forward.append(nr * board_size + nc)
+                    for k in range(1, win_length):
+                        nr, nc = r - dr * k, c - dc * k
+                        if not (0 <= nr < board_size and 0 <= nc < board_size):
+                            break
+                        backward.append(nr * board_size + nc)
+                    cell_rays.append((forward, backward))
+                rays.append(cell_rays)
+        
+        tables = (near, adjacent, rays)
+        self._gomoku_tables[key] = tables
+        return tables
+    
+    @staticmethod
+    def _gomoku_is_win(cells, index, player, rays, win_length) -> bool:
+        """检查在index落子后player是否连成win_length"""
+        for forward, backward in rays[index]:
+            count = 1
+            for j in forward:
+                if cells[j] != player:
+                    break
+                count += 1
+            for j in backward:
+                if cells[j] != player:
+                    break
+                count += 1
+            if count >= win_length:
+                return True
+        return False
+    
+    def _gomoku_pattern_prior(self, cells, index, player, rays, win_length) -> float:
+        """廉价的模式先验：统计落子后四个方向上双方的连子长度和开放端"""
+        opponent = 3 - player
+        score = 0.0
+        for forward, backward in rays[index]:
+            for who, weight in ((player, 1.0), (opponent, 0.9)):
+                count = 1
+                open_ends = 0
+                for ray in (forward, backward):
+                    for j in ray:
+                        value = cells[j]
+                        if value == who:
+                            count += 1
+                        else:
+                            if value == 0:
+                                open_ends += 1
+                            break
+                if count >= win_length:
+                    score += weight * 1000000
+                elif count > 1:
+                    score += weight * (10 ** (count - 1)) * (open_ends + 1)
+        return score
+    
+    def _gomoku_candidates(self, cells, player, tables, board_size, win_length):
+        """生成已有棋子附近的空位，并按模式先验降序排列"""
+        near, _, rays = tables
+        seen = set()
+        for index, value in enumerate(cells):
+            if value:
+                for j in near[index]:
+                    if not cells[j]:
+                        seen.add(j)
+        if not seen:
+            center = board_size // 2
+            return [center * board_size + center]
+        
+        scored = [(self._gomoku_pattern_prior(cells, j, player, rays, win_length), j) for j in seen]
+        scored.sort(reverse=True)
+        return [j for _, j in scored]
+    
+    def _gomoku_forced_move(self, cells, player, candidates, rays, win_length):
+        """直接获胜或必须封堵的落子"""
+        for j in candidates:
+            if self._gomoku_is_win(cells, j, player, rays, win_length):
+                return j
+        opponent = 3 - player
+        for j in candidates:
+            if self._gomoku_is_win(cells, j, opponent, rays, win_length):
+                return j
+        return None
+    
+    def _gomoku_get_action(self, env, start_time):
+        """五子棋专用MCTS搜索"""
+        game = env.game
+        board_size = game.board_size
+        win_length = game.win_length
+        tables = self._get_gomoku_tables(board_size, win_length)
+        rays = tables[2]
+        
+        root_cells = game.board.ravel().tolist()
+        root_player = game.current_player
+        empty_count = root_cells.count(0)
+        
+        root = GomokuMCTSNode(player=3 - root_player)
+        root.candidates = self._gomoku_candidates(root_cells, root_player, tables, board_size, win_length)
+        
+        forced = self._gomoku_forced_move(root_cells, root_player, root.candidates, rays, win_length)
+        if forced is not None:
+            move_time = time.time() - start_time
+            self._record_search_stats(0, move_time, 'forced_move')
+            self.total_moves += 1
+            self.total_time += move_time
+            return divmod(forced, board_size)
+        
+        simulations = 0
+        stop_reason = None
+        while simulations < self.simulation_count and time.time() - start_time < self.timeout:
+            if simulations and simulations % self.early_stop_check_interval == 0:
+                stop_reason = self._check_early_stop(self._gomoku_root_child_stats(root), simulations, start_time)
+                if stop_reason:
+                    break
+            self._gomoku_simulate(root, root_cells, empty_count, tables, board_size, win_length)
+            simulations += 1
+        
+        if not root.children:
+            best_index = root.candidates[0]
+        else:
+            best_index = max(root.children, key=lambda child: child.visits).move
+        
+        move_time = time.time() - start_time
+        saved = self._record_search_stats(simulations, move_time, stop_reason)
+        print(f"MCTSBot[gomoku]: {simulations} simulations in {move_time:.3f}s "
+              f"({simulations / max(move_time, 1e-9):.0f}/s)"
+              + (f", early stop: {stop_reason}, saved ~{saved}" if stop_reason else ""))
+        self.total_moves += 1
+        self.total_time += move_time
+        
+        return divmod(best_index, board_size)
+    
+    def _gomoku_simulate(self, root, root_cells, empty_count, tables, board_size, win_length):
+        """一次完整的选择-扩展-模拟-回传"""
+        _, adjacent, rays = tables
+        cells = root_cells[:]
+        node = root
+        played = []  # (index, player) 本次模拟中所有落子，用于AMAF
+        
+        # 选择与扩展
+        while not node.terminal:
+            to_move = 3 - node.player
+            if node.candidates is None:
+                node.candidates = self._gomoku_candidates(cells, to_move, tables, board_size, win_length)
+            
+            allowed = int(self.widening_base * (node.visits + 1) ** self.widening_exponent)
+            if len(node.children) < min(allowed, len(node.candidates)):
+                index = node.candidates[len(node.children)]
+                child = GomokuMCTSNode(index, node, to_move)
+                node.children.append(child)
+                cells[index] = to_move
+                played.append((index, to_move))
+                if self._gomoku_is_win(cells, index, to_move, rays, win_length):
+                    child.terminal = True
+                    child.winner = to_move
+                elif empty_count - len(played) <= 0:
+                    child.terminal = True
+                    child.winner = 0
+                node = child
+                break
+            
+            log_visits = math.log(node.visits)
+            node = max(node.children, key=lambda child: child.rave_value(
+                self.gomoku_exploration_weight, self.rave_equivalence, log_visits))
+            cells[node.move] = node.player
+            played.append((node.move, node.player))
+        
+        tree_moves = len(played)
+        
+        # 模拟：在已有棋子的8邻域内随机落子
+        if node.terminal:
+            winner = node.winner
+        else:
+            winner = self._gomoku_rollout(cells, 3 - node.player, played, adjacent, rays, win_length)
+        
+        # 回传（含RAVE/AMAF统计）
+        amaf = {}
+        for index, player in played[tree_moves:]:
+            amaf[index] = player
+        depth = tree_moves
+        while node is not None:
+            node.visits += 1
+            if winner == node.player:
+                node.wins += 1.0
+            elif winner == 0:
+                node.wins += 0.5
+            for child in node.children:
+                if amaf.get(child.move) == child.player:
+                    child.rave_visits += 1
+                    if winner == child.player:
+                        child.rave_wins += 1.0
+                    elif winner == 0:
+                        child.rave_wins += 0.5
+            if depth > 0:
+                depth -= 1
+                index, player = played[depth]
+                amaf[index] = player
+            node = node.parent
+    
+    def _gomoku_rollout(self, cells, to_move, played, adjacent, rays, win_length):
+        """随机模拟到终局或深度上限，返回获胜者（0表示平局/未分胜负）"""
+        in_pool = bytearray(len(cells))
+        pool = []
+        for index, value in enumerate(cells):
+            if value:
+                for j in adjacent[index]:
+                    if not cells[j] and not in_pool[j]:
+                        in_pool[j] = 1
+                        pool.append(j)
+        
+        player = to_move
+        for _ in range(self.rollout_depth):
+            if not pool:
+                break
+            k = random.randrange(len(pool))
+            index = pool[k]
+            pool[k] = pool[-1]
+            pool.pop()
+            cells[index] = player
+            played.append((index, player))
+            if self._gomoku_is_win(cells, index, player, rays, win_length):
+                return player
+            for j in adjacent[index]:
+                if not cells[j] and not in_pool[j]:
+                    in_pool[j] = 1
+                    pool.append(j)
+            player = 3 - player
+        return 0
+    
+    # ------------------------------------------------------------------
+    # 贪吃蛇同时行动模式：联合动作展开 + 解耦UCT
+    # ------------------------------------------------------------------
+    
+    def _use_simultaneous_mode(self, game) -> bool:
+        """判断是否使用贪吃蛇同时行动搜索"""
+        if self.simultaneous_mode is not None:
+            return self.simultaneous_mode
+        return hasattr(game, 'snake1') and hasattr(game, 'snake2')
+    
+    def _simultaneous_get_action(self, env, valid_actions, start_time):
+        """
+        解耦UCT搜索
+        
+        每个节点展开两条蛇的联合动作，两名玩家各自用UCB1在自己的动作上选择，
+        不依赖对方在同一层的选择；相同前瞻下树的深度只有交替模式的一半。
+        """
+        root = SnakeJointNode(SnakeJointState.from_game(env.game))
+        me = self.player_id
+        
+        simulations = 0
+        stop_reason = None
+        while simulations < self.simulation_count and time.time() - start_time < self.timeout:
+            if simulations and simulations % self.early_stop_check_interval == 0:
+                stats = [(visits, value / visits if visits else 0.0, 2.0)
+                         for visits, value in zip(root.action_visits[me], root.action_values[me])]
+                stop_reason = self._check_early_stop(stats, simulations, start_time)
+                if stop_reason:
+                    break
+            self._simultaneous_simulate(root)
+            simulations += 1
+        
+        best_index = max(range(len(root.actions[me])), key=lambda i: root.action_visits[me][i])
+        best_action = root.actions[me][best_index]
+        if best_action not in valid_actions:
+            best_action = random.choice(valid_actions)
+        
+        move_time = time.time() - start_time
+        saved = self._record_search_stats(simulations, move_time, stop_reason)
+        print(f"MCTSBot[simultaneous]: {simulations} simulations in {move_time:.3f}s"
+              + (f" (early stop: {stop_reason}, saved ~{saved})" if stop_reason else ""))
+        self.total_moves += 1
+        self.total_time += move_time
+        
+        return best_action
+    
+    def _simultaneous_select(self, node, player):
+        """某名玩家在节点上的UCB1选择（先尝试未访问的动作）"""
+        visits = node.action_visits[player]
+        unvisited = [i for i, count in enumerate(visits) if count == 0]
+        if unvisited:
+            return random.choice(unvisited)
+        
+        values = node.action_values[player]
+        log_visits = math.log(node.visits)
+        weight = self.exploration_weight
+        return max(range(len(visits)),
+                   key=lambda i: values[i] / visits[i] + weight * math.sqrt(log_visits / visits[i]))
+    
+    def _simultaneous_simulate(self, root):
+        """一次选择-扩展-模拟-回传，价值以两名玩家各自的视角回传"""
+        node = root
+        path = []
+        while not node.terminal:
+            i1 = self._simultaneous_select(node, 1)
+            i2 = self._simultaneous_select(node, 2)
+            path.append((node, i1, i2))
+            child = node.children.get((i1, i2))
+            if child is None:
+                state = node.state.copy()
+                state.step(node.actions[1][i1], node.actions[2][i2])
+                child = SnakeJointNode(state)
+                node.children[(i1, i2)] = child
+                node = child
+                break
+            node = child
+        
+        value1 = self._joint_rollout(node.state)
+        node.visits += 1
+        for parent, i1, i2 in path:
+            parent.visits += 1
+            parent.action_visits[1][i1] += 1
+            parent.action_values[1][i1] += value1
+            parent.action_visits[2][i2] += 1
+            parent.action_values[2][i2] -= value1
+    
+    def _joint_rollout(self, state):
+        """两条蛇同时随机模拟（优先安全且靠近食物的动作），返回玩家1视角的价值"""
+        if not state.is_terminal():
+            state = state.copy()
+            size = state.size
+            for _ in range(self.joint_rollout_depth):
+                actions = [None, None, None]
+                for player in (1, 2):
+                    legal = state.legal_actions(player)
+                    safe = [action for action in legal if state.is_safe(player, action)] or legal
+                    action = random.choice(safe)
+                    if state.foods and len(safe) > 1 and random.random() < 0.5:
+                        x, y = divmod(state.bodies[player][0], size)
+                        targets = [divmod(food, size) for food in state.foods]
+                        action = min(safe, key=lambda a: min(abs(x + a[0] - fx) + abs(y + a[1] - fy)
+                                                             for fx, fy in targets))
+                    actions[player] = action
+                state.step(actions[1], actions[2])
+                if state.is_terminal():
+                    break
+        
+        winner = state.get_winner()
+        if winner == 1:
+            return 1.0
+        if winner == 2:
+            return -1.0
+        if state.is_terminal():
+            return 0.0
+        length_diff = len(state.bodies[1]) - len(state.bodies[2])
+        return max(-1.0, min(1.0, length_diff * 0.1))
+    
+    # ------------------------------------------------------------------
+    # 提前终止
+    # ------------------------------------------------------------------
+    
+    def _root_child_stats(self, root):
+        """根节点各子节点的 (访问次数, 己方视角平均值, 取值范围)，未展开动作记为0访问"""
+        stats = []
+        for child in root.children.values():
+            mean = child.get_average_value()
+            # 回传时对手回合的节点存的是取反后的值，这里还原为己方视角
+            if getattr(child.game_state, 'current_player', self.player_id) != self.player_id:
+                mean = -mean
+            stats.append((child.visits, mean, 2.0))
+        stats.extend((0, 0.0, 2.0) for _ in root.untried_actions)
+        return stats
+    
+    def _gomoku_root_child_stats(self, root):
+        """五子棋根节点各子节点的统计，未展开候选记为0访问"""
+        stats = [(child.visits, child.wins / child.visits if child.visits else 0.0, 1.0)
+                 for child in root.children]
+        stats.extend((0, 0.0, 1.0) for _ in range(len(root.candidates) - len(root.children)))
+        return stats
+    
+    def _remaining_simulations(self, simulations, start_time):
+        """估计剩余预算内还能完成的模拟次数（次数上限与时间上限取较小者）"""
+        remaining = self.simulation_count - simulations
+        elapsed = time.time() - start_time
+        if elapsed > 0:
+            rate = simulations / elapsed
+            remaining = min(remaining, int(rate * max(0.0, self.timeout - elapsed)) + 1)
+        return remaining
+    
+    def _check_early_stop(self, stats, simulations, start_time):
+        """
+        检查是否可以提前终止搜索
+        
+        Returns:
+            终止原因（'visit_margin' 或 'confidence'），不能终止时返回None
+        """
+        if len(stats) < 2:
+            return None
+        
+        ranked = sorted(stats, key=lambda item: item[0], reverse=True)
+        leader_visits, leader_mean, value_range = ranked[0]
+        
+        # 1. 剩余模拟全部给第二名也无法反超
+        if self.early_stop:
+            remaining = self._remaining_simulations(simulations, start_time)
+            if leader_visits - ranked[1][0] > remaining:
+                return 'visit_margin'
+        
+        # 2. 领先者的置信下界高于其他所有动作的置信上界
+        if self.confidence_stop is not None and leader_visits > 0:
+            lower = leader_mean - self.confidence_stop * value_range / (2 * math.sqrt(leader_visits))
+            for visits, mean, _ in ranked[1:]:
+                if visits == 0 or mean + self.confidence_stop * value_range / (2 * math.sqrt(visits)) >= lower:
+                    return None
+            return 'confidence'
+        
+        return None
+    
+    def _record_search_stats(self, simulations, move_time, stop_reason):
+        """记录本步搜索统计，返回估计节省的模拟次数"""
+        saved = 0
+        if stop_reason:
+            rate = simulations / max(move_time, 1e-9)
+            saved = max(0, min(self.simulation_count - simulations,
+                               int(rate * max(0.0, self.timeout - move_time))))
+        self.total_simulations_saved += saved
+        self.last_search_stats = {
+            'simulations': simulations,
+            'time': move_time,
+            'stop_reason': stop_reason,
+            'simulations_saved': saved
+        }
+        return saved
+    
     def reset(self):
         """重置MCTS Bot"""
         super().reset()
+        self.last_search_stats = {}
+        self.total_simulations_saved = 0
     
     def get_info(self) -> Dict[str, Any]:
         """获取MCTS Bot信息"""
@@ -403,6 +1058,75 @@ class MCTSBot(BaseAgent):
             'description': '使用蒙特卡洛树搜索的Bot',
             'strategy': f'MCTS with {self.simulation_count} simulations',
             'timeout': self.timeout,
-            'exploration_weight': self.exploration_weight
+            'exploration_weight': self.exploration_weight,
+            'gomoku_mode': self.gomoku_mode,
+            'simultaneous_mode': self.simultaneous_mode,
+            'candidate_radius': self.candidate_radius,
+            'rave_equivalence': self.rave_equivalence,
+            'early_stop': self.early_stop,
+            'confidence_stop': self.confidence_stop,
+            'total_simulations_saved': self.total_simulations_saved,
+            'avg_simulations_saved': self.total_simulations_saved / max(1, self.total_moves)
         })
-        return info 
\ No newline at end of file
+        return info
+
+
+def benchmark_simultaneous_snake(num_games: int = 10, timeout: float = 0.2, board_size: int = 12,
+                                 max_moves: int = 200, seed: int = 0) -> Dict[str, Dict[str, int]]:
+    """
+    同等时间预算下，同时行动模式的MCTSBot对阵交替模式的MCTSBot和MinimaxBot
+    
+    Args:
+        num_games: 对每个对手的对局数（双方轮流先手）
+        timeout: 每步思考时间（秒）
+        board_size: 棋盘大小
+        max_moves: 单局步数上限，到达后按蛇长判定
+        seed: 随机种子
+    
+    Returns:
+        {对手名: {'win': 胜, 'draw': 平, 'loss': 负}}
+    """
+    import contextlib
+    import io
+    from games.snake import SnakeEnv
+    from agents.ai_bots.minimax_bot import MinimaxBot
+    
+    opponents = {
+        'MCTSBot(alternating)': lambda pid: MCTSBot(player_id=pid, simultaneous_mode=False),
+        'MinimaxBot': lambda pid: MinimaxBot(player_id=pid, max_depth=20)
+    }
+    results = {}
+    for name, make_opponent in opponents.items():
+        record = {'win': 0, 'draw': 0, 'loss': 0}
+        for game_index in range(num_games):
+            random.seed(seed + game_index)
+            me = 1 + game_index % 2
+            bots = {me: MCTSBot(player_id=me, simultaneous_mode=True), 3 - me: make_opponent(3 - me)}
+            for bot in bots.values():
+                bot.timeout = timeout
+                bot.simulation_count = 10 ** 9
+            
+            env = SnakeEnv(board_size=board_size, seed=seed + game_index)
+            observation, _ = env.reset()
+            with contextlib.redirect_stdout(io.StringIO()):
+                for _ in range(max_moves):
+                    action = bots[env.game.current_player].get_action(observation, env)
+                    observation, _, done, truncated, _ = env.step(action)
+                    if done or truncated:
+                        break
+            
+            game = env.game
+            winner = game.get_winner()
+            if winner is None and not game.is_terminal():
+                lengths = {1: len(game.snake1), 2: len(game.snake2)}
+                if lengths[1] != lengths[2]:
+                    winner = max(lengths, key=lengths.get)
+            if winner == me:
+                record['win'] += 1
+            elif winner is None:
+                record['draw'] += 1
+            else:
+                record['loss'] += 1
+        results[name] = record
+        print(f"同时行动MCTS vs {name}: {record['win']}胜 {record['draw']}平 {record['loss']}负")
+    return results
@@ -1,16 +1,17 @@
 from agents.base_agent import BaseAgent
+from utils.transposition_table import TranspositionTable
 import copy
 import time
 import math
 
 class MinimaxBot(BaseAgent):
-    def __init__(self, name="MinimaxBot", player_id=1, max_depth=3, timeout=5.0):
+    def __init__(self, name="MinimaxBot", player_id=1, max_depth=3, timeout=5.0, tt_size=1 << 16):
         super().__init__(name, player_id)
         self.max_depth = max_depth
         self.timeout = timeout  # 每步最大思考时间（秒）
         self.nodes_searched = 0
         self.start_time = 0
-        self.transposition_table = {}  # 状态缓存表
+        self.transposition_table = TranspositionTable(tt_size)  # 固定容量置换表，跨步保留
 
     def get_action(self, observation, env):
         valid_actions = env.get_valid_actions()
@@ -22,7 +23,8 @@ class MinimaxBot(BaseAgent):
             
         self.start_time = time.time()
         self.nodes_searched = 0
-        self.transposition_table.clear()  # 清空缓存
+        self.transposition_table.new_search()  # 旧条目仍可命中，但优先被替换
+        valid_actions = list(valid_actions)
         
         best_score = float('-inf')
         best_action = valid_actions[0]
@@ -57,41 +59,63 @@ class MinimaxBot(BaseAgent):
                     # 如果动作执行失败，给最低分
                     continue
             
-            # 如果这一层搜索完成，更新最佳选择
+            # 如果这一层搜索完成，更新最佳选择，下一层先搜索它
             if not self._is_timeout():
                 best_score = current_best_score
                 best_action = current_best_action
+                valid_actions.remove(best_action)
+                valid_actions.insert(0, best_action)
                 
         print(f"MinimaxBot searched {self.nodes_searched} nodes in {time.time() - self.start_time:.3f}s")
         return best_action
 
     def minimax_ab(self, game, depth, maximizing_player, alpha, beta):
-        """Alpha-Beta剪枝的Minimax算法"""
+        """Alpha-Beta剪枝的Minimax算法（置换表记录界标记）"""
         self.nodes_searched += 1
         
         # 超时检查
         if self._is_timeout():
             return self.evaluate_position(game)
             
-        # 游戏状态哈希（简单实现）
+        # 查置换表：深度足够时按界标记收窄窗口，并取出上次的最佳动作优先搜索
+        table = self.transposition_table
         state_key = self._get_state_hash(game)
-        if state_key in self.transposition_table and depth <= self.transposition_table[state_key]['depth']:
-            return self.transposition_table[state_key]['score']
+        alpha_orig, beta_orig = alpha, beta
+        tt_move = None
+        if state_key is not None:
+            entry = table.probe(state_key)
+            if entry is not None:
+                entry_depth, flag, value, tt_move = entry
+                if entry_depth >= depth:
+                    if flag == TranspositionTable.EXACT:
+                        return value
+                    elif flag == TranspositionTable.LOWER:
+                        alpha = max(alpha, value)
+                    else:
+                        beta = min(beta, value)
+                    if alpha >= beta:
+                        return value
             
         # 终止条件
         if depth == 0 or game.is_terminal():
             score = self.evaluate_position(game)
-            self.transposition_table[state_key] = {'score': score, 'depth': depth}
+            if state_key is not None:
+                table.store(state_key, depth, TranspositionTable.EXACT, score)
             return score
         
         valid_actions = game.get_valid_actions()
         if not valid_actions:
             score = self.evaluate_position(game)
-            self.transposition_table[state_key] = {'score': score, 'depth': depth}
+            if state_key is not None:
+                table.store(state_key, depth, TranspositionTable.EXACT, score)
             return score
             
+        if tt_move in valid_actions:
+            valid_actions = [tt_move] + [action for action in valid_actions if action != tt_move]
+        
+        best_move = None
         if maximizing_player:
-            max_eval = float('-inf')
+            best_eval = float('-inf')
             for action in valid_actions:
                 if self._is_timeout():
                     break
@@ -100,7 +124,9 @@ class MinimaxBot(BaseAgent):
                     game_copy = game.clone()
                     game_copy.step(action)
                     eval_score = self.minimax_ab(game_copy, depth - 1, False, alpha, beta)
-                    max_eval = max(max_eval, eval_score)
+                    if eval_score > best_eval:
+                        best_eval = eval_score
+                        best_move = action
                     alpha = max(alpha, eval_score)
                     
                     # Alpha-beta剪枝
@@ -108,11 +134,8 @@ class MinimaxBot(BaseAgent):
                         break
                 except:
                     continue
-                    
-            self.transposition_table[state_key] = {'score': max_eval, 'depth': depth}
-            return max_eval
         else:
-            min_eval = float('inf')
+            best_eval = float('inf')
             for action in valid_actions:
                 if self._is_timeout():
                     break
@@ -121,7 +144,9 @@ class MinimaxBot(BaseAgent):
                     game_copy = game.clone()
                     game_copy.step(action)
                     eval_score = self.minimax_ab(game_copy, depth - 1, True, alpha, beta)
-                    min_eval = min(min_eval, eval_score)
+                    if eval_score < best_eval:
+                        best_eval = eval_score
+                        best_move = action
                     beta = min(beta, eval_score)
                     
                     # Alpha-beta剪枝
@@ -130,8 +155,16 @@ class MinimaxBot(BaseAgent):
                 except:
                     continue
                     
-            self.transposition_table[state_key] = {'score': min_eval, 'depth': depth}
-            return min_eval
+        # 超时中断的结果不完整，不写入置换表
+        if state_key is not None and best_move is not None and not self._is_timeout():
+            if best_eval <= alpha_orig:
+                flag = TranspositionTable.UPPER
+            elif best_eval >= beta_orig:
+                flag = TranspositionTable.LOWER
+            else:
+                flag = TranspositionTable.EXACT
+            table.store(state_key, depth, flag, best_eval, best_move)
+        return best_eval
 
     def evaluate_position(self, game):
         """改进的位置评估函数"""
@@ -277,16 +310,24 @@ class MinimaxBot(BaseAgent):
         return danger
 
     def _get_state_hash(self, game):
-        """生成游戏状态的简单哈希值"""
+        """
+        生成游戏状态的哈希值
+        
+        游戏维护了Zobrist局面哈希（如SnakeGame.state_hash）时直接使用（O(1)），
+        否则退回到基于状态字符串的哈希；无法生成时返回None（不使用置换表）。
+        """
+        state_hash = getattr(game, 'state_hash', None)
+        if state_hash is not None:
+            return state_hash
         try:
             state = game.get_state()
             # 简单的状态哈希：基于蛇的位置和当前玩家
             snake1_str = str(sorted(state['snake1'])) if state['snake1'] else "[]"
             snake2_str = str(sorted(state['snake2'])) if state['snake2'] else "[]"
             foods_str = str(sorted(state['foods'])) if state['foods'] else "[]"
-            return f"{snake1_str}_{snake2_str}_{foods_str}_{state['current_player']}"
+            return hash(f"{snake1_str}_{snake2_str}_{foods_str}_{state['current_player']}") & 0xFFFFFFFFFFFFFFFF
         except:
-            return str(time.time())  # 如果哈希失败，使用时间戳
+            return None
 
     def _is_timeout(self):
         """检查是否超时"""
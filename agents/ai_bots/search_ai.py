@@ -5,31 +5,34 @@
 """
 
 import random
-import heapq
 import numpy as np
 from typing import List, Tuple, Optional, Dict, Set, Any
-from collections import deque
 from agents.base_agent import BaseAgent
+from utils.path_cache import PathCache, shared_path_cache
+from utils.grid_pathfinding import get_pathfinder
+from utils.sokoban_analysis import get_dead_squares
 
 
 class SearchAI(BaseAgent):
     """通用搜索算法AI智能体"""
     
-    def __init__(self, name="SearchAI", player_id=1, search_algorithm="bfs", max_depth=10):
+    def __init__(self, name="SearchAI", player_id=1, search_algorithm="bfs", max_depth=10,
+                 path_cache: Optional[PathCache] = None):
         """
         初始化搜索AI
         
         Args:
             name: AI名称
             player_id: 玩家ID
-            search_algorithm: 搜索算法类型 ("bfs", "dfs", "astar", "dijkstra")
+            search_algorithm: 搜索算法类型 ("bfs", "dfs", "astar", "jps", "bidirectional", "dijkstra")
             max_depth: 最大搜索深度
+            path_cache: 路径缓存，默认使用进程内共享的有界LRU缓存
         """
         super().__init__(name, player_id)
         self.search_algorithm = search_algorithm.lower()
         self.max_depth = max_depth
         self.visited_positions = set()
-        self.path_cache = {}  # 路径缓存
+        self.path_cache = path_cache if path_cache is not None else shared_path_cache  # 有界LRU路径缓存
         
     def get_action(self, observation, env):
         """获取动作"""
@@ -94,15 +97,30 @@ class SearchAI(BaseAgent):
             # 如果没有食物，随机选择一个目标位置
             food_pos = (game.board_size // 2, game.board_size // 2)
         
-        # 使用选定的搜索算法寻找到食物的最优路径
-        if self.search_algorithm == "astar":
-            path = self._astar_search_snake(my_head, food_pos, my_snake, enemy_snake, env)
-        elif self.search_algorithm == "bfs":
-            path = self._bfs_search_snake(my_head, food_pos, my_snake, enemy_snake, env)
-        elif self.search_algorithm == "dfs":
-            path = self._dfs_search_snake(my_head, food_pos, my_snake, enemy_snake, env)
-        else:
-            path = self._bfs_search_snake(my_head, food_pos, my_snake, enemy_snake, env)
+        # 使用选定的搜索算法寻找到食物的最优路径（先查共享路径缓存）
+        board_size = game.board_size
+        token = getattr(game, 'occupancy_hash', None)
+        cache_key = ('search_ai_' + self.search_algorithm, self.max_depth, board_size, food_pos)
+        hit = False
+        if token is not None:
+            hit, path = self.path_cache.lookup(
+                cache_key, my_head, token,
+                lambda pos: not self._is_valid_position_snake(pos, my_snake, enemy_snake, board_size))
+        
+        if not hit:
+            if self.search_algorithm == "astar":
+                path = self._astar_search_snake(my_head, food_pos, my_snake, enemy_snake, env)
+            elif self.search_algorithm == "bfs":
+                path = self._bfs_search_snake(my_head, food_pos, my_snake, enemy_snake, env)
+            elif self.search_algorithm == "dfs":
+                path = self._dfs_search_snake(my_head, food_pos, my_snake, enemy_snake, env)
+            elif self.search_algorithm in ("jps", "bidirectional"):
+                path = self._grid_search_snake(self.search_algorithm, my_head, food_pos,
+                                               my_snake, enemy_snake, env, self.max_depth)
+            else:
+                path = self._bfs_search_snake(my_head, food_pos, my_snake, enemy_snake, env)
+            if token is not None:
+                self.path_cache.store(cache_key, my_head, token, path)
         
         if path and len(path) > 1:
             next_pos = path[1]
@@ -134,6 +152,12 @@ class SearchAI(BaseAgent):
         if not boxes or not targets:
             return random.choice(valid_actions)
         
+        # 剔除会把箱子推进死格的动作（全部被剔除时保留原动作）
+        dead_squares = self._get_sokoban_dead_squares(observation, targets)
+        safe_actions = [action for action in valid_actions
+                        if not self._pushes_into_dead_square(action, player_pos, boxes, targets, dead_squares)]
+        valid_actions = safe_actions or valid_actions
+        
         # 使用多层搜索策略
         best_action = self._multi_layer_sokoban_search(
             player_pos, boxes, targets, observation, env, valid_actions
@@ -200,6 +224,7 @@ class SearchAI(BaseAgent):
         
         best_action = None
         best_improvement = 0
+        dead_squares = self._get_sokoban_dead_squares(observation, targets)
         
         for action in valid_actions:
             if action not in directions:
@@ -208,11 +233,12 @@ class SearchAI(BaseAgent):
             dr, dc = directions[action]
             adjacent_pos = (player_pos[0] + dr, player_pos[1] + dc)
             
-            # 如果可以推箱子
+            # 如果可以推箱子（不推进死格）
             if adjacent_pos in boxes:
                 box_new_pos = (adjacent_pos[0] + dr, adjacent_pos[1] + dc)
                 
-                if self._is_valid_sokoban_position(box_new_pos, observation, boxes):
+                if (box_new_pos not in dead_squares and
+                    self._is_valid_sokoban_position(box_new_pos, observation, boxes)):
                     # 计算推动的价值改善
                     improvement = self._calculate_push_improvement(
                         adjacent_pos, box_new_pos, boxes, targets
@@ -236,14 +262,16 @@ class SearchAI(BaseAgent):
         # 找到所有可推动的箱子位置
         valuable_positions = []
         incomplete_boxes = [box for box in boxes if box not in targets]
+        dead_squares = self._get_sokoban_dead_squares(observation, targets)
         
         for box in incomplete_boxes:
             for dr, dc in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
                 push_from_pos = (box[0] - dr, box[1] - dc)  # 玩家推动位置
                 push_to_pos = (box[0] + dr, box[1] + dc)    # 箱子目标位置
                 
-                # 检查推动的有效性和价值
-                if (self._is_valid_sokoban_position(push_from_pos, observation, boxes) and
+                # 检查推动的有效性和价值（推进死格的不考虑）
+                if (push_to_pos not in dead_squares and
+                    self._is_valid_sokoban_position(push_from_pos, observation, boxes) and
                     self._is_valid_sokoban_position(push_to_pos, observation, boxes)):
                     
                     value = self._evaluate_push_position_value(box, push_to_pos, targets, boxes)
@@ -257,7 +285,20 @@ class SearchAI(BaseAgent):
         best_position = max(valuable_positions, key=lambda x: x[1] - abs(x[0][0] - player_pos[0]) - abs(x[0][1] - player_pos[1]))
         target_position = best_position[0]
         
-        # 朝目标位置移动
+        # 沿绕开墙和箱子的最短路径移动
+        board = observation['board'] if isinstance(observation, dict) and 'board' in observation else observation
+        height, width = board.shape
+        blocked = bytearray((board == 1).astype(np.uint8).tobytes())
+        for box_row, box_col in boxes:
+            blocked[box_row * width + box_col] = 1
+        path = get_pathfinder(height, width).bfs(blocked, tuple(player_pos), tuple(target_position))
+        if len(path) > 1:
+            step = (path[1][0] - player_pos[0], path[1][1] - player_pos[1])
+            for action, delta in directions.items():
+                if delta == step and action in valid_actions:
+                    return action
+        
+        # 不可达时朝目标位置贪心移动
         best_action = None
         min_distance = float('inf')
         
@@ -404,86 +445,36 @@ class SearchAI(BaseAgent):
         # 简单的随机选择或基于观察的启发式
         return random.choice(valid_actions)
     
-    def _bfs_search_snake(self, start, goal, my_snake, enemy_snake, env):
-        """BFS搜索（贪吃蛇）"""
-        queue = deque([(start, [start])])
-        visited = {start}
+    def _snake_blocked_grid(self, my_snake, enemy_snake, board_size) -> bytearray:
+        """把两条蛇的身体（含尾巴）写入扁平障碍网格，供网格寻路器使用"""
+        blocked = bytearray(board_size * board_size)
+        for snake in (my_snake, enemy_snake):
+            for x, y in snake or ():
+                if 0 <= x < board_size and 0 <= y < board_size:
+                    blocked[x * board_size + y] = 1
+        return blocked
+    
+    def _grid_search_snake(self, algorithm, start, goal, my_snake, enemy_snake, env, max_moves):
+        """在蛇身障碍网格上调用网格寻路器"""
         board_size = env.game.board_size
-        
-        while queue:
-            current, path = queue.popleft()
-            
-            if len(path) > self.max_depth:
-                continue
-            
-            if current == goal:
-                return path
-            
-            # 探索四个方向
-            for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-                next_pos = (current[0] + dx, current[1] + dy)
-                
-                if (next_pos not in visited and 
-                    self._is_valid_position_snake(next_pos, my_snake, enemy_snake, board_size)):
-                    visited.add(next_pos)
-                    queue.append((next_pos, path + [next_pos]))
-        
-        return []
+        x, y = goal
+        if not (0 <= x < board_size and 0 <= y < board_size):
+            return []
+        blocked = self._snake_blocked_grid(my_snake, enemy_snake, board_size)
+        pathfinder = get_pathfinder(board_size, board_size)
+        return pathfinder.search(algorithm, blocked, start, goal, max(0, max_moves))
+    
+    def _bfs_search_snake(self, start, goal, my_snake, enemy_snake, env):
+        """BFS搜索（贪吃蛇），路径最多包含max_depth个格子"""
+        return self._grid_search_snake('bfs', start, goal, my_snake, enemy_snake, env, self.max_depth - 1)
     
     def _dfs_search_snake(self, start, goal, my_snake, enemy_snake, env):
-        """DFS搜索（贪吃蛇）"""
-        def dfs_recursive(current, path, visited, depth):
-            if depth > self.max_depth:
-                return None
-            
-            if current == goal:
-                return path
-            
-            for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-                next_pos = (current[0] + dx, current[1] + dy)
-                
-                if (next_pos not in visited and 
-                    self._is_valid_position_snake(next_pos, my_snake, enemy_snake, env.game.board_size)):
-                    visited.add(next_pos)
-                    result = dfs_recursive(next_pos, path + [next_pos], visited, depth + 1)
-                    if result:
-                        return result
-                    visited.remove(next_pos)
-            
-            return None
-        
-        return dfs_recursive(start, [start], {start}, 0) or []
+        """DFS搜索（贪吃蛇），最多移动max_depth步"""
+        return self._grid_search_snake('dfs', start, goal, my_snake, enemy_snake, env, self.max_depth)
     
     def _astar_search_snake(self, start, goal, my_snake, enemy_snake, env):
-        """A*搜索（贪吃蛇）"""
-        def heuristic(pos1, pos2):
-            return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
-        
-        heap = [(0, 0, start, [start])]  # (f_score, g_score, position, path)
-        visited = {start: 0}
-        board_size = env.game.board_size
-        
-        while heap:
-            f_score, g_score, current, path = heapq.heappop(heap)
-            
-            if g_score > self.max_depth:
-                continue
-            
-            if current == goal:
-                return path
-            
-            for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-                next_pos = (current[0] + dx, current[1] + dy)
-                new_g_score = g_score + 1
-                
-                if (self._is_valid_position_snake(next_pos, my_snake, enemy_snake, board_size) and
-                    (next_pos not in visited or new_g_score < visited[next_pos])):
-                    visited[next_pos] = new_g_score
-                    h_score = heuristic(next_pos, goal)
-                    f_score = new_g_score + h_score
-                    heapq.heappush(heap, (f_score, new_g_score, next_pos, path + [next_pos]))
-        
-        return []
+        """A*搜索（贪吃蛇），最多移动max_depth步"""
+        return self._grid_search_snake('astar', start, goal, my_snake, enemy_snake, env, self.max_depth)
     
     def _is_valid_position_snake(self, pos, my_snake, enemy_snake, board_size):
         """检查位置是否有效（贪吃蛇）"""
@@ -544,7 +535,11 @@ class SearchAI(BaseAgent):
     def _find_player_position(self, observation, player_id):
         """从观察中找到玩家位置"""
         # 根据观察格式查找玩家位置
-        if isinstance(observation, np.ndarray):
+        if isinstance(observation, dict):
+            pos = observation.get(f'player{player_id}_pos')
+            if pos is not None and pos[0] >= 0:
+                return (int(pos[0]), int(pos[1]))
+        elif isinstance(observation, np.ndarray):
             positions = np.where(observation == player_id + 3)  # 假设玩家标记为4, 5等
             if len(positions[0]) > 0:
                 return (positions[0][0], positions[1][0])
@@ -651,6 +646,7 @@ class SearchAI(BaseAgent):
         info.update({
             'search_algorithm': self.search_algorithm,
             'max_depth': self.max_depth,
+            'path_cache': self.path_cache.get_stats(),
             'description': f'搜索算法AI ({self.search_algorithm.upper()})'
         })
         return info
@@ -682,77 +678,25 @@ class SearchAI(BaseAgent):
         return total_score
     
     def _calculate_deadlock_penalty(self, boxes, targets, observation):
-        """计算死锁惩罚"""
-        penalty = 0
-        board = observation['board'] if isinstance(observation, dict) else observation
-        
-        for box in boxes:
-            if box not in targets:
-                # 检查角落死锁
-                if self._is_corner_position(box, board):
-                    penalty += 1000
-                
-                # 检查墙边死锁
-                if self._is_wall_edge_deadlock(box, board, targets):
-                    penalty += 500
-        
-        return penalty
-    
-    def _is_corner_position(self, pos, board):
-        """检查是否在角落位置"""
-        row, col = pos
-        corners = 0
-        
-        # 检查四个方向的墙
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-        for dr, dc in directions:
-            new_row, new_col = row + dr, col + dc
-            if (new_row < 0 or new_row >= board.shape[0] or 
-                new_col < 0 or new_col >= board.shape[1] or 
-                board[new_row, new_col] == 1):
-                corners += 1
-        
-        return corners >= 2
+        """计算死锁惩罚：停在死格上的箱子"""
+        dead_squares = self._get_sokoban_dead_squares(observation, targets)
+        return sum(1000 for box in boxes if box not in targets and box in dead_squares)
+    
+    def _pushes_into_dead_square(self, action, player_pos, boxes, targets, dead_squares):
+        """动作是否会把箱子推进死格"""
+        delta = {'UP': (-1, 0), 'DOWN': (1, 0), 'LEFT': (0, -1), 'RIGHT': (0, 1)}.get(action)
+        if delta is None:
+            return False
+        box_pos = (player_pos[0] + delta[0], player_pos[1] + delta[1])
+        if box_pos not in boxes:
+            return False
+        # 目标点不会是死格
+        return (box_pos[0] + delta[0], box_pos[1] + delta[1]) in dead_squares
     
-    def _is_wall_edge_deadlock(self, pos, board, targets):
-        """检查墙边死锁"""
-        row, col = pos
-        
-        # 如果贴着墙，检查沿墙方向是否有目标
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-        
-        for dr, dc in directions:
-            wall_row, wall_col = row + dr, col + dc
-            
-            # 如果这个方向是墙
-            if (wall_row < 0 or wall_row >= board.shape[0] or 
-                wall_col < 0 or wall_col >= board.shape[1] or 
-                board[wall_row, wall_col] == 1):
-                
-                # 检查沿墙方向是否有目标
-                perpendicular_dirs = [(dc, dr), (-dc, -dr)] if dr == 0 else [(dr, dc), (-dr, -dc)]
-                has_target_along_wall = False
-                
-                for perp_dr, perp_dc in perpendicular_dirs:
-                    for distance in range(1, min(board.shape)):
-                        check_row = row + distance * perp_dr
-                        check_col = col + distance * perp_dc
-                        check_pos = (check_row, check_col)
-                        
-                        if check_pos in targets:
-                            has_target_along_wall = True
-                            break
-                        
-                        # 如果遇到墙就停止
-                        if (check_row < 0 or check_row >= board.shape[0] or 
-                            check_col < 0 or check_col >= board.shape[1] or 
-                            board[check_row, check_col] == 1):
-                            break
-                
-                if not has_target_along_wall:
-                    return True
-        
-        return False
+    def _get_sokoban_dead_squares(self, observation, targets):
+        """死格集合（箱子推到这里后再也到不了任何目标），同一关卡只计算一次"""
+        board = observation['board'] if isinstance(observation, dict) else observation
+        return get_dead_squares(board, targets)
     
     def _calculate_clustering_penalty(self, boxes, targets):
         """计算聚集惩罚"""
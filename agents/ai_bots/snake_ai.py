@@ -1,13 +1,12 @@
 """
 贪吃蛇专用AI智能体
-实现A*寻路算法、安全性评估和对手行为预测
+实现BFS距离图、安全性评估和对手行为预测
 """
 
 import random
-import heapq
-import numpy as np
-from typing import List, Tuple, Optional, Dict, Set
+from typing import List, Tuple, Dict
 from agents.base_agent import BaseAgent
+from utils.grid_pathfinding import get_pathfinder
 
 
 class SnakeAI(BaseAgent):
@@ -15,9 +14,10 @@ class SnakeAI(BaseAgent):
     
     def __init__(self, name="SnakeAI", player_id=1):
         super().__init__(name, player_id)
-        self.path_cache = {}  # 路径缓存
         self.opponent_history = []  # 对手历史动作
         self.max_history = 10  # 保存最近10步
+        self.analysis_depth = 15  # 空间、地盘和对手距离的BFS深度
+        self.food_horizon = 20  # 食物距离的BFS深度（超过20步食物得分为0）
     
     def get_action(self, observation, env):
         """获取动作"""
@@ -32,12 +32,12 @@ class SnakeAI(BaseAgent):
         
         # 获取当前蛇的信息
         if self.player_id == 1:
-            my_snake = game.snake1
-            enemy_snake = game.snake2
+            my_snake = list(game.snake1)
+            enemy_snake = list(game.snake2)
             my_direction = game.direction1
         else:
-            my_snake = game.snake2
-            enemy_snake = game.snake1
+            my_snake = list(game.snake2)
+            enemy_snake = list(game.snake1)
             my_direction = game.direction2
         
         if not my_snake:
@@ -48,16 +48,14 @@ class SnakeAI(BaseAgent):
         # 更新对手历史
         self._update_opponent_history(enemy_snake)
         
-        # 预测对手下一步行为
-        predicted_enemy_positions = self._predict_opponent_moves(enemy_snake, game)
+        # 每次决策只分析一次棋盘，所有动作的评分都读取这份结果
+        analysis = self._analyze_board(game, my_snake, enemy_snake)
         
         # 评估每个动作的安全性和价值
         action_scores = {}
         
         for action in valid_actions:
-            score = self._evaluate_action(action, my_head, my_snake, enemy_snake, 
-                                        game, predicted_enemy_positions)
-            action_scores[action] = score
+            action_scores[action] = self._evaluate_action(action, my_head, analysis)
         
         # 选择最佳动作
         best_action = max(action_scores.keys(), key=lambda a: action_scores[a])
@@ -80,87 +78,124 @@ class SnakeAI(BaseAgent):
             
             self.opponent_history.append(current_head)
     
-    def _predict_opponent_moves(self, enemy_snake, game) -> List[Tuple[int, int]]:
-        """预测对手可能的移动位置"""
-        if not enemy_snake or len(enemy_snake) == 0:
-            return []
-        
-        enemy_head = enemy_snake[0]
-        predicted_positions = []
-        
-        # 获取对手的有效动作
-        valid_directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-        
-        for direction in valid_directions:
-            new_pos = (enemy_head[0] + direction[0], enemy_head[1] + direction[1])
-            
-            # 检查是否在边界内
-            if (0 <= new_pos[0] < game.board_size and 
-                0 <= new_pos[1] < game.board_size):
-                
-                # 检查是否撞到蛇身
-                if (new_pos not in enemy_snake[:-1] and 
-                    new_pos not in game.snake1[:-1] and 
-                    new_pos not in game.snake2[:-1]):
-                    predicted_positions.append(new_pos)
-        
-        return predicted_positions
+    def _analyze_board(self, game, my_snake, enemy_snake) -> Dict:
+        """
+        一次性分析棋盘
+        
+        障碍网格只构建一次（蛇尾会移走，不算障碍），然后用共享的网格寻路器做有界BFS：
+        从所有食物出发的多源BFS得到每个格子到最近食物的距离，从对手蛇头出发的BFS
+        得到对手距离；每个候选新蛇头的距离图在评估时按需计算并缓存。
+        搜索深度有上限，决策耗时不随棋盘增大而增长。
+        
+        Returns:
+            分析结果字典
+        """
+        size = game.board_size
+        grid = bytearray(size * size)
+        for snake in (my_snake, enemy_snake):
+            for x, y in snake[:-1]:
+                grid[x * size + y] = 1
+        
+        depth = self.analysis_depth
+        
+        # 从食物出发的多源BFS，只需要算到蛇头周围的候选格子；
+        # 曼哈顿距离已超出搜索深度的食物不可能在深度内到达，不作为起点
+        my_head = my_snake[0]
+        around_head = [(my_head[0] + dx) * size + my_head[1] + dy
+                       for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]
+                       if 0 <= my_head[0] + dx < size and 0 <= my_head[1] + dy < size]
+        foods = [x * size + y for x, y in game.foods
+                 if abs(x - my_head[0]) + abs(y - my_head[1]) <= self.food_horizon + 1]
+        pathfinder = get_pathfinder(size, size)
+        food_dist, _ = pathfinder.distance_map(grid, foods, self.food_horizon,
+                                               targets=[i for i in around_head if not grid[i]])
+        
+        enemy_head = enemy_snake[0] if enemy_snake else None
+        if enemy_head is not None:
+            enemy_index = enemy_head[0] * size + enemy_head[1]
+            enemy_dist, _ = pathfinder.distance_map(grid, [enemy_index], depth)
+            predicted = {(enemy_head[0] + dx, enemy_head[1] + dy)
+                         for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]
+                         if 0 <= enemy_head[0] + dx < size and 0 <= enemy_head[1] + dy < size
+                         and not grid[(enemy_head[0] + dx) * size + enemy_head[1] + dy]}
+        else:
+            enemy_dist = None
+            predicted = set()
+        
+        return {
+            'size': size,
+            'grid': grid,
+            'foods': game.foods,
+            'food_dist': food_dist,
+            'enemy_head': enemy_head,
+            'enemy_dist': enemy_dist,
+            'predicted_enemy_positions': predicted,
+            'candidates': {}
+        }
     
-    def _evaluate_action(self, action, my_head, my_snake, enemy_snake, game, 
-                        predicted_enemy_positions) -> float:
+    def _candidate_distances(self, new_head, analysis) -> Tuple[List[int], List[int]]:
+        """候选新蛇头出发的距离图（每次决策内缓存）"""
+        candidates = analysis['candidates']
+        if new_head not in candidates:
+            size = analysis['size']
+            candidates[new_head] = get_pathfinder(size, size).distance_map(
+                analysis['grid'], [new_head[0] * size + new_head[1]], self.analysis_depth)
+        return candidates[new_head]
+    
+    def _evaluate_action(self, action, my_head, analysis) -> float:
         """评估动作的综合得分"""
         new_head = (my_head[0] + action[0], my_head[1] + action[1])
         
         # 基础安全检查
-        safety_score = self._calculate_safety_score(new_head, my_snake, enemy_snake, 
-                                                   game, predicted_enemy_positions)
+        safety_score = self._calculate_safety_score(new_head, analysis)
         
         if safety_score < 0:  # 不安全的动作
             return safety_score
         
         # 食物相关得分
-        food_score = self._calculate_food_score(new_head, game.foods, game)
+        food_score = self._calculate_food_score(new_head, analysis)
         
         # 空间控制得分
-        space_score = self._calculate_space_score(new_head, my_snake, enemy_snake, game)
+        space_score = self._calculate_space_score(new_head, analysis)
         
         # 对手距离得分
-        enemy_distance_score = self._calculate_enemy_distance_score(new_head, enemy_snake)
+        enemy_distance_score = self._calculate_enemy_distance_score(new_head, analysis)
         
         # 中心位置得分
-        center_score = self._calculate_center_score(new_head, game.board_size)
+        center_score = self._calculate_center_score(new_head, analysis['size'])
+        
+        # 地盘得分（比对手先到达的格子）
+        territory_score = self._calculate_territory_score(new_head, analysis)
         
         # 综合得分
         total_score = (safety_score * 10.0 +    # 安全性最重要
                       food_score * 5.0 +        # 食物重要性
                       space_score * 3.0 +       # 空间控制
                       enemy_distance_score * 2.0 + # 与对手距离
-                      center_score * 1.0)       # 中心位置
+                      center_score * 1.0 +      # 中心位置
+                      territory_score * 1.0)    # 地盘
         
         return total_score
     
-    def _calculate_safety_score(self, new_head, my_snake, enemy_snake, game, 
-                               predicted_enemy_positions) -> float:
+    def _calculate_safety_score(self, new_head, analysis) -> float:
         """计算安全性得分"""
-        # 检查边界
-        if (new_head[0] < 0 or new_head[0] >= game.board_size or
-            new_head[1] < 0 or new_head[1] >= game.board_size):
-            return -1000.0
+        size = analysis['size']
         
-        # 检查撞到自己
-        if new_head in my_snake[:-1]:
+        # 检查边界
+        if (new_head[0] < 0 or new_head[0] >= size or
+            new_head[1] < 0 or new_head[1] >= size):
             return -1000.0
         
-        # 检查撞到对手
-        if enemy_snake and new_head in enemy_snake[:-1]:
+        # 检查撞到蛇身（自己或对手）
+        if analysis['grid'][new_head[0] * size + new_head[1]]:
             return -1000.0
         
         # 检查是否会与对手头部碰撞
-        if new_head in predicted_enemy_positions:
+        if new_head in analysis['predicted_enemy_positions']:
             return -500.0  # 高风险，但不是立即死亡
         
         # 计算死路风险
-        escape_routes = self._count_escape_routes(new_head, my_snake, enemy_snake, game)
+        escape_routes = self._count_escape_routes(new_head, analysis)
         
         if escape_routes == 0:
             return -800.0  # 死路
@@ -171,180 +206,69 @@ class SnakeAI(BaseAgent):
         else:
             return 100.0   # 安全
     
-    def _count_escape_routes(self, pos, my_snake, enemy_snake, game, depth=3) -> int:
-        """计算从给定位置的逃生路线数量"""
+    def _count_escape_routes(self, pos, analysis, depth=3) -> int:
+        """计算从给定位置出发、长度为depth的逃生路线数量"""
         if depth <= 0:
             return 1
         
+        size = analysis['size']
+        grid = analysis['grid']
         count = 0
-        for direction in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-            next_pos = (pos[0] + direction[0], pos[1] + direction[1])
-            
-            # 检查边界
-            if (next_pos[0] < 0 or next_pos[0] >= game.board_size or
-                next_pos[1] < 0 or next_pos[1] >= game.board_size):
-                continue
-            
-            # 检查障碍物
-            all_obstacles = set()
-            if my_snake:
-                all_obstacles.update(my_snake[:-1])
-            if enemy_snake:
-                all_obstacles.update(enemy_snake[:-1])
-            
-            if next_pos not in all_obstacles:
-                count += self._count_escape_routes(next_pos, my_snake, enemy_snake, game, depth - 1)
+        for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            x, y = pos[0] + dx, pos[1] + dy
+            if 0 <= x < size and 0 <= y < size and not grid[x * size + y]:
+                count += self._count_escape_routes((x, y), analysis, depth - 1)
         
         return count
     
-    def _calculate_food_score(self, new_head, foods, game) -> float:
+    def _calculate_food_score(self, new_head, analysis) -> float:
         """计算食物相关得分"""
+        foods = analysis['foods']
         if not foods:
             return 0.0
         
-        # 使用A*寻找到最近食物的路径
-        nearest_food = self._find_nearest_food(new_head, foods)
-        path = self._a_star_pathfinding(new_head, nearest_food, game)
-        
-        if path:
+        # 多源BFS给出的到最近食物的路径长度
+        distance = analysis['food_dist'][new_head[0] * analysis['size'] + new_head[1]]
+        if distance >= 0:
             # 路径越短得分越高
-            distance = len(path) - 1
             return max(0, 100 - distance * 5)
         else:
-            # 如果找不到路径，使用曼哈顿距离
+            # 搜索范围内没有路径，使用曼哈顿距离
             min_distance = min(abs(new_head[0] - food[0]) + abs(new_head[1] - food[1]) 
                              for food in foods)
             return max(0, 50 - min_distance * 3)
     
-    def _find_nearest_food(self, head, foods) -> Tuple[int, int]:
-        """找到最近的食物"""
-        min_distance = float('inf')
-        nearest_food = foods[0]
-        
-        for food in foods:
-            distance = abs(head[0] - food[0]) + abs(head[1] - food[1])
-            if distance < min_distance:
-                min_distance = distance
-                nearest_food = food
-        
-        return nearest_food
-    
-    def _a_star_pathfinding(self, start, goal, game) -> Optional[List[Tuple[int, int]]]:
-        """A*寻路算法"""
-        # 缓存键
-        cache_key = (start, goal, hash(str(game.snake1 + game.snake2)))
-        if cache_key in self.path_cache:
-            return self.path_cache[cache_key]
-        
-        def heuristic(a, b):
-            return abs(a[0] - b[0]) + abs(a[1] - b[1])
-        
-        def get_neighbors(pos):
-            x, y = pos
-            neighbors = []
-            for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                nx, ny = x + dx, y + dy
-                if (0 <= nx < game.board_size and 0 <= ny < game.board_size):
-                    # 检查障碍物（允许通过尾部，因为它会移动）
-                    obstacles = set()
-                    if game.snake1:
-                        obstacles.update(game.snake1[:-1])
-                    if game.snake2:
-                        obstacles.update(game.snake2[:-1])
-                    
-                    if (nx, ny) not in obstacles:
-                        neighbors.append((nx, ny))
-            return neighbors
-        
-        open_set = [(0, start)]
-        came_from = {}
-        g_score = {start: 0}
-        f_score = {start: heuristic(start, goal)}
-        visited = set()
-        
-        while open_set:
-            current = heapq.heappop(open_set)[1]
-            
-            if current in visited:
-                continue
-            visited.add(current)
-            
-            if current == goal:
-                # 重构路径
-                path = []
-                while current in came_from:
-                    path.append(current)
-                    current = came_from[current]
-                path.append(start)
-                path.reverse()
-                
-                # 缓存结果
-                self.path_cache[cache_key] = path
-                return path
-            
-            for neighbor in get_neighbors(current):
-                if neighbor in visited:
-                    continue
-                
-                tentative_g = g_score[current] + 1
-                
-                if neighbor not in g_score or tentative_g < g_score[neighbor]:
-                    came_from[neighbor] = current
-                    g_score[neighbor] = tentative_g
-                    f_score[neighbor] = tentative_g + heuristic(neighbor, goal)
-                    heapq.heappush(open_set, (f_score[neighbor], neighbor))
-        
-        # 清理缓存以避免内存泄漏
-        if len(self.path_cache) > 100:
-            self.path_cache.clear()
-        
-        return None
-    
-    def _calculate_space_score(self, new_head, my_snake, enemy_snake, game) -> float:
+    def _calculate_space_score(self, new_head, analysis) -> float:
         """计算空间控制得分"""
-        # 使用BFS计算可达空间
-        reachable_spaces = self._bfs_reachable_spaces(new_head, my_snake, enemy_snake, game)
-        return min(reachable_spaces * 2, 100)  # 限制最大得分
+        # 候选距离图中 analysis_depth 步内可达的格子数
+        _, reachable = self._candidate_distances(new_head, analysis)
+        return min(len(reachable) * 2, 100)  # 限制最大得分
     
-    def _bfs_reachable_spaces(self, start, my_snake, enemy_snake, game, max_depth=15) -> int:
-        """使用BFS计算可达空间数量"""
-        visited = set()
-        queue = [(start, 0)]
-        visited.add(start)
-        
-        while queue:
-            pos, depth = queue.pop(0)
-            
-            if depth >= max_depth:
-                continue
-            
-            for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                next_pos = (pos[0] + dx, pos[1] + dy)
-                
-                if (0 <= next_pos[0] < game.board_size and 
-                    0 <= next_pos[1] < game.board_size and 
-                    next_pos not in visited):
-                    
-                    # 检查障碍物
-                    obstacles = set()
-                    if my_snake:
-                        obstacles.update(my_snake[:-1])
-                    if enemy_snake:
-                        obstacles.update(enemy_snake[:-1])
-                    
-                    if next_pos not in obstacles:
-                        visited.add(next_pos)
-                        queue.append((next_pos, depth + 1))
-        
-        return len(visited)
+    def _calculate_territory_score(self, new_head, analysis) -> float:
+        """
+        计算地盘得分（Voronoi划分）
+        
+        我方先走，所以同时到达的格子也算我方的；对手距离图搜索范围外的格子视为我方。
+        """
+        enemy_dist = analysis['enemy_dist']
+        dist, reachable = self._candidate_distances(new_head, analysis)
+        if enemy_dist is None:
+            territory = len(reachable)
+        else:
+            territory = sum(1 for index in reachable
+                            if enemy_dist[index] < 0 or dist[index] <= enemy_dist[index])
+        return 20.0 * territory / max(1, len(reachable))
     
-    def _calculate_enemy_distance_score(self, new_head, enemy_snake) -> float:
+    def _calculate_enemy_distance_score(self, new_head, analysis) -> float:
         """计算与对手距离得分"""
-        if not enemy_snake or len(enemy_snake) == 0:
+        enemy_head = analysis['enemy_head']
+        if enemy_head is None:
             return 0.0
         
-        enemy_head = enemy_snake[0]
-        distance = abs(new_head[0] - enemy_head[0]) + abs(new_head[1] - enemy_head[1])
+        # 优先使用绕开障碍的真实距离，范围外用曼哈顿距离
+        distance = analysis['enemy_dist'][new_head[0] * analysis['size'] + new_head[1]]
+        if distance < 0:
+            distance = abs(new_head[0] - enemy_head[0]) + abs(new_head[1] - enemy_head[1])
         
         # 保持适当距离：太近危险，太远可能错失机会
         if distance < 3:
@@ -401,22 +325,21 @@ class SmartSnakeAI(SnakeAI):
             self.aggressive_mode = False
             self.defensive_mode = False
     
-    def _evaluate_action(self, action, my_head, my_snake, enemy_snake, game, 
-                        predicted_enemy_positions) -> float:
+    def _evaluate_action(self, action, my_head, analysis) -> float:
         """重写评估函数，根据模式调整权重"""
-        base_score = super()._evaluate_action(action, my_head, my_snake, enemy_snake, 
-                                            game, predicted_enemy_positions)
+        base_score = super()._evaluate_action(action, my_head, analysis)
+        if base_score < 0:  # 不安全的动作不再加分
+            return base_score
+        new_head = (my_head[0] + action[0], my_head[1] + action[1])
         
         if self.aggressive_mode:
             # 侵略模式：更关注食物和进攻
-            new_head = (my_head[0] + action[0], my_head[1] + action[1])
-            food_bonus = self._calculate_food_score(new_head, game.foods, game) * 0.5
+            food_bonus = self._calculate_food_score(new_head, analysis) * 0.5
             return base_score + food_bonus
         
         elif self.defensive_mode:
             # 防守模式：更关注安全性
-            safety_bonus = self._calculate_safety_score(new_head, my_snake, enemy_snake, 
-                                                       game, predicted_enemy_positions) * 0.3
+            safety_bonus = self._calculate_safety_score(new_head, analysis) * 0.3
             return base_score + safety_bonus
         
         return base_score 
\ No newline at end of file
@@ -4,11 +4,17 @@
 """
 
 import heapq
+import itertools
 import time
-from typing import Dict, List, Tuple, Any, Optional, Set
+from typing import Dict, List, Tuple, Any, Optional, Set, FrozenSet
 from collections import deque
 import numpy as np
 from agents.base_agent import BaseAgent
+from utils.grid_pathfinding import get_pathfinder
+from utils.lru_cache import LRUCache
+from utils.sokoban_analysis import INF_DISTANCE, get_dead_squares
+from utils.sokoban_state import (ACTIONS, ACTION_INDEX, SearchNodeTable, SokobanSearchState,
+                                 SokobanStaticMap, get_static_map)
 
 
 class SokobanAI(BaseAgent):
@@ -20,10 +26,11 @@ class SokobanAI(BaseAgent):
         self.max_depth = kwargs.get('max_depth', 30)  # 适中的搜索深度
         self.use_heuristic = kwargs.get('use_heuristic', True)
         self.use_dynamic_depth = kwargs.get('use_dynamic_depth', True)
-        self.cache_size = kwargs.get('cache_size', 50000)  # 增加缓存大小
-        self.state_cache = {}  # 状态评估缓存
-        self.deadlock_cache = set()  # 死锁状态缓存
-        self.goal_push_cache = {}  # 目标推动路径缓存
+        self.cache_size = kwargs.get('cache_size', 50000)  # 每个缓存的容量
+        self.heuristic_cache = LRUCache(self.cache_size)  # 箱子布局 -> 推动次数下界
+        self.eval_cache = LRUCache(self.cache_size)  # 搜索状态 -> 评估值
+        self.deadlock_cache = LRUCache(self.cache_size)  # 箱子布局 -> 是否死锁
+        self._cache_level = None  # 缓存对应的关卡静态数据，换关卡时整体作废
         self.use_advanced_heuristic = kwargs.get('use_advanced_heuristic', True)  # 高级启发式
         self.prioritize_completion = kwargs.get('prioritize_completion', True)  # 优先完成策略
         
@@ -36,6 +43,10 @@ class SokobanAI(BaseAgent):
         # 任务管理 - 新增
         self._current_target_box = None  # 当前处理的箱子
         self._box_completion_history = []  # 箱子完成历史
+        self._unsolved_layout = None  # 推动级搜索无解的局面
+        self._plan = None  # 当前计划：逐步动作、每一步之前的预期状态、下一步下标
+        self._dead_box_tracking = None  # (关卡死格, 上一次观察到的箱子, 开局在死格上且未推动过的箱子)
+        self.last_search_nodes = 0  # 上一次推动级搜索扩展的节点数
         
     def get_action(self, observation: Dict[str, Any], env) -> Optional[str]:
         """获取动作 - 优化版本，解决循环和推箱子问题"""
@@ -66,6 +77,13 @@ class SokobanAI(BaseAgent):
                 print("🎉 游戏已完成！")
                 return None
             
+            # 首选策略：推动级搜索找到完整解时沿解走。计划缓存在两步之间，
+            # 状态与预期一致时直接取下一步，跳过后面的局面分析
+            action = self._push_plan_action(state, observation)
+            if action:
+                self._update_history(state, action)
+                return action
+            
             # 检查任务完成和切换
             self._check_task_completion_and_switch(state)
             
@@ -105,8 +123,9 @@ class SokobanAI(BaseAgent):
         """使用改进的A*搜索找到最佳动作"""
         start_time = time.time()
         
-        # 获取当前状态
-        current_state = self._observation_to_state(observation)
+        # 获取当前状态（紧凑搜索状态，关卡静态数据按引用共享）
+        current_state = self._to_search_state(self._observation_to_state(observation))
+        self._sync_cache_level(current_state)
         
         # 如果已经完成，返回None
         if self._is_solved(current_state):
@@ -124,6 +143,12 @@ class SokobanAI(BaseAgent):
         else:
             max_depth = self.max_depth
         
+        # 推动级搜索：搜索深度按推动次数计，时限内找到完整解时沿解走
+        obstacles = self._other_player_bits(observation, current_state.static)
+        plan = self._push_level_search(current_state, start_time, obstacles)
+        if plan:
+            return plan[0]
+        
         # 快速检查是否有明显的好动作
         quick_action = self._quick_action_check(current_state)
         if quick_action:
@@ -164,42 +189,36 @@ class SokobanAI(BaseAgent):
         return None
 
     def _layered_astar_search(self, initial_state: Dict[str, Any], max_depth: int, start_time: float) -> Optional[str]:
-        """分层A*搜索"""
-        frontier = []
-        heapq.heappush(frontier, (0, 0, initial_state, []))
-        visited = set()
-        visited.add(self._state_to_key(initial_state))
+        """分层A*搜索（节点驻留在节点表中，堆中只放 (f, 次序, 节点ID)）"""
+        nodes = SearchNodeTable()
+        tie = itertools.count()
+        frontier = [(0, next(tie), nodes.add(self._to_search_state(initial_state)))]
         best_action = None
         best_score = float('-inf')
         nodes_explored = 0
         max_nodes = min(3000, max_depth * 150)
         while frontier and time.time() - start_time < self.max_search_time and nodes_explored < max_nodes:
-            f_score, depth, state, path = heapq.heappop(frontier)
+            _, _, node = heapq.heappop(frontier)
             nodes_explored += 1
+            depth = nodes.costs[node]
             if depth >= max_depth:
                 continue
-            state_key = self._state_to_key(state)
-            if state_key in self.deadlock_cache:
-                continue
-            for action in ['UP', 'DOWN', 'LEFT', 'RIGHT']:
-                new_state, success = self._simulate_action(state, action)
-                if not success:
+            state = nodes.states[node]
+            for direction, action in enumerate(ACTIONS):
+                new_state = state.move(direction)
+                if new_state is None or nodes.get(new_state) is not None:
                     continue
-                new_state_key = self._state_to_key(new_state)
-                if new_state_key in visited:
+                child = nodes.add(new_state, node, direction, depth + 1)
+                # 只有推箱子才可能产生新的死锁
+                if state.pushes_box(direction) and self._deadlock_check_cached(new_state):
                     continue
-                visited.add(new_state_key)
-                new_path = path + [action]
-                if self._advanced_deadlock_check(new_state):
-                    self.deadlock_cache.add(new_state_key)
-                    continue
-                if self._is_solved(new_state):
-                    return new_path[0] if new_path else action
+                if new_state.is_solved():
+                    return ACTIONS[nodes.path(child)[0]]
                 if self.use_advanced_heuristic:
                     score = self._evaluate_state_advanced(new_state)
                 else:
                     score = self._evaluate_state_cached(new_state)
-                if len(new_path) == 1 and score > best_score:
+                if depth == 0 and score > best_score:
                     best_score = score
                     best_action = action
                 if score < -2000:
@@ -210,9 +229,151 @@ class SokobanAI(BaseAgent):
                     h_score = self._heuristic_cached(new_state)
                 g_score = depth + 1
                 f_score = g_score + h_score
-                heapq.heappush(frontier, (f_score, depth + 1, new_state, new_path))
+                heapq.heappush(frontier, (f_score, next(tie), child))
         return best_action
     
+    def _push_level_search(self, initial_state: Dict[str, Any], start_time: float,
+                           obstacles: int = 0) -> Optional[List[str]]:
+        """
+        推动级A*搜索
+        
+        节点为 (箱子布局, 玩家可达区域)：玩家归一化到区域内下标最小的格子，区域内的走动不产生新节点，
+        后继为区域内所有合法推动，代价按推动次数计。找到所有箱子都在目标上的布局后，
+        把推动序列展开成逐步动作。
+        
+        Args:
+            initial_state: 初始状态
+            start_time: 搜索开始时间
+            obstacles: 搜索期间不可进入的格子位集（另一名玩家所在格子）
+        
+        Returns:
+            完整的逐步动作序列，时限内无解时为None
+        """
+        root = self._to_search_state(initial_state)
+        if root.player < 0:
+            return None
+        if root.all_boxes_placed():
+            return []
+        
+        start = root.normalized(root.region(obstacles))
+        nodes = SearchNodeTable()
+        start_id = nodes.add(start)
+        tie = itertools.count()
+        # 尚未扩展节点的匹配下界；子节点只移动了一个箱子，从父节点增量更新。
+        # 已扩展或无解的节点不在其中，一致的下界保证节点第一次扩展时代价最优
+        bounds = {start_id: start.static.assignment_bound(start.boxes)}
+        frontier = [(bounds[start_id].total, next(tie), start_id)]
+        self.last_search_nodes = 0
+        while frontier and time.time() - start_time < self.max_search_time:
+            _, _, node_id = heapq.heappop(frontier)
+            bound = bounds.pop(node_id, None)
+            if bound is None:
+                continue
+            self.last_search_nodes += 1
+            node = nodes.states[node_id]
+            cost = nodes.costs[node_id]
+            if node.all_boxes_placed():
+                # 动作编码为 推箱时玩家所站格子 * 4 + 方向下标
+                return self._expand_push_plan(root, [divmod(move, 4) for move in nodes.path(node_id)], obstacles)
+            
+            for stand, direction, child in node.pushes(node.region(obstacles), obstacles):
+                # 推动后玩家站在箱子原来的格子，箱子再往前一格
+                box = child.player
+                pushed = child.static.moves[box][direction]
+                if child.has_dead_box() or child.has_frozen_square(pushed):
+                    continue
+                child = child.normalized(child.region(obstacles))
+                move = stand * 4 + direction
+                child_id = nodes.get(child)
+                if child_id is not None:
+                    if child_id not in bounds or nodes.costs[child_id] <= cost + 1:
+                        continue
+                    nodes.relink(child_id, node_id, move, cost + 1)
+                    child_bound = bounds[child_id]
+                else:
+                    child_bound = bound.moved(box, pushed)
+                    child_id = nodes.add(child, node_id, move, cost + 1)
+                    if child_bound.total >= INF_DISTANCE:
+                        continue
+                    bounds[child_id] = child_bound
+                heapq.heappush(frontier, (cost + 1 + child_bound.total, next(tie), child_id))
+        return None
+    
+    def _expand_push_plan(self, root: SokobanSearchState, pushes: List[Tuple[int, int]],
+                          obstacles: int = 0) -> List[str]:
+        """把推动序列 [(推箱时玩家所站格子, 方向下标), ...] 展开成逐步动作"""
+        static = root.static
+        player = root.player
+        boxes = root.boxes
+        actions = []
+        for stand, direction in pushes:
+            walk = static.walk_path(player, stand, boxes | obstacles)
+            if walk is None:
+                break
+            actions.extend(ACTIONS[step] for step in walk)
+            actions.append(ACTIONS[direction])
+            box = static.moves[stand][direction]
+            boxes ^= (1 << box) | (1 << static.moves[box][direction])
+            player = box
+        return actions
+    
+    def _push_plan_action(self, state: Dict[str, Any], observation: Dict[str, Any]) -> Optional[str]:
+        """
+        按推动级搜索得到的计划走一步
+        
+        计划保存逐步动作和每一步之前预期的状态。观察到的状态与预期一致时直接取下一个动作；
+        箱子或玩家位置与预期不符（对手推动了箱子、动作没有生效），或另一名玩家挡住下一步时
+        才重新搜索。同一局面搜索失败后不再重复搜索。
+        """
+        current = self._to_search_state(state)
+        self._sync_cache_level(current)
+        obstacles = self._other_player_bits(observation, current.static)
+        
+        plan = self._plan
+        if plan is not None:
+            index = plan['index']
+            if index < len(plan['actions']):
+                expected = plan['states'][index]
+                action = plan['actions'][index]
+                if (expected.static is current.static and expected == current
+                        and not self._is_plan_step_blocked(current, action, obstacles)):
+                    plan['index'] = index + 1
+                    return action
+            self._plan = None
+        
+        layout = (current.static, current.boxes, obstacles)
+        if layout == self._unsolved_layout:
+            return None
+        actions = self._push_level_search(current, time.time(), obstacles)
+        if not actions:
+            self._unsolved_layout = layout
+            return None
+        
+        states = [current]
+        for action in actions[:-1]:
+            states.append(states[-1].move(ACTION_INDEX[action]))
+        self._plan = {'actions': actions, 'states': states, 'index': 1}
+        return actions[0]
+    
+    def _other_player_bits(self, observation: Dict[str, Any], static: SokobanStaticMap) -> int:
+        """另一名玩家所在格子的位集（没有另一名玩家时为0）"""
+        key = 'player2_pos' if self.player_id == 1 else 'player1_pos'
+        pos = observation.get(key)
+        if pos is None or pos[0] < 0:
+            return 0
+        return static.encode([tuple(pos)])
+    
+    def _is_plan_step_blocked(self, state: SokobanSearchState, action: str, obstacles: int) -> bool:
+        """计划的下一步（或被推的箱子）是否会撞上另一名玩家"""
+        direction = ACTION_INDEX[action]
+        step = state.static.moves[state.player][direction]
+        if step < 0 or obstacles >> step & 1:
+            return True
+        if state.boxes >> step & 1:
+            beyond = state.static.moves[step][direction]
+            return beyond < 0 or bool(obstacles >> beyond & 1)
+        return False
+    
     def _simple_push_logic(self, observation: Dict[str, Any]) -> Optional[str]:
         """极简的推箱子逻辑 - 硬编码解决方案"""
         # 解析状态
@@ -802,9 +963,20 @@ class SokobanAI(BaseAgent):
         available_targets = [target for target in targets if target not in boxes]
         if not incomplete_boxes:
             return 0
-        total_distance = self._calculate_optimal_assignment(incomplete_boxes, available_targets)
+        total_distance = self._push_lower_bound(state)
         push_steps_estimate = len(incomplete_boxes) * 2
         return total_distance + push_steps_estimate
+    
+    def _push_lower_bound(self, state: Dict[str, Any]) -> float:
+        """箱子到目标的最少推动次数之和：推动距离表上的最小代价匹配（匈牙利算法），无解时为inf"""
+        state = self._to_search_state(state)
+        self._sync_cache_level(state)
+        bound = self.heuristic_cache.get(state.boxes)
+        if bound is None:
+            total = state.static.assignment_bound(state.boxes).total
+            bound = float('inf') if total >= INF_DISTANCE else total
+            self.heuristic_cache.put(state.boxes, bound)
+        return bound
 
     def _calculate_optimal_assignment(self, boxes: List[Tuple[int, int]], targets: List[Tuple[int, int]]) -> float:
         if not boxes or not targets:
@@ -864,6 +1036,8 @@ class SokobanAI(BaseAgent):
         return True
 
     def _advanced_deadlock_check(self, state: Dict[str, Any]) -> bool:
+        if isinstance(state, SokobanSearchState) and state.has_dead_box():
+            return True
         board = state['board']
         boxes = state['boxes']
         targets = state['targets']
@@ -879,9 +1053,9 @@ class SokobanAI(BaseAgent):
         targets = state['targets']
         if box in targets:
             return False
-        row, col = box
-        if self._is_corner_deadlock(board, row, col):
+        if box in self._get_dead_squares(state):
             return True
+        row, col = box
         wall_count = 0
         directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
         for dr, dc in directions:
@@ -1263,80 +1437,65 @@ class SokobanAI(BaseAgent):
             'player_pos': player_pos,
             'boxes': boxes,
             'targets': targets,
-            'boxes_on_targets': boxes_on_targets
+            'boxes_on_targets': boxes_on_targets,
+            'untouched_dead_boxes': self._track_untouched_dead_boxes(board, targets, boxes)
         }
     
-    def _state_to_key(self, state: Dict[str, Any]) -> str:
-        """将状态转换为唯一键"""
-        player_pos = state['player_pos']
-        boxes = tuple(sorted(state['boxes']))
-        return f"{player_pos}_{boxes}"
-    
-    def _simulate_action(self, state: Dict[str, Any], action: str) -> Tuple[Dict[str, Any], bool]:
-        """模拟执行动作"""
-        board = state['board'].copy()
-        player_pos = state['player_pos']
-        boxes = state['boxes'].copy()
-        targets = state['targets']
-        
-        if not player_pos:
-            return state, False
-        
-        # 方向映射
-        directions = {
-            'UP': (-1, 0),
-            'DOWN': (1, 0),
-            'LEFT': (0, -1),
-            'RIGHT': (0, 1)
-        }
-        
-        if action not in directions:
-            return state, False
-        
-        dr, dc = directions[action]
-        new_row, new_col = player_pos[0] + dr, player_pos[1] + dc
-        
-        # 检查边界
-        if (new_row < 0 or new_row >= board.shape[0] or 
-            new_col < 0 or new_col >= board.shape[1]):
+    def _track_untouched_dead_boxes(self, board: np.ndarray, targets: Set[Tuple[int, int]],
+                                    boxes: Set[Tuple[int, int]]) -> FrozenSet[Tuple[int, int]]:
+        """
+        开局就停在死格上、之后从未被推动过的箱子（按箱子免检，而不是按格子）
+        
+        关卡变化时以当前停在死格上的箱子重新开始；之后某个格子上的箱子一旦离开，
+        该格子就不再免检，别的箱子被推到这里照常算死锁。
+        """
+        dead_squares = get_dead_squares(board, targets)
+        tracking = self._dead_box_tracking
+        if tracking is None or tracking[0] != dead_squares:
+            untouched = frozenset(boxes & dead_squares)
+        else:
+            untouched = tracking[2] - (tracking[1] - boxes)
+        self._dead_box_tracking = (dead_squares, frozenset(boxes), untouched)
+        return untouched
+    
+    def _get_dead_squares(self, state: Dict[str, Any]) -> FrozenSet[Tuple[int, int]]:
+        """获取状态的死格集合（关卡静态分析，同一关卡只计算一次）"""
+        dead_squares = state.get('dead_squares')
+        if dead_squares is None:
+            dead_squares = get_dead_squares(state['board'], state['targets'])
+            # 免检箱子所在的格子在该状态中不算死格
+            untouched = state.get('untouched_dead_boxes')
+            if untouched:
+                dead_squares = dead_squares - untouched
+        return dead_squares
+    
+    def _to_search_state(self, state: Dict[str, Any]) -> SokobanSearchState:
+        """字典状态 -> 紧凑搜索状态（已是紧凑状态时原样返回）"""
+        if isinstance(state, SokobanSearchState):
+            return state
+        static = get_static_map(state['board'], state['targets'])
+        return static.state(state['player_pos'], state['boxes'], state.get('untouched_dead_boxes', ()))
+    
+    def _state_to_key(self, state: Dict[str, Any]) -> SokobanSearchState:
+        """将状态转换为唯一键（紧凑搜索状态本身可哈希，哈希值预先计算）"""
+        return self._to_search_state(state)
+        
+    def _simulate_action(self, state: Dict[str, Any], action: str) -> Tuple[SokobanSearchState, bool]:
+        """模拟执行动作，只改动箱子位集和玩家格子"""
+        state = self._to_search_state(state)
+        direction = ACTION_INDEX.get(action)
+        if direction is None:
             return state, False
         
-        # 检查墙壁
-        if board[new_row, new_col] == 1:  # 墙壁
+        new_state = state.move(direction)
+        if new_state is None:
             return state, False
-        
-        # 检查是否有箱子
-        if (new_row, new_col) in boxes:
-            # 尝试推箱子
-            box_new_row, box_new_col = new_row + dr, new_col + dc
-            
-            # 检查箱子新位置
-            if (box_new_row < 0 or box_new_row >= board.shape[0] or 
-                box_new_col < 0 or box_new_col >= board.shape[1]):
-                return state, False
-            
-            if board[box_new_row, box_new_col] == 1:  # 墙壁
-                return state, False
-            
-            if (box_new_row, box_new_col) in boxes:  # 另一个箱子
-                return state, False
-            
-            # 移动箱子
-            boxes.remove((new_row, new_col))
-            boxes.add((box_new_row, box_new_col))
-        
-        # 创建新状态
-        new_state = {
-            'board': board,
-            'player_pos': (new_row, new_col),
-            'boxes': boxes,
-            'targets': targets
-        }
-        
         return new_state, True
     
     def _is_solved(self, state: Dict[str, Any]) -> bool:
         """检查是否解决"""
+        if isinstance(state, SokobanSearchState):
+            return state.is_solved()
         boxes = state['boxes']
         targets = state['targets']
         return boxes == targets
@@ -1410,51 +1569,17 @@ class SokobanAI(BaseAgent):
                             elif new_box_pos in targets:
                                 score += 500  # 直接推到目标超高奖励
         
-        # 死锁检测（简化版）
-        deadlock_count = 0
-        for box in unmatched_boxes:
-            row, col = box
-            # 检查是否在角落且不是目标
-            corner_walls = 0
-            if (row > 0 and state['board'][row-1, col] == 1) or row == 0:
-                corner_walls += 1
-            if (row < state['board'].shape[0]-1 and state['board'][row+1, col] == 1) or row == state['board'].shape[0]-1:
-                corner_walls += 1
-            if (col > 0 and state['board'][row, col-1] == 1) or col == 0:
-                corner_walls += 1
-            if (col < state['board'].shape[1]-1 and state['board'][row, col+1] == 1) or col == state['board'].shape[1]-1:
-                corner_walls += 1
-            
-            if corner_walls >= 2:  # 在角落
-                deadlock_count += 1
+        # 死锁检测：停在死格上的箱子
+        dead_squares = self._get_dead_squares(state)
+        deadlock_count = sum(1 for box in unmatched_boxes if box in dead_squares)
         
         score -= deadlock_count * 1000  # 死锁严重惩罚
         
         return score
     
     def _heuristic(self, state: Dict[str, Any]) -> float:
-        """启发式函数"""
-        boxes = state['boxes']
-        targets = state['targets']
-        
-        # 使用匈牙利算法的简化版本：最小距离匹配
-        unmatched_boxes = [box for box in boxes if box not in targets]
-        unmatched_targets = [target for target in targets if target not in boxes]
-        
-        if not unmatched_boxes:
-            return 0
-        
-        total_distance = 0
-        for box in unmatched_boxes:
-            min_distance = float('inf')
-            for target in unmatched_targets:
-                distance = abs(box[0] - target[0]) + abs(box[1] - target[1])
-                min_distance = min(min_distance, distance)
-            
-            if min_distance != float('inf'):
-                total_distance += min_distance
-        
-        return total_distance
+        """启发式函数：推动次数下界（最小代价匹配）"""
+        return self._push_lower_bound(state)
     
     def _detect_deadlocks(self, state: Dict[str, Any]) -> int:
         """检测死锁状态"""
@@ -1462,6 +1587,7 @@ class SokobanAI(BaseAgent):
         boxes = state['boxes']
         targets = state['targets']
         
+        dead_squares = self._get_dead_squares(state)
         deadlock_count = 0
         
         for box in boxes:
@@ -1470,8 +1596,8 @@ class SokobanAI(BaseAgent):
             
             row, col = box
             
-            # 检查角落死锁
-            if self._is_corner_deadlock(board, row, col):
+            # 检查死格（包含角落死锁）
+            if box in dead_squares:
                 deadlock_count += 1
             
             # 检查边缘死锁
@@ -1653,38 +1779,58 @@ class SokobanAI(BaseAgent):
         boxes = state['boxes']
         targets = state['targets']
         
-        # 检查简单的角落死锁
+        # 检查死格（包含角落死锁）
+        dead_squares = self._get_dead_squares(state)
         for box in boxes:
-            if box not in targets:
-                row, col = box
-                if self._is_corner_deadlock(board, row, col):
-                    return True
+            if box not in targets and box in dead_squares:
+                return True
         
         return False
     
     def _evaluate_state_cached(self, state: Dict[str, Any]) -> float:
         """带缓存的状态评估"""
         state_key = self._state_to_key(state)
-        
-        if state_key in self.state_cache:
-            return self.state_cache[state_key]
-        
-        score = self._evaluate_state(state)
-        self.state_cache[state_key] = score
-        
+        self._sync_cache_level(state_key)
+        score = self.eval_cache.get(state_key)
+        if score is None:
+            score = self._evaluate_state(state)
+            self.eval_cache.put(state_key, score)
         return score
     
     def _heuristic_cached(self, state: Dict[str, Any]) -> float:
-        """带缓存的启发式函数"""
-        state_key = f"h_{self._state_to_key(state)}"
-        
-        if state_key in self.state_cache:
-            return self.state_cache[state_key]
-        
-        score = self._heuristic(state)
-        self.state_cache[state_key] = score
-        
-        return score
+        """带缓存的启发式函数（下界只取决于箱子布局，按布局缓存）"""
+        return self._push_lower_bound(state)
+        
+    def _deadlock_check_cached(self, state: Dict[str, Any]) -> bool:
+        """带缓存的死锁检测（只取决于箱子布局和免检箱子）"""
+        state = self._to_search_state(state)
+        self._sync_cache_level(state)
+        key = (state.boxes, state.exempt) if state.exempt else state.boxes
+        deadlocked = self.deadlock_cache.get(key)
+        if deadlocked is None:
+            deadlocked = self._advanced_deadlock_check(state)
+            self.deadlock_cache.put(key, deadlocked)
+        return deadlocked
+        
+    def _sync_cache_level(self, state: SokobanSearchState):
+        """关卡（静态数据）变化时作废所有缓存：缓存键只包含箱子布局和玩家位置"""
+        if state.static is self._cache_level:
+            return
+        self._cache_level = state.static
+        self.heuristic_cache.clear()
+        self.eval_cache.clear()
+        self.deadlock_cache.clear()
+        
+    def get_info(self) -> Dict[str, Any]:
+        """获取AI信息"""
+        info = super().get_info()
+        info['caches'] = {
+            'heuristic': self.heuristic_cache.get_stats(),
+            'eval': self.eval_cache.get_stats(),
+            'deadlock': self.deadlock_cache.get_stats()
+        }
+        info['last_search_nodes'] = self.last_search_nodes
+        return info
 
     def _handle_urgent_situations(self, boxes: List[Tuple[int, int]], targets: List[Tuple[int, int]], 
                                  player_pos: Tuple[int, int], tactical_analysis: Dict[str, Any]) -> Optional[str]:
@@ -1946,6 +2092,14 @@ class SokobanAI(BaseAgent):
             print("❌ 目标位置是墙，无法到达")
             return None
         
+        # 绕开墙和箱子的最短路径
+        reachable, action = self._walk_path_action(player_pos, target_pos, board)
+        if action is not None:
+            print(f"✅ 沿最短路径移动: {action}")
+            return action
+        if reachable:
+            return None
+        
         # 选择最直接且有效的移动方向 - 优先处理距离更大的维度
         if abs(dx) >= abs(dy):
             # 优先垂直移动
@@ -2024,6 +2178,28 @@ class SokobanAI(BaseAgent):
         
         return True
     
+    def _walk_path_action(self, from_pos: Tuple[int, int], to_pos: Tuple[int, int],
+                          board: np.ndarray) -> Tuple[bool, Optional[str]]:
+        """
+        BFS求玩家绕开墙和箱子走到to_pos的最短路径
+        
+        Returns:
+            (是否能确定可达性, 第一步动作)；to_pos越界、是墙或是箱子时返回 (False, None)，
+            由调用方回退到原来的贪心移动；已在终点或不可达时返回 (True, None)
+        """
+        height, width = board.shape
+        if not (0 <= to_pos[0] < height and 0 <= to_pos[1] < width) or board[to_pos[0], to_pos[1]] in (1, 3, 4):
+            return False, None
+        
+        blocked = bytearray(((board == 1) | (board == 3) | (board == 4)).astype(np.uint8).tobytes())
+        path = get_pathfinder(height, width).bfs(blocked, tuple(from_pos), tuple(to_pos))
+        if len(path) < 2:
+            return True, None
+        
+        step = (path[1][0] - path[0][0], path[1][1] - path[0][1])
+        action = {(-1, 0): 'UP', (1, 0): 'DOWN', (0, -1): 'LEFT', (0, 1): 'RIGHT'}[step]
+        return True, action
+    
     def _move_towards_position(self, from_pos: Tuple[int, int], to_pos: Tuple[int, int]) -> str:
         """移动到指定位置"""
         dx = to_pos[0] - from_pos[0]
@@ -2268,7 +2444,7 @@ class SokobanAI(BaseAgent):
                 })
             else:
                 # 玩家需要先移动到推动位置
-                move_action = self._get_move_towards_position(player_pos, required_player_pos)
+                move_action = self._get_move_towards_position(player_pos, required_player_pos, state.get('board'))
                 if move_action:
                     actions.append({
                         'action': move_action,
@@ -2308,36 +2484,12 @@ class SokobanAI(BaseAgent):
     
     def _would_create_deadlock(self, box_pos: Tuple[int, int], state: Dict[str, Any]) -> bool:
         """检查在指定位置放置箱子是否会造成死锁"""
-        board = state['board']
-        targets = state['targets']
-        
         # 如果箱子在目标上，不会死锁
-        if box_pos in targets:
+        if box_pos in state['targets']:
             return False
         
-        row, col = box_pos
-        
-        # 检查是否在角落
-        if self._is_corner_position(box_pos, board):
-            return True
-        
-        # 检查是否靠墙且无法推向目标
-        wall_count = 0
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-        
-        for dr, dc in directions:
-            new_row, new_col = row + dr, col + dc
-            if (new_row < 0 or new_row >= board.shape[0] or 
-                new_col < 0 or new_col >= board.shape[1] or 
-                board[new_row, new_col] == 1):
-                wall_count += 1
-        
-        # 如果三面或四面都是墙，很可能死锁
-        if wall_count >= 3:
-            return True
-        
-        return False
-        return wall_count >= 3
+        # 死格包含角落、三面靠墙以及没有目标的墙边
+        return box_pos in self._get_dead_squares(state)
     
     def _is_corner_position(self, pos: Tuple[int, int], board: np.ndarray) -> bool:
         """检查位置是否在角落"""
@@ -2684,8 +2836,14 @@ class SokobanAI(BaseAgent):
         self.position_history.append(player_pos)
         self.action_history.append(action)
     
-    def _get_move_towards_position(self, from_pos: Tuple[int, int], to_pos: Tuple[int, int]) -> Optional[str]:
-        """计算朝向目标位置的移动动作"""
+    def _get_move_towards_position(self, from_pos: Tuple[int, int], to_pos: Tuple[int, int],
+                                   board: Optional[np.ndarray] = None) -> Optional[str]:
+        """计算朝向目标位置的移动动作（提供board时沿绕开墙和箱子的最短路径）"""
+        if board is not None:
+            reachable, action = self._walk_path_action(from_pos, to_pos, board)
+            if reachable:
+                return action
+        
         dx = to_pos[0] - from_pos[0]
         dy = to_pos[1] - from_pos[1]
         
@@ -4,17 +4,18 @@
 
 from .base_game import BaseGame
 from .base_env import BaseEnv
+from .async_vector_env import AsyncVectorEnv
 
 # 导入具体游戏
 try:
-    from .gomoku import GomokuGame, GomokuEnv
-    __all__ = ['BaseGame', 'BaseEnv', 'GomokuGame', 'GomokuEnv']
+    from .gomoku import GomokuGame, GomokuEnv, VecGomokuEnv
+    __all__ = ['BaseGame', 'BaseEnv', 'AsyncVectorEnv', 'GomokuGame', 'GomokuEnv', 'VecGomokuEnv']
 except ImportError:
-    __all__ = ['BaseGame', 'BaseEnv']
+    __all__ = ['BaseGame', 'BaseEnv', 'AsyncVectorEnv']
 
 try:
-    from .snake import SnakeGame, SnakeEnv
-    __all__.extend(['SnakeGame', 'SnakeEnv'])
+    from .snake import SnakeGame, SnakeEnv, VecSnakeEnv
+    __all__.extend(['SnakeGame', 'SnakeEnv', 'VecSnakeEnv'])
 except ImportError:
     pass
 
@@ -0,0 +1,305 @@
+"""
+异步子进程向量环境
+每个工作进程持有一部分环境，观察平面写入共享内存，父进程只通过管道收发动作和奖励
+"""
+
+import time
+import random
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Tuple, Any, Optional
+import numpy as np
+from games.base_env import BaseEnv
+
+
+def _worker(env_fns: List[Callable[[], BaseEnv]], env_offset: int, seeds: List[Optional[int]],
+            obs_name: str, final_name: str, shape: Tuple[int, ...], conn):
+    """
+    工作进程主循环
+    
+    Args:
+        env_fns: 本进程负责的环境构造函数
+        env_offset: 这些环境在全部环境中的起始下标
+        seeds: 每个环境的随机种子
+        obs_name: 观察共享内存的名字
+        final_name: 结束观察共享内存的名字
+        shape: 单个环境的观察平面形状
+        conn: 与父进程通信的管道
+    """
+    obs_shm = shared_memory.SharedMemory(name=obs_name)
+    final_shm = shared_memory.SharedMemory(name=final_name)
+    obs = final = None
+    try:
+        total = obs_shm.size // int(np.prod(shape))
+        obs = np.ndarray((total,) + shape, dtype=np.uint8, buffer=obs_shm.buf)
+        final = np.ndarray((total,) + shape, dtype=np.uint8, buffer=final_shm.buf)
+        
+        envs = [fn() for fn in env_fns]
+        rngs = [random.Random(seed) for seed in seeds]
+        # 构造时给定的种子同时作用于环境本身，之后不带种子的reset也可复现
+        for env, seed in zip(envs, seeds):
+            if seed is not None and hasattr(env, 'seed'):
+                env.seed(seed)
+        
+        def reset(i, seed=None):
+            env = envs[i]
+            if seed is not None and hasattr(env, 'seed'):
+                env.seed(seed)
+            env.reset()
+            env.get_observation_planes(out=obs[env_offset + i])
+        
+        while True:
+            command, data = conn.recv()
+            
+            if command == 'step':
+                count = len(envs)
+                rewards = np.zeros(count, dtype=np.float64)
+                terminated = np.zeros(count, dtype=bool)
+                truncated = np.zeros(count, dtype=bool)
+                winners = np.zeros(count, dtype=np.int8)
+                
+                for i, env in enumerate(envs):
+                    action = data[i] if data is not None else None
+                    if action is None:
+                        valid_actions = env.get_valid_actions()
+                        action = rngs[i].choice(valid_actions) if valid_actions else None
+                    
+                    if action is None:
+                        done, cut = True, False
+                    else:
+                        _, reward, done, cut, _ = env.step(action)
+                        rewards[i] = reward
+                    terminated[i] = done
+                    truncated[i] = cut
+                    
+                    if done or cut:
+                        winners[i] = env.game.get_winner() or 0
+                        env.get_observation_planes(out=final[env_offset + i])
+                        reset(i)
+                    else:
+                        env.get_observation_planes(out=obs[env_offset + i])
+                
+                conn.send((rewards, terminated, truncated, winners))
+            
+            elif command == 'reset':
+                for i in range(len(envs)):
+                    reset(i, data[i] if data is not None else None)
+                conn.send(None)
+            
+            elif command == 'call':
+                name, args = data
+                conn.send([getattr(env, name)(*args) for env in envs])
+            
+            elif command == 'close':
+                for env in envs:
+                    env.close()
+                conn.send(None)
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # 先释放对共享内存的引用才能close
+        obs = final = None
+        obs_shm.close()
+        final_shm.close()
+        conn.close()
+
+
+class AsyncVectorEnv:
+    """
+    异步子进程向量环境
+    
+    把env_fns均分给num_workers个子进程。环境需支持 observation_mode='planes'，
+    观察平面直接写入共享内存，父进程拿到的observations就是共享内存上的数组，不经过管道拷贝；
+    管道里只传动作列表和奖励/结束标记数组。
+    
+    结束的环境会在子进程内自动重置，结束时的观察放在 info['final_observation'] 中
+    （只有 info['_final_observation'] 为真的下标有效）。
+    """
+    
+    def __init__(self, env_fns: List[Callable[[], BaseEnv]], num_workers: Optional[int] = None,
+                 seed: Optional[int] = None, context: Optional[str] = None):
+        """
+        初始化向量环境
+        
+        Args:
+            env_fns: 环境构造函数列表，每个返回 observation_mode='planes' 的环境
+            num_workers: 工作进程数，默认取 min(环境数, CPU核数)
+            seed: 基础随机种子，第i个环境及其随机动作使用 seed + i
+            context: multiprocessing启动方式（'fork'、'spawn'等），默认使用平台默认值
+        """
+        self.num_envs = len(env_fns)
+        self.num_workers = max(1, min(num_workers or mp.cpu_count(), self.num_envs))
+        
+        # 在父进程构造一个环境以确定观察平面形状
+        probe = env_fns[0]()
+        probe.reset()
+        self.single_observation_shape = probe.get_observation_planes().shape
+        probe.close()
+        
+        shape = (self.num_envs,) + self.single_observation_shape
+        nbytes = max(1, int(np.prod(shape)))
+        self._obs_shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        self._final_shm = shared_memory.SharedMemory(create=True, size=nbytes)
+        self.observations = np.ndarray(shape, dtype=np.uint8, buffer=self._obs_shm.buf)
+        self._final_observations = np.ndarray(shape, dtype=np.uint8, buffer=self._final_shm.buf)
+        
+        seeds = [None if seed is None else seed + i for i in range(self.num_envs)]
+        bounds = np.linspace(0, self.num_envs, self.num_workers + 1).astype(int)
+        self._slices = [(int(bounds[w]), int(bounds[w + 1])) for w in range(self.num_workers)]
+        
+        ctx = mp.get_context(context)
+        self._conns = []
+        self._processes = []
+        for start, end in self._slices:
+            parent_conn, child_conn = ctx.Pipe()
+            process = ctx.Process(
+                target=_worker,
+                args=(env_fns[start:end], start, seeds[start:end], self._obs_shm.name,
+                      self._final_shm.name, self.single_observation_shape, child_conn),
+                daemon=True
+            )
+            process.start()
+            child_conn.close()
+            self._conns.append(parent_conn)
+            self._processes.append(process)
+        
+        self.total_steps = 0
+        self._step_time = 0.0
+        self.closed = False
+    
+    def reset(self, seed: Optional[int] = None) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """
+        重置所有环境
+        
+        Args:
+            seed: 基础随机种子，第i个环境使用 seed + i（None表示不重新设置）
+        
+        Returns:
+            observations: (N, C, H, W) 共享内存上的观察平面
+            info: 空字典
+        """
+        for conn, (start, end) in zip(self._conns, self._slices):
+            seeds = None if seed is None else [seed + i for i in range(start, end)]
+            conn.send(('reset', seeds))
+        for conn in self._conns:
+            conn.recv()
+        return self.observations, {}
+    
+    def step_async(self, actions: Optional[List[Any]] = None):
+        """
+        把动作发给各工作进程，不等待结果
+        
+        Args:
+            actions: 长度为N的动作列表；为None或某个元素为None时由子进程随机选择有效动作
+        """
+        self._step_start = time.perf_counter()
+        for conn, (start, end) in zip(self._conns, self._slices):
+            conn.send(('step', None if actions is None else list(actions[start:end])))
+    
+    def step_wait(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict[str, Any]]:
+        """等待step_async的结果"""
+        results = [conn.recv() for conn in self._conns]
+        rewards, terminated, truncated, winners = (np.concatenate(parts) for parts in zip(*results))
+        
+        self.total_steps += self.num_envs
+        self._step_time += time.perf_counter() - self._step_start
+        
+        finished = terminated | truncated
+        info = {
+            'winner': winners,
+            '_final_observation': finished
+        }
+        if finished.any():
+            info['final_observation'] = self._final_observations.copy()
+        return self.observations, rewards, terminated, truncated, info
+    
+    def step(self, actions: Optional[List[Any]] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict[str, Any]]:
+        """
+        所有环境执行一步
+        
+        Args:
+            actions: 长度为N的动作列表；为None时由子进程随机选择有效动作
+        
+        Returns:
+            observations: (N, C, H, W) 共享内存上的观察平面（下一步会被覆盖）
+            rewards: (N,) 奖励
+            terminated: (N,) 是否终止
+            truncated: (N,) 是否截断
+            info: winner、_final_observation、final_observation
+        """
+        self.step_async(actions)
+        return self.step_wait()
+    
+    def call(self, name: str, *args) -> List[Any]:
+        """在所有环境上调用方法并按环境顺序返回结果（如 get_valid_actions）"""
+        for conn in self._conns:
+            conn.send(('call', (name, args)))
+        results = []
+        for conn in self._conns:
+            results.extend(conn.recv())
+        return results
+    
+    def get_throughput(self) -> float:
+        """累计的环境步数/秒"""
+        return self.total_steps / self._step_time if self._step_time > 0 else 0.0
+    
+    def close(self) -> None:
+        """关闭工作进程并释放共享内存"""
+        if self.closed:
+            return
+        for conn in self._conns:
+            try:
+                conn.send(('close', None))
+                conn.recv()
+            except (BrokenPipeError, EOFError):
+                pass
+        for process in self._processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        for conn in self._conns:
+            conn.close()
+        
+        self.observations = self._final_observations = None
+        for shm in (self._obs_shm, self._final_shm):
+            try:
+                shm.close()
+            except BufferError:
+                pass  # 调用方仍持有observations的引用，随其释放
+            shm.unlink()
+        self.closed = True
+    
+    def __del__(self):
+        if not getattr(self, 'closed', True):
+            self.close()
+
+
+def benchmark_async_vector_env(env_fn: Callable[[], BaseEnv], num_envs: int,
+                               worker_counts: List[int], steps: int = 200,
+                               seed: Optional[int] = 0) -> Dict[int, float]:
+    """
+    测量不同工作进程数下的吞吐量
+    
+    Args:
+        env_fn: 环境构造函数（返回 observation_mode='planes' 的环境）
+        num_envs: 环境总数
+        worker_counts: 要测试的工作进程数列表
+        steps: 每种配置执行的向量步数
+        seed: 随机种子
+    
+    Returns:
+        {工作进程数: 环境步数/秒}
+    """
+    results = {}
+    for num_workers in worker_counts:
+        vec_env = AsyncVectorEnv([env_fn] * num_envs, num_workers=num_workers, seed=seed)
+        try:
+            vec_env.reset()
+            for _ in range(steps):
+                vec_env.step()
+            results[num_workers] = vec_env.get_throughput()
+        finally:
+            vec_env.close()
+        print(f"{num_workers} 个工作进程: {results[num_workers]:.0f} 步/秒")
+    return results
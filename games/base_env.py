@@ -13,10 +13,19 @@ from games.base_game import BaseGame
 class BaseEnv(ABC):
     """环境基类，实现gym风格接口"""
     
-    def __init__(self, game: BaseGame):
+    # 多通道观察平面的通道顺序，所有环境一致，不适用的通道保持为0
+    PLANE_NAMES = ['own', 'opponent', 'own_head', 'opponent_head',
+                   'food', 'wall', 'box', 'target', 'to_move']
+    OBSERVATION_MODES = ('board', 'planes')
+    
+    def __init__(self, game: BaseGame, observation_mode: str = 'board'):
+        if observation_mode not in self.OBSERVATION_MODES:
+            raise ValueError(f"未知的观察模式: {observation_mode}")
         self.game = game
+        self.observation_mode = observation_mode
         self.observation_space = None
         self.action_space = None
+        self._planes = None
         self._setup_spaces()
     
     @abstractmethod
@@ -50,6 +59,8 @@ class BaseEnv(ABC):
             if hasattr(self.game, 'handle_invalid_action'):
                 observation, reward, done, info = self.game.handle_invalid_action(action)
                 truncated = self.game.is_timeout()
+                if self.observation_mode == 'planes':
+                    observation = self._get_observation()
                 return observation, reward, done, truncated, info
             else:
                 return self._get_observation(), -1000, True, False, {'error': 'Invalid action'}
@@ -63,8 +74,48 @@ class BaseEnv(ABC):
         # 检查是否超时
         truncated = self.game.is_timeout()
         
+        if self.observation_mode == 'planes':
+            observation = self._get_observation()
+        
         return observation, reward, done, truncated, info
     
+    def get_observation_planes(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        获取多通道观察平面
+        
+        平面按PLANE_NAMES排列，形状为 (C, H, W)、类型为uint8，以当前玩家为"own"。
+        默认原地写入环境预分配的缓冲区，不产生新的数组；返回的是只读视图，
+        下一次调用会覆盖其内容，需要保留时请copy或传入自己的缓冲区。
+        
+        Args:
+            out: 可选的调用方缓冲区，须为同形状的uint8数组
+        
+        Returns:
+            观察平面的只读视图
+        """
+        shape = (len(self.PLANE_NAMES),) + tuple(self._get_plane_shape())
+        if out is None:
+            if self._planes is None or self._planes.shape != shape:
+                self._planes = np.zeros(shape, dtype=np.uint8)
+            out = self._planes
+        elif out.shape != shape or out.dtype != np.uint8:
+            raise ValueError(f"观察平面缓冲区应为 {shape} 的uint8数组，实际为 {out.shape} {out.dtype}")
+        
+        self._fill_planes(out)
+        view = out.view()
+        view.flags.writeable = False
+        return view
+    
+    @abstractmethod
+    def _get_plane_shape(self) -> Tuple[int, int]:
+        """观察平面的 (H, W)"""
+        pass
+    
+    @abstractmethod
+    def _fill_planes(self, planes: np.ndarray) -> None:
+        """把当前状态写入 (C, H, W) 平面"""
+        pass
+    
     def render(self, mode='human') -> Optional[np.ndarray]:
         """渲染环境"""
         if mode == 'human':
@@ -4,5 +4,6 @@
 
 from .gomoku_game import GomokuGame
 from .gomoku_env import GomokuEnv
+from .vec_gomoku_env import VecGomokuEnv
 
-__all__ = ['GomokuGame', 'GomokuEnv'] 
\ No newline at end of file
+__all__ = ['GomokuGame', 'GomokuEnv', 'VecGomokuEnv'] 
\ No newline at end of file
@@ -12,11 +12,11 @@ from games.gomoku.gomoku_game import GomokuGame
 class GomokuEnv(BaseEnv):
     """五子棋环境"""
     
-    def __init__(self, board_size: int = 15, win_length: int = 5):
+    def __init__(self, board_size: int = 15, win_length: int = 5, observation_mode: str = 'board'):
         self.board_size = board_size
         self.win_length = win_length
         game = GomokuGame(board_size, win_length)
-        super().__init__(game)
+        super().__init__(game, observation_mode)
     
     def _setup_spaces(self):
         """设置观察空间和动作空间"""
@@ -25,8 +25,32 @@ class GomokuEnv(BaseEnv):
     
     def _get_observation(self) -> np.ndarray:
         """获取观察"""
+        if self.observation_mode == 'planes':
+            return self.get_observation_planes()
         return self.game.board.copy()
     
+    def _get_plane_shape(self) -> Tuple[int, int]:
+        """观察平面的 (H, W)"""
+        return (self.board_size, self.board_size)
+    
+    def _fill_planes(self, planes: np.ndarray) -> None:
+        """己方/对方棋子，head通道为双方最近一手"""
+        board = self.game.board
+        player = self.game.current_player
+        np.equal(board, player, out=planes[0], casting='unsafe')
+        np.equal(board, 3 - player, out=planes[1], casting='unsafe')
+        planes[2:8] = 0
+        
+        seen = set()
+        for stone_player, (row, col) in reversed(self.game.history):
+            if stone_player not in seen:
+                seen.add(stone_player)
+                planes[2 if stone_player == player else 3, row, col] = 1
+                if len(seen) == 2:
+                    break
+        
+        planes[8] = 1 if player == 1 else 0
+    
     def _get_action_mask(self) -> np.ndarray:
         """获取动作掩码"""
         mask = np.zeros((self.board_size, self.board_size), dtype=bool)
@@ -85,6 +109,6 @@ class GomokuEnv(BaseEnv):
     def clone(self) -> 'GomokuEnv':
         """克隆环境"""
         cloned_game = self.game.clone()
-        cloned_env = GomokuEnv(self.board_size, self.win_length)
+        cloned_env = GomokuEnv(self.board_size, self.win_length, self.observation_mode)
         cloned_env.game = cloned_game
         return cloned_env 
\ No newline at end of file
@@ -0,0 +1,187 @@
+"""
+批量五子棋环境
+N个棋盘保存在一个 (N, H, W) 的int8数组中，批量落子并用向量化的线段求和判断胜负
+"""
+
+import numpy as np
+from typing import Dict, List, Tuple, Any
+from games.gomoku.gomoku_env import GomokuEnv
+
+
+class VecGomokuEnv:
+    """
+    批量五子棋环境
+    
+    与GomokuEnv的规则一致：落子方连成win_length即获胜（奖励1），
+    棋盘下满未分胜负为平局（奖励0.5），落在已有棋子处为无效动作（奖励-1000并结束）。
+    结束的对局会自动重置，结束时的棋盘放在 info['final_observation'] 中。
+    """
+    
+    def __init__(self, num_envs: int, board_size: int = 15, win_length: int = 5,
+                 auto_reset: bool = True):
+        """
+        初始化批量环境
+        
+        Args:
+            num_envs: 并行棋盘数
+            board_size: 棋盘大小
+            win_length: 获胜所需连子数
+            auto_reset: 结束的对局是否自动重置
+        """
+        self.num_envs = num_envs
+        self.board_size = board_size
+        self.win_length = win_length
+        self.auto_reset = auto_reset
+        
+        self.boards = np.zeros((num_envs, board_size, board_size), dtype=np.int8)
+        self.current_player = np.ones(num_envs, dtype=np.int8)
+        self.move_count = np.zeros(num_envs, dtype=np.int32)
+        self.dones = np.zeros(num_envs, dtype=bool)
+        self.winners = np.zeros(num_envs, dtype=np.int8)
+        self._env_index = np.arange(num_envs)
+    
+    def reset(self) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """重置所有棋盘"""
+        self._reset_games(np.ones(self.num_envs, dtype=bool))
+        return self.boards.copy(), {}
+    
+    def _reset_games(self, mask: np.ndarray):
+        """重置mask选中的棋盘"""
+        self.boards[mask] = 0
+        self.current_player[mask] = 1
+        self.move_count[mask] = 0
+        self.dones[mask] = False
+        self.winners[mask] = 0
+    
+    def step(self, actions) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict[str, Any]]:
+        """
+        所有棋盘同时落子
+        
+        Args:
+            actions: (N, 2) 的 (row, col) 坐标，或 (N,) 的扁平下标 row * W + col
+        
+        Returns:
+            observations: (N, H, W) 棋盘
+            rewards: (N,) 落子方视角的奖励
+            dones: (N,) 是否结束
+            truncated: (N,) 始终为False
+            info: 额外信息（winner、invalid_action、final_observation）
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        if actions.ndim == 2:
+            rows, cols = actions[:, 0], actions[:, 1]
+        else:
+            rows, cols = np.divmod(actions, self.board_size)
+        
+        idx = self._env_index
+        players = self.current_player.copy()
+        already_done = self.dones.copy()  # 仅在auto_reset=False时可能为真
+        inside = (rows >= 0) & (rows < self.board_size) & (cols >= 0) & (cols < self.board_size)
+        rows_c = np.clip(rows, 0, self.board_size - 1)
+        cols_c = np.clip(cols, 0, self.board_size - 1)
+        valid = inside & (self.boards[idx, rows_c, cols_c] == 0) & ~already_done
+        invalid = ~valid & ~already_done
+        
+        placed = idx[valid]
+        self.boards[placed, rows_c[valid], cols_c[valid]] = players[valid]
+        self.move_count[placed] += 1
+        
+        # 只需检查落子方是否连五
+        wins = np.zeros(self.num_envs, dtype=bool)
+        if placed.size:
+            mover_planes = self.boards[placed] == players[valid][:, None, None]
+            wins[placed] = self._has_line(mover_planes)
+        full = valid & ~wins & (self.move_count >= self.board_size * self.board_size)
+        
+        rewards = np.where(wins, 1.0, np.where(full, 0.5, 0.0))
+        rewards[invalid] = -1000.0
+        dones = wins | full | invalid | already_done
+        
+        self.winners[wins] = players[wins]
+        self.dones |= dones
+        switch = valid & ~dones
+        self.current_player[switch] = 3 - self.current_player[switch]
+        
+        info = {
+            'winner': np.where(wins, players, 0),
+            'invalid_action': invalid
+        }
+        
+        if self.auto_reset and dones.any():
+            info['final_observation'] = self.boards.copy()
+            self._reset_games(dones)
+        
+        return self.boards.copy(), rewards, dones, np.zeros(self.num_envs, dtype=bool), info
+    
+    def _has_line(self, planes: np.ndarray) -> np.ndarray:
+        """
+        检查每个棋盘平面是否存在win_length连子
+        
+        等价于沿四个方向与全1核做一维卷积后判断是否达到win_length：
+        把平面沿方向平移k-1次做逻辑与，任一窗口全为真即连成一线。
+        
+        Args:
+            planes: (M, H, W) 布尔平面
+        
+        Returns:
+            (M,) 布尔数组
+        """
+        k = self.win_length
+        size = self.board_size
+        result = np.zeros(planes.shape[0], dtype=bool)
+        if size < k:
+            return result
+        
+        span = size - k + 1
+        # 水平、垂直
+        horizontal = planes[:, :, 0:span].copy()
+        vertical = planes[:, 0:span, :].copy()
+        for i in range(1, k):
+            horizontal &= planes[:, :, i:i + span]
+            vertical &= planes[:, i:i + span, :]
+        result |= horizontal.any(axis=(1, 2)) | vertical.any(axis=(1, 2))
+        
+        # 主对角线、副对角线
+        diagonal = planes[:, 0:span, 0:span].copy()
+        anti_diagonal = planes[:, 0:span, k - 1:size].copy()
+        for i in range(1, k):
+            diagonal &= planes[:, i:i + span, i:i + span]
+            anti_diagonal &= planes[:, i:i + span, k - 1 - i:size - i]
+        result |= diagonal.any(axis=(1, 2)) | anti_diagonal.any(axis=(1, 2))
+        return result
+    
+    def get_winner(self) -> np.ndarray:
+        """(N,) 当前棋盘上连成一线的玩家（0表示无）"""
+        winners = np.zeros(self.num_envs, dtype=np.int8)
+        for player in (1, 2):
+            winners[self._has_line(self.boards == player)] = player
+        return winners
+    
+    def get_action_mask(self) -> np.ndarray:
+        """(N, H, W) 有效动作掩码"""
+        return self.boards == 0
+    
+    def get_valid_actions(self, env_index: int) -> List[Tuple[int, int]]:
+        """某个棋盘的有效落子列表"""
+        rows, cols = np.nonzero(self.boards[env_index] == 0)
+        return list(zip(rows.tolist(), cols.tolist()))
+    
+    def make_env(self, env_index: int) -> GomokuEnv:
+        """
+        把某个棋盘复制成GomokuEnv，供现有的 agent.get_action(observation, env) 使用
+        
+        Args:
+            env_index: 棋盘下标
+        
+        Returns:
+            与该棋盘状态相同的GomokuEnv
+        """
+        env = GomokuEnv(self.board_size, self.win_length)
+        env.game.board = self.boards[env_index].astype(int)
+        env.game.current_player = int(self.current_player[env_index])
+        env.game.move_count = int(self.move_count[env_index])
+        return env
+    
+    def close(self) -> None:
+        """关闭环境"""
+        pass
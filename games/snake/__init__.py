@@ -1,4 +1,6 @@
 from .snake_game import SnakeGame
+from .multi_snake_game import MultiSnakeGame
 from .snake_env import SnakeEnv
+from .vec_snake_env import VecSnakeEnv
  
-__all__ = ['SnakeGame', 'SnakeEnv'] 
\ No newline at end of file
+__all__ = ['SnakeGame', 'MultiSnakeGame', 'SnakeEnv', 'VecSnakeEnv'] 
\ No newline at end of file
@@ -0,0 +1,425 @@
+"""
+多人贪吃蛇游戏逻辑
+P条蛇同时行动，适用于大棋盘上的多人对战和压力测试
+"""
+
+import math
+import random
+import time
+import numpy as np
+from collections import deque
+from typing import Dict, List, Tuple, Any, Optional, Sequence
+from ..base_game import BaseGame
+from .snake_game import ReadOnlyState
+import config
+
+
+class MultiSnakeGame(BaseGame):
+    """
+    P人贪吃蛇游戏（同时行动）
+    
+    所有蛇在同一步提交方向并同时结算：
+        - 撞墙或撞到任意蛇身（尾部此时尚未移开，同样算碰撞，与SnakeGame一致）的蛇死亡；
+        - 多个蛇头进入同一格子时，最长的蛇存活，其余死亡（长度相同则全部死亡）；
+        - 死亡的蛇从棋盘上移除，其格子重新变为空格。
+    存活的蛇不超过一条时对局结束，剩下的那条蛇获胜。
+    
+    蛇身按玩家下标保存在列表中，所有蛇共享一个占用网格（bytearray），
+    食物从空闲格子索引中O(1)抽取。
+    """
+    
+    # 占用网格的格子编码（蛇身用玩家编号1..P表示）
+    CELL_EMPTY = 0
+    CELL_FOOD = 255
+    
+    DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+    
+    def __init__(self, board_size: int = 20, num_players: int = 4, food_count: Optional[int] = None,
+                 seed: Optional[int] = None):
+        """
+        初始化游戏
+        
+        Args:
+            board_size: 棋盘大小
+            num_players: 蛇的数量（1..254）
+            food_count: 同时存在的食物数量，默认为蛇的数量
+            seed: 食物生成的随机种子
+        """
+        if not 1 <= num_players < self.CELL_FOOD:
+            raise ValueError(f"蛇的数量应在 1..{self.CELL_FOOD - 1} 之间: {num_players}")
+        if board_size * board_size < num_players:
+            raise ValueError("棋盘太小，放不下所有的蛇")
+        
+        self.board_size = board_size
+        self.num_players = num_players
+        self.food_count = food_count if food_count is not None else num_players
+        self.rng = random.Random(seed)
+        
+        # 按玩家下标保存（下标0不使用，与玩家编号1..P对齐）
+        self.snakes = [deque() for _ in range(num_players + 1)]
+        self.directions = [(0, 1)] * (num_players + 1)
+        self.alive = [False] + [True] * num_players
+        
+        self.foods = []
+        self.food_set = set()
+        
+        self._grid = bytearray(board_size * board_size)
+        self._free_cells = []
+        self._free_slot = []
+        self._board = np.zeros((board_size, board_size), dtype=np.int32)
+        self._board_view = self._readonly_view(self._board)
+        
+        self._version = 0
+        self._state_cache = None
+        self._state_key = None
+        
+        game_config = {
+            'board_size': board_size,
+            'num_players': num_players,
+            'food_count': self.food_count,
+            'timeout': config.GAME_CONFIGS['snake']['timeout'],
+            'max_moves': config.GAME_CONFIGS['snake']['max_moves']
+        }
+        super().__init__(game_config)
+    
+    def reset(self) -> Dict[str, Any]:
+        """重置游戏状态：蛇头均匀分布在棋盘上，长度为1"""
+        size = self.board_size
+        cell_count = size * size
+        self._grid = bytearray(cell_count)
+        self._free_cells = list(range(cell_count))
+        self._free_slot = list(range(cell_count))
+        self._board = np.zeros((size, size), dtype=np.int32)
+        self._board_view = self._readonly_view(self._board)
+        
+        self.snakes = [deque()]
+        self.directions = [(0, 1)]
+        self.alive = [False]
+        for player, pos in enumerate(self._spawn_positions(), start=1):
+            index = pos[0] * size + pos[1]
+            self._grid[index] = player
+            self._board[pos] = 2 * player - 1
+            self._take_free_cell(index)
+            self.snakes.append(deque([pos]))
+            # 左半边的蛇向右，右半边的蛇向左
+            self.directions.append((0, 1) if pos[1] < size // 2 else (0, -1))
+            self.alive.append(True)
+        
+        self.foods = []
+        self.food_set = set()
+        self._generate_foods()
+        
+        self.current_player = 1
+        self.game_state = config.GameState.ONGOING
+        self.move_count = 0
+        self.history = []
+        self._version += 1
+        
+        return self.get_state()
+    
+    def _spawn_positions(self) -> List[Tuple[int, int]]:
+        """把P个出生点均匀铺在 k x k 的格点上"""
+        size = self.board_size
+        k = math.ceil(math.sqrt(self.num_players))
+        coords = [min(size - 1, (2 * i + 1) * size // (2 * k)) for i in range(k)]
+        positions = [(row, col) for row in coords for col in coords]
+        if len(set(positions)) < self.num_players:
+            # 棋盘相对蛇的数量太小时，退回到按行填满
+            positions = [divmod(i, size) for i in range(self.num_players)]
+        return positions[:self.num_players]
+    
+    def seed(self, seed: Optional[int] = None):
+        """设置本局食物生成的随机种子"""
+        self.rng.seed(seed)
+    
+    def step(self, actions: Sequence[Optional[Tuple[int, int]]]) -> Tuple[Dict[str, Any], List[float], bool, Dict[str, Any]]:
+        """
+        所有蛇同时移动一步
+        
+        Args:
+            actions: 长度为P的方向列表（下标i对应玩家i+1），None表示保持当前方向；
+                     死亡的蛇的动作被忽略
+        
+        Returns:
+            observation: 观察状态
+            rewards: 长度为P的奖励列表（本步死亡-1，获胜+1）
+            done: 是否结束
+            info: 额外信息（alive、lengths、died）
+        """
+        self._version += 1
+        size = self.board_size
+        grid = self._grid
+        snakes = self.snakes
+        alive = self.alive
+        
+        # 1. 计算新蛇头，撞墙或撞蛇身的蛇死亡；记录每个目标格子的蛇
+        died = []
+        claims = {}
+        for player in range(1, self.num_players + 1):
+            if not alive[player]:
+                continue
+            direction = actions[player - 1]
+            if direction is None:
+                direction = self.directions[player]
+            self.directions[player] = direction
+            
+            x, y = snakes[player][0]
+            x += direction[0]
+            y += direction[1]
+            if x < 0 or x >= size or y < 0 or y >= size:
+                died.append(player)
+                continue
+            index = x * size + y
+            cell = grid[index]
+            if cell != self.CELL_EMPTY and cell != self.CELL_FOOD:
+                died.append(player)
+                continue
+            claims.setdefault(index, []).append(player)
+        
+        # 2. 头对头：同一格子只保留严格最长的蛇
+        moves = []
+        for index, players in claims.items():
+            if len(players) > 1:
+                lengths = [len(snakes[p]) for p in players]
+                longest = max(lengths)
+                winners = [p for p, length in zip(players, lengths) if length == longest]
+                for p in players:
+                    if len(winners) > 1 or p != winners[0]:
+                        died.append(p)
+                if len(winners) > 1:
+                    continue
+                players = winners
+            moves.append((players[0], index))
+        
+        # 3. 存活的蛇前进；吃到食物的蛇变长，其余移走尾部（棋盘只重画变化的格子）
+        board = self._board
+        eaten = 0
+        for player, index in moves:
+            snake = snakes[player]
+            cell = grid[index]
+            pos = divmod(index, size)
+            board[snake[0]] = 2 * player
+            board[pos] = 2 * player - 1
+            snake.appendleft(pos)
+            grid[index] = player
+            if cell == self.CELL_FOOD:
+                self.foods.remove(pos)
+                self.food_set.discard(pos)
+                eaten += 1
+            else:
+                self._take_free_cell(index)
+                tail = snake.pop()
+                tail_index = tail[0] * size + tail[1]
+                grid[tail_index] = self.CELL_EMPTY
+                board[tail] = 0
+                self._release_free_cell(tail_index)
+        
+        # 4. 移除死亡的蛇
+        for player in died:
+            alive[player] = False
+            for x, y in snakes[player]:
+                index = x * size + y
+                grid[index] = self.CELL_EMPTY
+                board[x, y] = 0
+                self._release_free_cell(index)
+            snakes[player].clear()
+        
+        if eaten or died:
+            self._generate_foods()
+        
+        done = self.is_terminal()
+        winner = self.get_winner() if done else None
+        rewards = [0.0] * self.num_players
+        for player in died:
+            rewards[player - 1] = -1.0
+        if winner is not None:
+            rewards[winner - 1] = 1.0
+        
+        self.move_count += 1
+        self.last_move_time = time.time()
+        
+        info = {
+            'alive': self.alive[1:],
+            'lengths': [len(snake) for snake in snakes[1:]],
+            'died': died
+        }
+        return self.get_state(), rewards, done, info
+    
+    def get_valid_actions(self, player: int = None) -> List[Tuple[int, int]]:
+        """获取某条蛇的有效动作（长度大于1时不能反向）"""
+        if player is None:
+            player = self.current_player
+        if not self.alive[player]:
+            return []
+        if len(self.snakes[player]) < 2:
+            return list(self.DIRECTIONS)
+        direction = self.directions[player]
+        reverse = (-direction[0], -direction[1])
+        return [action for action in self.DIRECTIONS if action != reverse]
+    
+    def is_terminal(self) -> bool:
+        """存活的蛇不超过一条（单人局为全部死亡）时结束"""
+        alive_count = sum(self.alive)
+        return alive_count == 0 or (self.num_players > 1 and alive_count <= 1)
+    
+    def get_winner(self) -> Optional[int]:
+        """获取获胜者（唯一存活的蛇，全部死亡为平局）"""
+        if not self.is_terminal() or self.num_players == 1:
+            return None
+        for player in range(1, self.num_players + 1):
+            if self.alive[player]:
+                return player
+        return None
+    
+    def update_game_state(self):
+        """更新游戏状态（获胜者可以是任意玩家编号，记为 'player{p}_win'）"""
+        winner = self.get_winner()
+        if winner is None:
+            super().update_game_state()
+        else:
+            self.game_state = f'player{winner}_win'
+    
+    def get_state(self) -> Dict[str, Any]:
+        """
+        获取当前游戏状态（只读视图，状态变化前一直缓存）
+        
+        棋盘编码推广了SnakeGame：玩家p的蛇头为 2p-1、蛇身为 2p，食物为 2P+1。
+        棋盘是引擎增量维护的棋盘的只读视图，每步原地更新（不随棋盘面积重建），
+        需要保留某一步的棋盘时请copy。
+        """
+        key = (self._version, self.move_count)
+        if self._state_cache is not None and self._state_key == key:
+            return self._state_cache
+        
+        self._state_cache = ReadOnlyState({
+            'board': self._board_view,
+            'snakes': tuple(tuple(snake) for snake in self.snakes[1:]),
+            'foods': tuple(self.foods),
+            'directions': tuple(self.directions[1:]),
+            'alive': tuple(self.alive[1:]),
+            'num_players': self.num_players,
+            'current_player': self.current_player,
+            'game_state': self.game_state,
+            'move_count': self.move_count
+        })
+        self._state_key = key
+        return self._state_cache
+    
+    @staticmethod
+    def _readonly_view(board: np.ndarray) -> np.ndarray:
+        """返回棋盘的只读视图"""
+        view = board.view()
+        view.flags.writeable = False
+        return view
+    
+    def render(self) -> np.ndarray:
+        """渲染游戏画面"""
+        return self.get_state()['board']
+    
+    def clone(self) -> 'MultiSnakeGame':
+        """克隆游戏状态"""
+        cloned_game = MultiSnakeGame.__new__(MultiSnakeGame)
+        cloned_game.__dict__.update(self.__dict__)
+        cloned_game.game_config = self.game_config.copy()
+        cloned_game.snakes = [snake.copy() for snake in self.snakes]
+        cloned_game.directions = self.directions[:]
+        cloned_game.alive = self.alive[:]
+        cloned_game.foods = self.foods.copy()
+        cloned_game.food_set = self.food_set.copy()
+        cloned_game._grid = self._grid[:]
+        cloned_game._free_cells = self._free_cells[:]
+        cloned_game._free_slot = self._free_slot[:]
+        cloned_game._board = self._board.copy()
+        cloned_game._board_view = self._readonly_view(cloned_game._board)
+        cloned_game._state_cache = None
+        cloned_game.rng = random.Random()
+        cloned_game.rng.setstate(self.rng.getstate())
+        cloned_game.history = self.history.copy()
+        return cloned_game
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        """序列化时不保存状态视图缓存和棋盘视图（反序列化后重建）"""
+        state = self.__dict__.copy()
+        state['_state_cache'] = None
+        del state['_board_view']
+        return state
+    
+    def __setstate__(self, state: Dict[str, Any]):
+        """恢复状态并重建指向棋盘的只读视图"""
+        self.__dict__.update(state)
+        self._board_view = self._readonly_view(self._board)
+    
+    def is_blocked(self, pos: Tuple[int, int]) -> bool:
+        """检查位置是否越界或被蛇身占据（O(1)）"""
+        x, y = pos
+        if x < 0 or x >= self.board_size or y < 0 or y >= self.board_size:
+            return True
+        cell = self._grid[x * self.board_size + y]
+        return cell != self.CELL_EMPTY and cell != self.CELL_FOOD
+    
+    def _take_free_cell(self, index: int):
+        """从空闲索引中移除格子（与末尾交换后弹出，O(1)）"""
+        slot = self._free_slot[index]
+        last = self._free_cells.pop()
+        if last != index:
+            self._free_cells[slot] = last
+            self._free_slot[last] = slot
+        self._free_slot[index] = -1
+    
+    def _release_free_cell(self, index: int):
+        """把格子放回空闲索引（O(1)）"""
+        self._free_slot[index] = len(self._free_cells)
+        self._free_cells.append(index)
+    
+    def _generate_foods(self):
+        """生成食物：直接从空闲格子中均匀抽取，棋盘已满时不再生成"""
+        grid = self._grid
+        free_cells = self._free_cells
+        while len(self.foods) < self.food_count and free_cells:
+            index = free_cells[self.rng.randrange(len(free_cells))]
+            self._take_free_cell(index)
+            pos = divmod(index, self.board_size)
+            grid[index] = self.CELL_FOOD
+            self._board[pos] = 2 * self.num_players + 1
+            self.foods.append(pos)
+            self.food_set.add(pos)
+
+
+def benchmark_multi_snake(num_players: int = 16, board_size: int = 128, steps: int = 2000,
+                          with_observation: bool = False, seed: int = 0) -> float:
+    """
+    测量多人贪吃蛇引擎的吞吐量
+    
+    每步为每条存活的蛇随机选择一个有效方向（动作预先生成，不计入耗时），对局结束后自动重置。
+    
+    Args:
+        num_players: 蛇的数量
+        board_size: 棋盘大小
+        steps: 执行的步数
+        with_observation: 每步是否读取棋盘观察
+        seed: 随机种子
+    
+    Returns:
+        步数/秒
+    """
+    rng = random.Random(seed)
+    game = MultiSnakeGame(board_size, num_players=num_players, seed=seed)
+    directions = MultiSnakeGame.DIRECTIONS
+    action_lists = [[rng.choice(directions) if rng.random() < 0.2 else None for _ in range(num_players)]
+                    for _ in range(steps)]
+    
+    elapsed = 0.0
+    games = 1
+    for actions in action_lists:
+        start = time.perf_counter()
+        _, _, done, _ = game.step(actions)
+        if with_observation:
+            game.get_state()['board']
+        elapsed += time.perf_counter() - start
+        if done:
+            game.reset()
+            games += 1
+    
+    throughput = steps / elapsed if elapsed > 0 else 0.0
+    print(f"{num_players} 条蛇 {board_size}x{board_size}: {throughput:.0f} 步/秒（{games} 局）")
+    return throughput
@@ -7,15 +7,50 @@ import numpy as np
 from typing import Dict, List, Tuple, Any, Optional
 from games.base_env import BaseEnv
 from games.snake.snake_game import SnakeGame
+from games.snake.multi_snake_game import MultiSnakeGame
 
 
 class SnakeEnv(BaseEnv):
-    """贪吃蛇环境"""
+    """
+    贪吃蛇环境
     
-    def __init__(self, board_size=20, **kwargs):
+    num_players=2 时为双人轮流行动的SnakeGame；其他人数使用同时行动的MultiSnakeGame，
+    此时step接收长度为num_players的动作列表，返回每名玩家的奖励列表。
+    """
+    
+    def __init__(self, board_size=20, seed=None, observation_mode='board', num_players=2, **kwargs):
         self.board_size = board_size
-        self.game = SnakeGame(board_size)
-        super().__init__(self.game)
+        self.num_players = num_players
+        if num_players == 2:
+            self.game = SnakeGame(board_size, seed=seed)
+        else:
+            self.game = MultiSnakeGame(board_size, num_players=num_players, seed=seed,
+                                       food_count=kwargs.get('food_count'))
+        super().__init__(self.game, observation_mode)
+    
+    @property
+    def is_multiplayer(self) -> bool:
+        """是否为同时行动的多人模式"""
+        return isinstance(self.game, MultiSnakeGame)
+    
+    def step(self, action):
+        """
+        执行动作
+        
+        多人模式下 action 为长度num_players的方向列表（None表示保持方向），
+        返回 (observation, rewards列表, done, truncated, info)。
+        """
+        if not self.is_multiplayer:
+            return super().step(action)
+        
+        observation, rewards, done, info = self.game.step(action)
+        self.game.update_game_state()
+        truncated = self.game.is_timeout() or self.game.is_max_moves_reached()
+        if self.observation_mode == 'planes':
+            observation = self._get_observation()
+        else:
+            observation = observation['board']
+        return observation, rewards, done, truncated, info
 
     def _setup_spaces(self):
         """设置观察空间和动作空间"""
@@ -23,15 +58,60 @@ class SnakeEnv(BaseEnv):
         self.action_space = None
 
     def _get_observation(self):
-        """获取观察"""
-        state = self.game.get_state()
-        return state['board'].copy()
+        """获取观察（只读棋盘，可直接共享）"""
+        if self.observation_mode == 'planes':
+            return self.get_observation_planes()
+        return self.game.get_state()['board']
+
+    def _get_plane_shape(self):
+        """观察平面的 (H, W)"""
+        return (self.board_size, self.board_size)
+
+    def _fill_planes(self, planes):
+        """己方/对方蛇身（含蛇头）、蛇头和食物，直接从引擎维护的棋盘生成"""
+        if self.is_multiplayer:
+            self._fill_multiplayer_planes(planes)
+            return
+        board = self.game.live_board
+        player = self.game.current_player
+        for own, p in ((0, player), (1, 3 - player)):
+            np.equal(board, SnakeGame.BOARD_HEAD[p], out=planes[own + 2], casting='unsafe')
+            np.equal(board, SnakeGame.BOARD_BODY[p], out=planes[own], casting='unsafe')
+            planes[own] |= planes[own + 2]
+        np.equal(board, SnakeGame.BOARD_FOOD, out=planes[4], casting='unsafe')
+        planes[5:8] = 0
+        planes[8] = 1 if player == 1 else 0
+    
+    def _fill_multiplayer_planes(self, planes):
+        """多人模式：own为当前玩家，opponent为其他所有蛇；所有蛇同时行动，to_move全为1"""
+        game = self.game
+        board = game.get_state()['board']
+        player = game.current_player
+        food = 2 * game.num_players + 1
+        
+        np.not_equal(board, 0, out=planes[1], casting='unsafe')
+        planes[1] &= board != food  # 所有蛇身
+        np.equal(board, 2 * player - 1, out=planes[2], casting='unsafe')
+        np.equal(board, 2 * player, out=planes[0], casting='unsafe')
+        planes[0] |= planes[2]
+        planes[1] ^= planes[0]  # 去掉己方
+        planes[3] = 0
+        for other in range(1, game.num_players + 1):
+            if other != player and game.snakes[other]:
+                planes[3][game.snakes[other][0]] = 1
+        np.equal(board, food, out=planes[4], casting='unsafe')
+        planes[5:8] = 0
+        planes[8] = 1
 
     def _get_action_mask(self):
         """获取动作掩码"""
         # 贪吃蛇所有方向都可能有效，但要避免直接掉头
         return np.ones(4, dtype=bool)  # [up, down, left, right]
 
+    def seed(self, seed=None):
+        """设置食物生成的随机种子"""
+        self.game.seed(seed)
+
     def get_valid_actions(self):
         """获取有效动作"""
         return self.game.get_valid_actions()
@@ -52,13 +132,14 @@ class SnakeEnv(BaseEnv):
         return self.game.render()
 
     def get_board_state(self):
-        """获取棋盘状态"""
-        state = self.game.get_state()
-        return state['board'].copy()
+        """获取棋盘状态（只读）"""
+        return self.game.get_state()['board']
 
-    def get_snake_positions(self) -> Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]:
-        """获取蛇的位置"""
+    def get_snake_positions(self) -> Tuple[Tuple[Tuple[int, int], ...], ...]:
+        """获取蛇的位置（多人模式下按玩家编号排列）"""
         state = self.game.get_state()
+        if self.is_multiplayer:
+            return state['snakes']
         return state['snake1'], state['snake2']
     
     def get_food_positions(self) -> List[Tuple[int, int]]:
@@ -73,6 +154,15 @@ class SnakeEnv(BaseEnv):
     def get_game_info(self) -> Dict[str, Any]:
         """获取游戏信息"""
         info = self.game.get_game_info()
+        if self.is_multiplayer:
+            info.update({
+                'board_size': self.board_size,
+                'num_players': self.num_players,
+                'food_count': self.game.food_count,
+                'lengths': [len(snake) for snake in self.game.snakes[1:]],
+                'alive': self.game.alive[1:]
+            })
+            return info
         info.update({
             'board_size': self.board_size,
             'initial_length': self.game.initial_length,
@@ -87,6 +177,7 @@ class SnakeEnv(BaseEnv):
     def clone(self):
         """克隆环境"""
         cloned_game = self.game.clone()
-        cloned_env = SnakeEnv(self.board_size)
+        cloned_env = SnakeEnv(self.board_size, observation_mode=self.observation_mode,
+                              num_players=self.num_players)
         cloned_env.game = cloned_game
         return cloned_env 
\ No newline at end of file
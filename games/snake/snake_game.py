@@ -5,28 +5,83 @@
 import numpy as np
 import random
 import time
+from collections import deque
 from typing import Dict, List, Tuple, Any, Optional
 from ..base_game import BaseGame
 import config
 
 
+class ReadOnlyState(dict):
+    """get_state返回的只读状态字典：禁止修改，复制或序列化时得到普通字典"""
+    
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("游戏状态是只读的，请先复制为普通字典")
+    
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+    
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+
 class SnakeGame(BaseGame):
     """双人贪吃蛇游戏"""
     
-    def __init__(self, board_size: int = 20, initial_length: int = 3, food_count: int = 5):
+    # 占用网格的格子编码（蛇身用玩家编号1/2表示）
+    CELL_EMPTY = 0
+    CELL_FOOD = 3
+    
+    # get_state()['board'] 中的编码
+    BOARD_HEAD = {1: 1, 2: 3}
+    BOARD_BODY = {1: 2, 2: 4}
+    BOARD_FOOD = 5
+    
+    # 各棋盘大小的Zobrist随机键（固定种子，不同对局之间的哈希可比较）
+    _ZOBRIST_KEYS = {}
+    _ZOBRIST_STATE_KEYS = {}
+    DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+    
+    def __init__(self, board_size: int = 20, initial_length: int = 3, food_count: int = 5,
+                 seed: Optional[int] = None):
         # 先设置实例属性
         self.board_size = board_size
         self.initial_length = initial_length
         self.food_count = food_count
         
-        # 蛇的位置和方向
-        self.snake1 = []  # 玩家1的蛇
-        self.snake2 = []  # 玩家2的蛇
+        # 每局独立的随机数生成器，用于食物生成（可复现）
+        self.rng = random.Random(seed)
+        
+        # 蛇的位置和方向（蛇头在左端）
+        self.snake1 = deque()  # 玩家1的蛇
+        self.snake2 = deque()  # 玩家2的蛇
         self.direction1 = (0, 1)  # 玩家1的方向
         self.direction2 = (0, -1)  # 玩家2的方向
         
-        # 食物位置
+        # 食物位置（列表保持对外接口，集合用于O(1)查询）
         self.foods = []
+        self.food_set = set()
+        
+        # 占用网格：grid[x * board_size + y] 为格子编码，与蛇身/食物保持同步
+        self._grid = bytearray(board_size * board_size)
+        
+        # 被蛇身占据的格子集合的Zobrist哈希，随移动增量更新
+        self._zobrist = self._zobrist_keys(board_size)
+        self.occupancy_hash = 0
+        
+        # 完整局面哈希中随移动增量更新的部分（区分玩家的蛇头/蛇身格子、食物格子）
+        self._state_keys = self._zobrist_state_keys(board_size)
+        self._cells_hash = 0
+        
+        # 空闲格子索引：_free_cells 为空格列表，_free_slot[cell] 为其在列表中的位置（-1表示不空闲）
+        self._free_cells = []
+        self._free_slot = []
+        
+        # 增量绘制的棋盘和缓存的只读状态视图
+        self._board = np.zeros((board_size, board_size), dtype=int)
+        self._board_shared = False  # 棋盘已被状态视图或克隆引用，写入前需先复制
+        self._version = 0  # 蛇身/食物/存活状态每次变化时递增
+        self._state_cache = None
+        self._state_key = None
         
         # 游戏状态
         self.alive1 = True
@@ -48,15 +103,41 @@ class SnakeGame(BaseGame):
         """重置游戏状态"""
         # 初始化蛇的位置
         center = self.board_size // 2
-        self.snake1 = [(center, center - 2)]
-        self.snake2 = [(center, center + 2)]
+        self.snake1 = deque([(center, center - 2)])
+        self.snake2 = deque([(center, center + 2)])
         
         # 初始化方向
         self.direction1 = (0, 1)  # 向右
         self.direction2 = (0, -1)  # 向左
         
+        # 初始化占用网格和空闲格子索引
+        cell_count = self.board_size * self.board_size
+        self._grid = bytearray(cell_count)
+        self._free_cells = list(range(cell_count))
+        self._free_slot = list(range(cell_count))
+        self.occupancy_hash = 0
+        self._cells_hash = 0
+        for player, snake in ((1, self.snake1), (2, self.snake2)):
+            head_keys = self._state_keys['head'][player]
+            body_keys = self._state_keys['body'][player]
+            for i, (x, y) in enumerate(snake):
+                index = x * self.board_size + y
+                self._grid[index] = player
+                self._take_free_cell(index)
+                self.occupancy_hash ^= self._zobrist[index]
+                self._cells_hash ^= head_keys[index] if i == 0 else body_keys[index]
+        
+        # 初始化棋盘
+        self._board = np.zeros((self.board_size, self.board_size), dtype=int)
+        self._board_shared = False
+        for i, (x, y) in enumerate(self.snake1):
+            self._board[x, y] = self.BOARD_HEAD[1] if i == 0 else self.BOARD_BODY[1]
+        for i, (x, y) in enumerate(self.snake2):
+            self._board[x, y] = self.BOARD_HEAD[2] if i == 0 else self.BOARD_BODY[2]
+        
         # 初始化食物
         self.foods = []
+        self.food_set = set()
         self._generate_foods()
         
         # 重置游戏状态
@@ -66,9 +147,71 @@ class SnakeGame(BaseGame):
         self.game_state = config.GameState.ONGOING
         self.move_count = 0
         self.history = []
+        self._version += 1
         
         return self.get_state()
     
+    @classmethod
+    def _zobrist_keys(cls, board_size: int) -> List[int]:
+        """获取某个棋盘大小的每格64位随机键"""
+        keys = cls._ZOBRIST_KEYS.get(board_size)
+        if keys is None:
+            rng = random.Random(board_size)
+            keys = [rng.getrandbits(64) for _ in range(board_size * board_size)]
+            cls._ZOBRIST_KEYS[board_size] = keys
+        return keys
+    
+    @classmethod
+    def _zobrist_state_keys(cls, board_size: int) -> Dict[str, Any]:
+        """获取某个棋盘大小的完整局面Zobrist键（蛇头、蛇身、食物、方向、存活、行动方）"""
+        keys = cls._ZOBRIST_STATE_KEYS.get(board_size)
+        if keys is None:
+            rng = random.Random(f"snake-state-{board_size}")
+            cell_count = board_size * board_size
+            
+            def table():
+                return [rng.getrandbits(64) for _ in range(cell_count)]
+            
+            keys = {
+                'head': {1: table(), 2: table()},
+                'body': {1: table(), 2: table()},
+                'food': table(),
+                'direction': {(player, direction): rng.getrandbits(64)
+                              for player in (1, 2) for direction in cls.DIRECTIONS},
+                'dead': {1: rng.getrandbits(64), 2: rng.getrandbits(64)},
+                'player2_to_move': rng.getrandbits(64),
+                'opening': rng.getrandbits(64)
+            }
+            cls._ZOBRIST_STATE_KEYS[board_size] = keys
+        return keys
+    
+    @property
+    def state_hash(self) -> int:
+        """
+        完整局面的64位Zobrist哈希（O(1)）
+        
+        格子部分（各玩家的蛇头/蛇身、食物）随移动增量维护，方向、存活、行动方和
+        开局阶段（前两步允许任意方向）在读取时合入。蛇身位置相同但食物、方向或
+        行动方不同的局面哈希不同，可直接作为置换表的键。
+        """
+        keys = self._state_keys
+        value = self._cells_hash
+        value ^= keys['direction'].get((1, self.direction1), 0)
+        value ^= keys['direction'].get((2, self.direction2), 0)
+        if not self.alive1:
+            value ^= keys['dead'][1]
+        if not self.alive2:
+            value ^= keys['dead'][2]
+        if self.current_player == 2:
+            value ^= keys['player2_to_move']
+        if self.move_count < 2:
+            value ^= keys['opening']
+        return value
+    
+    def seed(self, seed: Optional[int] = None):
+        """设置本局食物生成的随机种子"""
+        self.rng.seed(seed)
+    
     def step(self, action: Tuple[int, int]) -> Tuple[Dict[str, Any], float, bool, Dict[str, Any]]:
         """
         执行一步动作
@@ -82,6 +225,8 @@ class SnakeGame(BaseGame):
             done: 是否结束
             info: 额外信息
         """
+        self._version += 1
+        
         # 更新方向
         if self.current_player == 1:
             self.direction1 = action
@@ -163,61 +308,89 @@ class SnakeGame(BaseGame):
             return None  # 平局
     
     def get_state(self) -> Dict[str, Any]:
-        """获取当前游戏状态"""
-        # 创建棋盘
-        board = np.zeros((self.board_size, self.board_size), dtype=int)
-        
-        # 绘制蛇1
-        for i, (x, y) in enumerate(self.snake1):
-            if 0 <= x < self.board_size and 0 <= y < self.board_size:
-                board[x, y] = 1 if i == 0 else 2  # 头部为1，身体为2
-        
-        # 绘制蛇2
-        for i, (x, y) in enumerate(self.snake2):
-            if 0 <= x < self.board_size and 0 <= y < self.board_size:
-                board[x, y] = 3 if i == 0 else 4  # 头部为3，身体为4
-        
-        # 绘制食物
-        for x, y in self.foods:
-            if 0 <= x < self.board_size and 0 <= y < self.board_size:
-                board[x, y] = 5
+        """
+        获取当前游戏状态
         
-        return {
-            'board': board,
-            'snake1': self.snake1.copy(),
-            'snake2': self.snake2.copy(),
-            'foods': self.foods.copy(),
+        返回的是只读视图：按需构建并在游戏状态变化前一直缓存，调用方可以直接共享，
+        无需复制。棋盘为只读数组（头部1/3，身体2/4，食物5），蛇身和食物为元组。
+        """
+        key = (self._version, self.current_player, self.game_state, self.move_count)
+        if self._state_cache is not None and self._state_key == key:
+            return self._state_cache
+        
+        self._state_cache = ReadOnlyState({
+            'board': self._board_view(),
+            'snake1': tuple(self.snake1),
+            'snake2': tuple(self.snake2),
+            'foods': tuple(self.foods),
             'direction1': self.direction1,
             'direction2': self.direction2,
             'alive1': self.alive1,
             'alive2': self.alive2,
             'current_player': self.current_player,
-            'valid_actions': self.get_valid_actions(),
+            'valid_actions': tuple(self.get_valid_actions()),
             'game_state': self.game_state,
             'move_count': self.move_count
-        }
+        })
+        self._state_key = key
+        return self._state_cache
+    
+    def _board_view(self) -> np.ndarray:
+        """返回当前棋盘的只读视图（写时复制，之后的移动不会改变该视图）"""
+        view = self._board.view()
+        view.flags.writeable = False
+        self._board_shared = True
+        return view
+    
+    @property
+    def live_board(self) -> np.ndarray:
+        """
+        当前棋盘的只读视图（不做快照）
+        
+        与get_state()['board']不同，之后的移动会原地改变它，只适合立即读取（如生成观察平面），
+        读取不会触发下一次移动时的写时复制。
+        """
+        view = self._board.view()
+        view.flags.writeable = False
+        return view
+    
+    def _paint(self, pos: Tuple[int, int], code: int):
+        """增量更新棋盘上的一个格子"""
+        if self._board_shared:
+            self._board = self._board.copy()
+            self._board_shared = False
+        self._board[pos] = code
     
     def render(self) -> np.ndarray:
         """渲染游戏画面"""
-        state = self.get_state()
-        return state['board']
+        return self._board_view()
     
     def clone(self) -> 'SnakeGame':
         """克隆游戏状态"""
-        cloned_game = SnakeGame(self.board_size, self.initial_length, self.food_count)
+        # 不经过构造函数，避免克隆时重新reset（重建索引、生成食物）
+        cloned_game = SnakeGame.__new__(SnakeGame)
+        cloned_game.__dict__.update(self.__dict__)
+        cloned_game.game_config = self.game_config.copy()
         cloned_game.snake1 = self.snake1.copy()
         cloned_game.snake2 = self.snake2.copy()
-        cloned_game.direction1 = self.direction1
-        cloned_game.direction2 = self.direction2
         cloned_game.foods = self.foods.copy()
-        cloned_game.alive1 = self.alive1
-        cloned_game.alive2 = self.alive2
-        cloned_game.current_player = self.current_player
-        cloned_game.game_state = self.game_state
-        cloned_game.move_count = self.move_count
+        cloned_game.food_set = self.food_set.copy()
+        cloned_game._grid = self._grid[:]
+        cloned_game._free_cells = self._free_cells[:]
+        cloned_game._free_slot = self._free_slot[:]
+        cloned_game.rng = random.Random()
+        cloned_game.rng.setstate(self.rng.getstate())
+        cloned_game._board_shared = True
+        self._board_shared = True
         cloned_game.history = self.history.copy()
         return cloned_game
     
+    def __getstate__(self) -> Dict[str, Any]:
+        """序列化时不保存状态视图缓存（反序列化后按需重建）"""
+        state = self.__dict__.copy()
+        state['_state_cache'] = None
+        return state
+    
     def get_action_space(self):
         """获取动作空间"""
         return [(-1, 0), (1, 0), (0, -1), (0, 1)]
@@ -231,6 +404,14 @@ class SnakeGame(BaseGame):
             'foods': []
         }
     
+    def is_blocked(self, pos: Tuple[int, int]) -> bool:
+        """检查位置是否越界或被蛇身占据（O(1)）"""
+        x, y = pos
+        if x < 0 or x >= self.board_size or y < 0 or y >= self.board_size:
+            return True
+        cell = self._grid[x * self.board_size + y]
+        return cell != self.CELL_EMPTY and cell != self.CELL_FOOD
+    
     def _move_snake(self, player: int):
         """移动蛇"""
         if player == 1:
@@ -258,17 +439,11 @@ class SnakeGame(BaseGame):
                 self.alive2 = False
             return
         
-        # 检查自身碰撞
-        if new_head in snake:
-            if player == 1:
-                self.alive1 = False
-            else:
-                self.alive2 = False
-            return
-        
-        # 检查与对方蛇的碰撞
-        other_snake = self.snake2 if player == 1 else self.snake1
-        if new_head in other_snake:
+        # 检查与自身或对方蛇的碰撞（尾部此时尚未移开，同样算碰撞）
+        grid = self._grid
+        index = new_head[0] * self.board_size + new_head[1]
+        cell = grid[index]
+        if cell != self.CELL_EMPTY and cell != self.CELL_FOOD:
             if player == 1:
                 self.alive1 = False
             else:
@@ -276,25 +451,90 @@ class SnakeGame(BaseGame):
             return
         
         # 移动蛇
-        snake.insert(0, new_head)
+        head_keys = self._state_keys['head'][player]
+        body_keys = self._state_keys['body'][player]
+        head_index = head[0] * self.board_size + head[1]
+        self._cells_hash ^= head_keys[head_index] ^ body_keys[head_index] ^ head_keys[index]
+        self._paint(head, self.BOARD_BODY[player])
+        snake.appendleft(new_head)
+        grid[index] = player
+        self.occupancy_hash ^= self._zobrist[index]
+        if cell == self.CELL_EMPTY:
+            self._take_free_cell(index)
+        self._paint(new_head, self.BOARD_HEAD[player])
         
         # 检查是否吃到食物
-        if new_head in self.foods:
+        if cell == self.CELL_FOOD:
+            self._cells_hash ^= self._state_keys['food'][index]
             self.foods.remove(new_head)
+            self.food_set.discard(new_head)
             self._generate_foods()
         else:
-            snake.pop()
+            tail = snake.pop()
+            tail_index = tail[0] * self.board_size + tail[1]
+            grid[tail_index] = self.CELL_EMPTY
+            self.occupancy_hash ^= self._zobrist[tail_index]
+            self._cells_hash ^= body_keys[tail_index]
+            self._release_free_cell(tail_index)
+            self._paint(tail, 0)
+    
+    def set_foods(self, positions: List[Tuple[int, int]]):
+        """
+        替换当前所有食物（用于构造局面或与其他引擎同步）
+        
+        Args:
+            positions: 新的食物坐标，必须是空格子
+        """
+        food_keys = self._state_keys['food']
+        for pos in self.foods:
+            index = pos[0] * self.board_size + pos[1]
+            self._grid[index] = self.CELL_EMPTY
+            self._cells_hash ^= food_keys[index]
+            self._release_free_cell(index)
+            self._paint(pos, 0)
+        self.foods = []
+        self.food_set = set()
+        
+        for pos in positions:
+            pos = (int(pos[0]), int(pos[1]))
+            index = pos[0] * self.board_size + pos[1]
+            if self._grid[index] != self.CELL_EMPTY:
+                raise ValueError(f"食物位置已被占用: {pos}")
+            self._grid[index] = self.CELL_FOOD
+            self._cells_hash ^= food_keys[index]
+            self._take_free_cell(index)
+            self.foods.append(pos)
+            self.food_set.add(pos)
+            self._paint(pos, self.BOARD_FOOD)
+        self._version += 1
+    
+    def _take_free_cell(self, index: int):
+        """从空闲索引中移除格子（与末尾交换后弹出，O(1)）"""
+        slot = self._free_slot[index]
+        last = self._free_cells.pop()
+        if last != index:
+            self._free_cells[slot] = last
+            self._free_slot[last] = slot
+        self._free_slot[index] = -1
+    
+    def _release_free_cell(self, index: int):
+        """把格子放回空闲索引（O(1)）"""
+        self._free_slot[index] = len(self._free_cells)
+        self._free_cells.append(index)
     
     def _generate_foods(self):
-        """生成食物"""
-        while len(self.foods) < self.food_count:
-            x = random.randint(0, self.board_size - 1)
-            y = random.randint(0, self.board_size - 1)
-            pos = (x, y)
-            
-            # 确保食物不在蛇身上
-            if pos not in self.snake1 and pos not in self.snake2 and pos not in self.foods:
-                self.foods.append(pos)
+        """生成食物：直接从空闲格子中均匀抽取，棋盘已满时不再生成"""
+        grid = self._grid
+        free_cells = self._free_cells
+        while len(self.foods) < self.food_count and free_cells:
+            index = free_cells[self.rng.randrange(len(free_cells))]
+            self._take_free_cell(index)
+            pos = divmod(index, self.board_size)
+            grid[index] = self.CELL_FOOD
+            self._cells_hash ^= self._state_keys['food'][index]
+            self.foods.append(pos)
+            self.food_set.add(pos)
+            self._paint(pos, self.BOARD_FOOD)
     
     def _check_game_over(self) -> bool:
         """检查游戏是否结束"""
@@ -328,6 +568,8 @@ class SnakeGame(BaseGame):
             done: 游戏是否结束
             info: 额外信息
         """
+        self._version += 1
+        
         # 让当前玩家死亡
         if self.current_player == 1:
             self.alive1 = False
@@ -0,0 +1,233 @@
+"""
+批量贪吃蛇环境
+用numpy数组同时推进N局贪吃蛇，规则与SnakeGame/SnakeEnv一致
+"""
+
+import numpy as np
+from typing import Dict, List, Tuple, Any, Optional
+
+
+class VecSnakeEnv:
+    """
+    批量贪吃蛇环境
+    
+    N局游戏的状态保存在堆叠的数组中：
+        occupancy: (N, H*W) 格子占用者（0空，1/2为对应玩家的蛇身）
+        food:      (N, H*W) 食物掩码
+        body:      (N, 2, H*W) 环形缓冲区保存的蛇身格子索引，head_ptr指向蛇头
+        length:    (N, 2) 蛇长
+        direction: (N, 2) 当前方向（ACTIONS中的下标）
+        alive:     (N, 2) 存活标记
+    
+    与SnakeEnv一样每步只移动当前玩家的蛇，动作为ACTIONS中的下标；
+    结束的对局会自动重置，结束时的观察放在 info['final_observation'] 中。
+    """
+    
+    # 与 SnakeGame.get_action_space() 的顺序一致：上、下、左、右
+    ACTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+    REVERSE = np.array([1, 0, 3, 2], dtype=np.int8)
+    
+    def __init__(self, num_envs: int, board_size: int = 20, food_count: int = 5,
+                 seed: Optional[int] = None, max_moves: Optional[int] = None):
+        """
+        初始化批量环境
+        
+        Args:
+            num_envs: 并行游戏局数
+            board_size: 棋盘大小
+            food_count: 每局食物数量
+            seed: 随机种子
+            max_moves: 每局最大步数，达到后截断并重置（None表示不限制，与SnakeEnv一致）
+        """
+        self.num_envs = num_envs
+        self.board_size = board_size
+        self.food_count = food_count
+        self.max_moves = max_moves
+        self.cell_count = board_size * board_size
+        self.rng = np.random.default_rng(seed)
+        
+        self._dr = np.array([a[0] for a in self.ACTIONS], dtype=np.int64)
+        self._dc = np.array([a[1] for a in self.ACTIONS], dtype=np.int64)
+        self._env_index = np.arange(num_envs)
+        
+        n, cells = num_envs, self.cell_count
+        self.occupancy = np.zeros((n, cells), dtype=np.int8)
+        self.food = np.zeros((n, cells), dtype=bool)
+        self.body = np.zeros((n, 2, cells), dtype=np.int32)
+        self.head_ptr = np.zeros((n, 2), dtype=np.int32)
+        self.length = np.zeros((n, 2), dtype=np.int32)
+        self.direction = np.zeros((n, 2), dtype=np.int8)
+        self.alive = np.ones((n, 2), dtype=bool)
+        self.current_player = np.ones(n, dtype=np.int8)
+        self.move_count = np.zeros(n, dtype=np.int32)
+        
+        self.reset()
+    
+    def reset(self, seed: Optional[int] = None) -> Tuple[np.ndarray, Dict[str, Any]]:
+        """重置所有对局"""
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self._reset_games(np.ones(self.num_envs, dtype=bool))
+        return self._get_observation(), {}
+    
+    def _reset_games(self, mask: np.ndarray):
+        """重置mask选中的对局（与SnakeGame.reset一致）"""
+        games = np.flatnonzero(mask)
+        if games.size == 0:
+            return
+        
+        center = self.board_size // 2
+        start = np.array([center * self.board_size + center - 2,
+                          center * self.board_size + center + 2], dtype=np.int32)
+        
+        self.occupancy[games] = 0
+        self.food[games] = False
+        self.head_ptr[games] = 0
+        self.length[games] = 1
+        self.body[games, :, 0] = start
+        self.occupancy[games, start[0]] = 1
+        self.occupancy[games, start[1]] = 2
+        self.direction[games] = (3, 2)  # 玩家1向右，玩家2向左
+        self.alive[games] = True
+        self.current_player[games] = 1
+        self.move_count[games] = 0
+        
+        self._refill_food(games)
+    
+    def _refill_food(self, games: np.ndarray):
+        """把选中对局的食物补足到food_count（与SnakeGame._generate_foods一致，棋盘满时停止）"""
+        while games.size:
+            games = games[self.food[games].sum(axis=1) < self.food_count]
+            if games.size == 0:
+                return
+            free = (self.occupancy[games] == 0) & ~self.food[games]
+            keys = self.rng.random(free.shape)
+            keys[~free] = -1.0
+            cells = keys.argmax(axis=1)
+            has_free = free[np.arange(games.size), cells]
+            self.food[games[has_free], cells[has_free]] = True
+            games = games[has_free]
+    
+    def step(self, actions) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, Dict[str, Any]]:
+        """
+        所有对局同时执行当前玩家的动作
+        
+        Args:
+            actions: (N,) 动作下标
+        
+        Returns:
+            observations: (N, H, W) 棋盘
+            rewards: (N,) 当前玩家视角的奖励
+            dones: (N,) 是否结束
+            truncated: (N,) 是否因步数上限截断
+            info: 额外信息（winner、final_observation等）
+        """
+        actions = np.asarray(actions, dtype=np.int64)
+        idx = self._env_index
+        player = self.current_player.astype(np.int64) - 1
+        width = self.board_size
+        
+        # 反向移动视为无效动作，当前玩家直接失败
+        valid = (self.move_count < 2) | (actions != self.REVERSE[self.direction[idx, player]])
+        self.alive[idx[~valid], player[~valid]] = False
+        
+        moving = valid & self.alive[idx, player]
+        self.direction[idx[moving], player[moving]] = actions[moving]
+        
+        # 计算新蛇头
+        head = self.body[idx, player, self.head_ptr[idx, player]].astype(np.int64)
+        row = head // width + self._dr[actions]
+        col = head % width + self._dc[actions]
+        inside = (row >= 0) & (row < width) & (col >= 0) & (col < width)
+        target = np.where(inside, row * width + col, 0)
+        blocked = ~inside | (self.occupancy[idx, target] != 0)
+        
+        dying = moving & blocked
+        self.alive[idx[dying], player[dying]] = False
+        
+        # 前进：压入新蛇头
+        ok = moving & ~blocked
+        g, p, t = idx[ok], player[ok], target[ok]
+        ptr = (self.head_ptr[g, p] - 1) % self.cell_count
+        self.head_ptr[g, p] = ptr
+        self.body[g, p, ptr] = t
+        self.length[g, p] += 1
+        self.occupancy[g, t] = p + 1
+        
+        # 吃到食物则补充食物，否则释放尾部
+        eat = self.food[g, t]
+        self.food[g[eat], t[eat]] = False
+        shrink_tail = ~eat
+        g2, p2 = g[shrink_tail], p[shrink_tail]
+        tail_ptr = (self.head_ptr[g2, p2] + self.length[g2, p2] - 1) % self.cell_count
+        self.occupancy[g2, self.body[g2, p2, tail_ptr]] = 0
+        self.length[g2, p2] -= 1
+        self._refill_food(g[eat])
+        
+        # 结束判定与奖励
+        mover_alive = self.alive[idx, player]
+        other_alive = self.alive[idx, 1 - player]
+        dones = ~(self.alive[:, 0] & self.alive[:, 1])
+        rewards = np.where(~mover_alive, -1.0, np.where(~other_alive, 1.0, 0.0))
+        
+        self.current_player = np.where(dones, self.current_player, 3 - self.current_player).astype(np.int8)
+        self.move_count += 1
+        
+        if self.max_moves is not None:
+            truncated = ~dones & (self.move_count >= self.max_moves)
+        else:
+            truncated = np.zeros(self.num_envs, dtype=bool)
+        
+        winner = np.where(self.alive[:, 0] & ~self.alive[:, 1], 1,
+                          np.where(self.alive[:, 1] & ~self.alive[:, 0], 2, 0))
+        info = {
+            'winner': np.where(dones, winner, 0),
+            'invalid_action': ~valid,
+            'snake1_length': self.length[:, 0].copy(),
+            'snake2_length': self.length[:, 1].copy()
+        }
+        
+        finished = dones | truncated
+        if finished.any():
+            info['final_observation'] = self._get_observation()
+            self._reset_games(finished)
+        
+        return self._get_observation(), rewards, dones, truncated, info
+    
+    def _get_observation(self) -> np.ndarray:
+        """批量棋盘观察，编码与SnakeGame.get_state()['board']一致"""
+        board = np.zeros((self.num_envs, self.cell_count), dtype=int)
+        board[self.occupancy == 1] = 2
+        board[self.occupancy == 2] = 4
+        board[self.food] = 5
+        idx = self._env_index
+        for p, code in ((0, 1), (1, 3)):
+            has_body = self.length[:, p] > 0
+            heads = self.body[idx, p, self.head_ptr[:, p]]
+            board[idx[has_body], heads[has_body]] = code
+        return board.reshape(self.num_envs, self.board_size, self.board_size)
+    
+    def get_action_mask(self) -> np.ndarray:
+        """(N, 4) 有效动作掩码（排除当前玩家的反向移动）"""
+        idx = self._env_index
+        player = self.current_player.astype(np.int64) - 1
+        reverse = self.REVERSE[self.direction[idx, player]]
+        mask = np.arange(4)[None, :] != reverse[:, None]
+        mask[self.move_count < 2] = True
+        return mask
+    
+    def get_snake(self, env_index: int, player: int) -> List[Tuple[int, int]]:
+        """获取某局某玩家的蛇身坐标（蛇头在前）"""
+        p = player - 1
+        ptr = self.head_ptr[env_index, p]
+        length = self.length[env_index, p]
+        cells = self.body[env_index, p, (ptr + np.arange(length)) % self.cell_count]
+        return [divmod(int(cell), self.board_size) for cell in cells]
+    
+    def get_foods(self, env_index: int) -> List[Tuple[int, int]]:
+        """获取某局的食物坐标"""
+        return [divmod(int(cell), self.board_size) for cell in np.flatnonzero(self.food[env_index])]
+    
+    def close(self) -> None:
+        """关闭环境"""
+        pass
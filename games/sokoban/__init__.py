@@ -4,5 +4,6 @@
 
 from .sokoban_game import SokobanGame
 from .sokoban_env import SokobanEnv
+from .level_registry import SokobanLevel, LevelRegistry, level_registry
 
-__all__ = ['SokobanGame', 'SokobanEnv']
+__all__ = ['SokobanGame', 'SokobanEnv', 'SokobanLevel', 'LevelRegistry', 'level_registry']
@@ -0,0 +1,220 @@
+"""
+推箱子关卡注册表
+进程内每个关卡文件只解析一次，生成只读关卡对象供所有SokobanGame实例共享；
+文件修改时间变化时自动重新加载（如关卡编辑器保存后）
+"""
+
+import json
+import os
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+from utils.sokoban_analysis import compute_dead_squares
+
+
+DEFAULT_LEVELS_FILE = os.path.join(os.path.dirname(__file__), 'levels.json')
+
+# 关卡文件不存在时使用的默认关卡
+DEFAULT_LEVELS_DATA = {
+    "levels": [{
+        "id": 1,
+        "name": "默认关卡",
+        "map": [
+            "########",
+            "#      #",
+            "# $@   #",
+            "#    . #",
+            "#      #",
+            "########"
+        ]
+    }]
+}
+
+# 关卡列表为空时使用的最小关卡
+FALLBACK_LEVEL = {"id": 1, "name": "默认", "map": ["####", "#@.#", "####"]}
+
+
+class SokobanLevel:
+    """
+    只读关卡对象
+    
+    解析结果：
+        - board: 初始棋盘（元组的元组，短行用空地补齐）
+        - walls: 墙壁位图，bytes，下标为 row * width + col
+        - target_map: 目标点位图，下标同上
+        - dead_squares: 死格位图（箱子推到这里后再也到不了任何目标），下标同上
+        - targets: 目标点集合
+        - boxes / boxes_on_targets: 初始箱子位置
+        - player1_spawn / player2_spawn: 地图中的出生点（没有时为None）
+        - info: 原始关卡数据（名称、难度、描述等）的只读视图
+    """
+    
+    __slots__ = ('level_id', 'info', 'height', 'width', 'board', 'walls', 'target_map', 'dead_squares',
+                 'targets', 'boxes', 'boxes_on_targets', 'player1_spawn', 'player2_spawn')
+    
+    def __init__(self, level_data: Dict[str, Any]):
+        """
+        解析关卡
+        
+        Args:
+            level_data: 关卡文件中的单个关卡字典
+        """
+        level_map = level_data['map']
+        height = len(level_map)
+        width = max(len(row) for row in level_map)
+        
+        board = [[' '] * width for _ in range(height)]
+        walls = bytearray(height * width)
+        targets = set()
+        boxes = set()
+        boxes_on_targets = set()
+        player1_spawn = None
+        player2_spawn = None
+        
+        # 解析规则与SokobanGame的符号约定一致：第一个'@'为玩家1，第二个'@'或'&'为玩家2
+        player_count = 0
+        for row, line in enumerate(level_map):
+            for col, char in enumerate(line):
+                pos = (row, col)
+                if char == '#':
+                    board[row][col] = '#'
+                    walls[row * width + col] = 1
+                elif char == '.':
+                    targets.add(pos)
+                    board[row][col] = '.'
+                elif char == '$':
+                    boxes.add(pos)
+                    board[row][col] = '$'
+                elif char == '*':
+                    targets.add(pos)
+                    boxes.add(pos)
+                    boxes_on_targets.add(pos)
+                    board[row][col] = '*'
+                elif char == '@':
+                    if player_count == 0:
+                        player1_spawn = pos
+                        board[row][col] = '@'
+                    else:
+                        player2_spawn = pos
+                        board[row][col] = '&'
+                    player_count += 1
+                elif char == '&':
+                    player2_spawn = pos
+                    board[row][col] = '&'
+                    player_count += 1
+                elif char == '+':
+                    player1_spawn = pos
+                    targets.add(pos)
+                    board[row][col] = '+'
+                    player_count += 1
+        
+        setattr_ = object.__setattr__
+        setattr_(self, 'level_id', level_data.get('id'))
+        setattr_(self, 'info', MappingProxyType(level_data))
+        setattr_(self, 'height', height)
+        setattr_(self, 'width', width)
+        setattr_(self, 'board', tuple(tuple(row) for row in board))
+        setattr_(self, 'walls', bytes(walls))
+        target_map = bytearray(height * width)
+        for row, col in targets:
+            target_map[row * width + col] = 1
+        setattr_(self, 'target_map', bytes(target_map))
+        setattr_(self, 'dead_squares', compute_dead_squares(walls, height, width, targets))
+        setattr_(self, 'targets', frozenset(targets))
+        setattr_(self, 'boxes', frozenset(boxes))
+        setattr_(self, 'boxes_on_targets', frozenset(boxes_on_targets))
+        setattr_(self, 'player1_spawn', player1_spawn)
+        setattr_(self, 'player2_spawn', player2_spawn)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError("SokobanLevel是只读对象")
+    
+    def is_wall(self, row: int, col: int) -> bool:
+        """判断格子是否为墙壁（越界视为墙壁）"""
+        if 0 <= row < self.height and 0 <= col < self.width:
+            return self.walls[row * self.width + col] == 1
+        return True
+    
+    def is_dead_square(self, row: int, col: int) -> bool:
+        """判断箱子停在该格子是否必然无解（越界视为死格）"""
+        if 0 <= row < self.height and 0 <= col < self.width:
+            return self.dead_squares[row * self.width + col] == 1
+        return True
+    
+    def __repr__(self) -> str:
+        return f"SokobanLevel(id={self.level_id}, {self.height}x{self.width}, boxes={len(self.boxes)})"
+
+
+class LevelRegistry:
+    """
+    关卡注册表
+    
+    按文件路径缓存 (修改时间, 原始数据, {关卡ID: SokobanLevel})。每次查询只做一次
+    os.stat，修改时间没变就直接返回已解析的对象。
+    """
+    
+    def __init__(self):
+        self._packs = {}
+        self.loads = 0
+    
+    def get_pack(self, path: Optional[str] = None) -> Tuple[Mapping[str, Any], Dict[int, SokobanLevel]]:
+        """
+        获取关卡文件的解析结果
+        
+        Args:
+            path: 关卡文件路径，默认为包内的levels.json
+        
+        Returns:
+            (原始数据的只读视图, {关卡ID: SokobanLevel})
+        """
+        path = path or DEFAULT_LEVELS_FILE
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime = None
+        
+        pack = self._packs.get(path)
+        if pack is not None and pack[0] == mtime:
+            return pack[1], pack[2]
+        
+        if mtime is None:
+            data = DEFAULT_LEVELS_DATA
+        else:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        
+        levels = {}
+        for level_data in data.get('levels', []):
+            levels.setdefault(level_data['id'], SokobanLevel(level_data))
+        
+        pack = (mtime, MappingProxyType(data), levels)
+        self._packs[path] = pack
+        self.loads += 1
+        return pack[1], pack[2]
+    
+    def get_levels_data(self, path: Optional[str] = None) -> Mapping[str, Any]:
+        """获取原始关卡数据（只读）"""
+        return self.get_pack(path)[0]
+    
+    def get_level(self, level_id: int, path: Optional[str] = None) -> SokobanLevel:
+        """
+        获取关卡
+        
+        找不到指定关卡时返回文件中的第一个关卡；文件中没有关卡时返回最小默认关卡。
+        """
+        _, levels = self.get_pack(path)
+        level = levels.get(level_id)
+        if level is not None:
+            return level
+        if levels:
+            return next(iter(levels.values()))
+        return _FALLBACK
+    
+    def clear(self):
+        """清空缓存，下次查询时重新加载"""
+        self._packs.clear()
+
+
+_FALLBACK = SokobanLevel(FALLBACK_LEVEL)
+
+# 进程内共享的关卡注册表
+level_registry = LevelRegistry()
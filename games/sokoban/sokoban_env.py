@@ -12,20 +12,27 @@ from games.sokoban.sokoban_game import SokobanGame
 class SokobanEnv(BaseEnv):
     """推箱子游戏环境"""
     
-    def __init__(self, level_id: int = 1, game_mode: str = 'competitive', **kwargs):
+    def __init__(self, level_id: int = 1, game_mode: str = 'competitive',
+                 observation_mode: str = 'board', **kwargs):
         """
         初始化推箱子环境
         
         Args:
             level_id: 关卡ID
             game_mode: 游戏模式 ('competitive': 竞争模式, 'cooperative': 合作模式)
+            observation_mode: 观察模式 ('board': 字典观察, 'planes': uint8多通道平面)
         """
         self.level_id = level_id
         self.game_mode = game_mode
         
+        # 墙壁和目标在一局内不变，按游戏实例缓存
+        self._static_planes_game = None
+        self._wall_plane = None
+        self._target_plane = None
+        
         # 创建游戏实例
         game = SokobanGame(level_id=level_id, game_mode=game_mode, **kwargs)
-        super().__init__(game)
+        super().__init__(game, observation_mode)
         
         # 环境特定属性
         self.max_episode_steps = kwargs.get('max_episode_steps', 500)
@@ -49,6 +56,9 @@ class SokobanEnv(BaseEnv):
     
     def _get_observation(self) -> Dict[str, Any]:
         """获取观察"""
+        if self.observation_mode == 'planes':
+            return self.get_observation_planes()
+        
         state = self.game.get_state()
         
         # 基础观察：数字化的棋盘
@@ -69,6 +79,41 @@ class SokobanEnv(BaseEnv):
         
         return observation
     
+    def _get_plane_shape(self) -> Tuple[int, int]:
+        """观察平面的 (H, W)"""
+        return (self.game.height, self.game.width)
+    
+    def _fill_planes(self, planes: np.ndarray) -> None:
+        """己方/对方玩家位置、墙壁、箱子和目标"""
+        game = self.game
+        if self._static_planes_game is not game:
+            height, width = game.height, game.width
+            self._wall_plane = np.zeros((height, width), dtype=np.uint8)
+            for row in range(height):
+                for col in range(width):
+                    if game.board[row][col] == game.WALL:
+                        self._wall_plane[row, col] = 1
+            self._target_plane = np.zeros((height, width), dtype=np.uint8)
+            for row, col in game.targets:
+                self._target_plane[row, col] = 1
+            self._static_planes_game = game
+        
+        player = game.current_player
+        own_pos = game.player1_pos if player == 1 else game.player2_pos
+        other_pos = game.player2_pos if player == 1 else game.player1_pos
+        planes[0:5] = 0
+        if own_pos:
+            planes[0][own_pos] = 1
+        if other_pos:
+            planes[1][other_pos] = 1
+        
+        planes[5] = self._wall_plane
+        planes[6] = 0
+        for box in game.boxes:
+            planes[6][box] = 1
+        planes[7] = self._target_plane
+        planes[8] = 1 if player == 1 else 0
+    
     def _get_action_mask(self) -> np.ndarray:
         """获取动作掩码"""
         valid_actions = self.game.get_valid_actions()
@@ -207,6 +252,7 @@ class SokobanEnv(BaseEnv):
         cloned_env = SokobanEnv(
             level_id=self.level_id,
             game_mode=self.game_mode,
+            observation_mode=self.observation_mode,
             max_episode_steps=self.max_episode_steps,
             reward_shaping=self.reward_shaping
         )
@@ -3,13 +3,12 @@
 实现双人对战推箱子游戏
 """
 
-import json
-import os
 import copy
 import time
 from typing import Dict, List, Tuple, Any, Optional, Set
 import numpy as np
 from games.base_game import BaseGame
+from games.sokoban.level_registry import level_registry
 import config
 
 
@@ -48,9 +47,10 @@ class SokobanGame(BaseGame):
         self.max_steps = kwargs.get('max_steps', 500)
         self.time_limit = kwargs.get('time_limit', 300)  # 5分钟
         
-        # 加载关卡数据
+        # 关卡数据来自进程内共享的注册表，只读，克隆时按引用共享
         self.levels_data = self._load_levels()
-        self.original_level = self._get_level(level_id)
+        self.level = level_registry.get_level(level_id)
+        self.original_level = self.level.info
         
         # 游戏状态
         self.board = None
@@ -66,41 +66,22 @@ class SokobanGame(BaseGame):
         self.player1_steps = 0
         self.player2_steps = 0
         
+        # 终局状态缓存：_status_key为None表示需要重新计算
+        self._status = (False, None)
+        self._status_key = None
+        self._deadlocked_boxes = set()
+        self._deadlock_dirty = set()
+        self._untouched_dead_boxes = set()
+        
         super().__init__(kwargs)
     
     def _load_levels(self) -> Dict:
-        """加载关卡数据"""
-        levels_file = os.path.join(os.path.dirname(__file__), 'levels.json')
-        try:
-            with open(levels_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            # 如果文件不存在，返回默认关卡
-            return {
-                "levels": [{
-                    "id": 1,
-                    "name": "默认关卡",
-                    "map": [
-                        "########",
-                        "#      #",
-                        "# $@   #",
-                        "#    . #",
-                        "#      #",
-                        "########"
-                    ]
-                }]
-            }
+        """加载关卡数据（只读视图，文件修改后自动重新加载）"""
+        return level_registry.get_levels_data()
     
     def _get_level(self, level_id: int) -> Dict:
         """获取指定关卡"""
-        for level in self.levels_data.get('levels', []):
-            if level['id'] == level_id:
-                return level
-        
-        # 如果找不到指定关卡，返回第一个关卡
-        return self.levels_data['levels'][0] if self.levels_data.get('levels') else {
-            "id": 1, "name": "默认", "map": ["####", "#@.#", "####"]
-        }
+        return level_registry.get_level(level_id).info
     
     def reset(self) -> Dict[str, Any]:
         """重置游戏状态"""
@@ -112,55 +93,16 @@ class SokobanGame(BaseGame):
         self.last_move_time = time.time()
         self.history = []
         
-        # 解析关卡地图
-        level_map = self.original_level['map']
-        self.height = len(level_map)
-        self.width = max(len(row) for row in level_map)
-        
-        # 初始化棋盘
-        self.board = [[self.FLOOR for _ in range(self.width)] for _ in range(self.height)]
-        self.targets = set()
-        self.boxes = set()
-        self.boxes_on_targets = set()
-        
-        # 解析地图并放置元素
-        player_count = 0
-        for row in range(self.height):
-            line = level_map[row] if row < len(level_map) else ""
-            for col in range(len(line)):
-                char = line[col]
-                
-                if char == self.WALL:
-                    self.board[row][col] = self.WALL
-                elif char == self.TARGET:
-                    self.targets.add((row, col))
-                    self.board[row][col] = self.TARGET
-                elif char == self.BOX:
-                    self.boxes.add((row, col))
-                    self.board[row][col] = self.BOX
-                elif char == self.BOX_ON_TARGET:
-                    self.targets.add((row, col))
-                    self.boxes.add((row, col))
-                    self.boxes_on_targets.add((row, col))
-                    self.board[row][col] = self.BOX_ON_TARGET
-                elif char == '@':  # 原始玩家位置
-                    if player_count == 0:
-                        self.player1_pos = (row, col)
-                        self.board[row][col] = self.PLAYER1
-                        player_count += 1
-                    else:
-                        self.player2_pos = (row, col)
-                        self.board[row][col] = self.PLAYER2
-                        player_count += 1
-                elif char == '&':  # 玩家2位置
-                    self.player2_pos = (row, col)
-                    self.board[row][col] = self.PLAYER2
-                    player_count += 1
-                elif char == self.PLAYER1_ON_TARGET:
-                    self.player1_pos = (row, col)
-                    self.targets.add((row, col))
-                    self.board[row][col] = self.PLAYER1_ON_TARGET
-                    player_count += 1
+        # 从已解析的关卡初始化（目标集合只读，直接共享）
+        level = self.level
+        self.height = level.height
+        self.width = level.width
+        self.board = [list(row) for row in level.board]
+        self.targets = level.targets
+        self.boxes = set(level.boxes)
+        self.boxes_on_targets = set(level.boxes_on_targets)
+        self.player1_pos = level.player1_spawn
+        self.player2_pos = level.player2_spawn
         
         # 如果只有一个玩家位置，为第二个玩家找一个空位置
         if not self.player2_pos:
@@ -176,12 +118,25 @@ class SokobanGame(BaseGame):
         if self.player1_pos == self.player2_pos:
             self._fix_initial_player_positions()
         
+        # 整盘重绘一次，之后移动只增量更新受影响的格子
+        self._update_board_display()
+        
         # 重置分数和统计
         self.player1_score = 0
         self.player2_score = 0
         self.player1_steps = 0
         self.player2_steps = 0
         
+        # 所有箱子都需要做一次死锁检查
+        self._status_key = None
+        self._deadlocked_boxes = set()
+        self._deadlock_dirty = set(self.boxes)
+        # 开局就摆在死格上且从未被推动过的箱子，不按死格判负
+        dead_squares = self.level.dead_squares
+        self._untouched_dead_boxes = {
+            (row, col) for row, col in self.boxes if dead_squares[row * self.width + col]
+        }
+        
         return self.get_state()
     
     def _find_empty_position(self) -> Optional[Tuple[int, int]]:
@@ -333,6 +288,7 @@ class SokobanGame(BaseGame):
         # 移动箱子
         self.boxes.remove((box_row, box_col))
         self.boxes.add((new_box_row, new_box_col))
+        self._untouched_dead_boxes.discard((box_row, box_col))
         
         # 更新箱子在目标上的状态
         was_on_target = (box_row, box_col) in self.boxes_on_targets
@@ -355,8 +311,19 @@ class SokobanGame(BaseGame):
             else:
                 self.player2_score = max(0, self.player2_score - 1)
         
-        # 更新棋盘显示
-        self._update_board_display()
+        # 只重绘箱子前后两个格子
+        self._redraw_cell(box_row, box_col)
+        self._redraw_cell(new_box_row, new_box_col)
+        
+        # 箱子前后位置及其相邻格子的死锁状态可能变化（边缘死锁依赖相邻箱子）
+        dirty = self._deadlock_dirty
+        for row, col in ((box_row, box_col), (new_box_row, new_box_col)):
+            dirty.add((row, col))
+            dirty.add((row - 1, col))
+            dirty.add((row + 1, col))
+            dirty.add((row, col - 1))
+            dirty.add((row, col + 1))
+        self._status_key = None
         
         return 'success'
     
@@ -371,11 +338,29 @@ class SokobanGame(BaseGame):
         else:
             self.player2_pos = new_pos
         
-        # 更新棋盘显示
-        self._update_board_display()
+        # 只重绘玩家前后两个格子
+        self._redraw_cell(old_row, old_col)
+        self._redraw_cell(new_row, new_col)
+    
+    def _redraw_cell(self, row: int, col: int):
+        """按当前状态重绘单个格子，目标点从关卡的静态位图读取，墙壁不变"""
+        board_row = self.board[row]
+        if board_row[col] == self.WALL:
+            return
+        pos = (row, col)
+        on_target = self.level.target_map[row * self.width + col]
+        # 覆盖优先级与整盘重绘一致：玩家2 > 玩家1 > 箱子 > 目标 > 空地
+        if pos == self.player2_pos:
+            board_row[col] = self.PLAYER2_ON_TARGET if on_target else self.PLAYER2
+        elif pos == self.player1_pos:
+            board_row[col] = self.PLAYER1_ON_TARGET if on_target else self.PLAYER1
+        elif pos in self.boxes:
+            board_row[col] = self.BOX_ON_TARGET if on_target else self.BOX
+        else:
+            board_row[col] = self.TARGET if on_target else self.FLOOR
     
     def _update_board_display(self):
-        """更新棋盘显示"""
+        """整盘重绘棋盘（重置和修复玩家位置冲突时使用）"""
         # 重置棋盘（保留墙壁和目标）
         for row in range(self.height):
             for col in range(self.width):
@@ -486,39 +471,75 @@ class SokobanGame(BaseGame):
     
     def is_terminal(self) -> bool:
         """检查游戏是否结束"""
+        # 完成、死锁和步数上限只在局面变化后重新计算；超时与时间有关，每次检查
+        return self._get_status()[0] or self.is_timeout()
+    
+    def _get_status(self) -> Tuple[bool, Optional[int]]:
+        """
+        获取缓存的终局状态（不含超时）
+        
+        推箱和重置会清除缓存；步数和当前玩家作为缓存键，换手后自动重新计算。
+        
+        Returns:
+            (是否结束, 获胜者)
+        """
+        key = (self.move_count, self.current_player)
+        if self._status_key != key:
+            self._status = self._compute_status()
+            self._status_key = key
+        return self._status
+    
+    def _compute_status(self) -> Tuple[bool, Optional[int]]:
+        """计算终局状态：所有箱子到位 > 死锁 > 达到最大步数"""
         # 检查是否所有箱子都在目标上（胜利条件）
         if len(self.boxes_on_targets) == len(self.targets):
-            return True
+            if self.game_mode == 'cooperative':
+                return True, 0  # 合作模式：共同获胜
+            return True, self._score_winner()
         
         # 检查是否有箱子陷入死锁（失败条件）
         if self._check_deadlock():
-            return True
-        
-        # 检查是否超时
-        if self.is_timeout():
-            return True
+            if self.game_mode == 'cooperative':
+                return True, None  # 合作模式：共同失败
+            # 竞争模式：当前回合的玩家失败，对手获胜
+            return True, 2 if self.current_player == 1 else 1
         
         # 检查是否达到最大步数
         if self.move_count >= self.max_steps:
-            return True
+            if self.game_mode == 'cooperative':
+                return True, None
+            return True, self._score_winner()
         
-        return False
+        return False, None
+    
+    def _score_winner(self) -> int:
+        """竞争模式下按分数判定胜负，0表示平局"""
+        if self.player1_score > self.player2_score:
+            return 1
+        elif self.player2_score > self.player1_score:
+            return 2
+        return 0
     
     def _check_deadlock(self) -> bool:
-        """检查是否存在死锁情况"""
-        # 检查每个不在目标上的箱子
-        for box_pos in self.boxes:
-            if box_pos not in self.targets:
-                if self._is_box_deadlocked(box_pos):
-                    return True
-        return False
+        """检查是否存在死锁情况（只重新检查上次之后被推动过或相邻箱子移动过的箱子）"""
+        dirty = self._deadlock_dirty
+        if dirty:
+            deadlocked = self._deadlocked_boxes
+            for pos in dirty:
+                if pos in self.boxes and pos not in self.targets and self._is_box_deadlocked(pos):
+                    deadlocked.add(pos)
+                else:
+                    deadlocked.discard(pos)
+            dirty.clear()
+        return bool(self._deadlocked_boxes)
     
     def _is_box_deadlocked(self, box_pos: Tuple[int, int]) -> bool:
         """检查单个箱子是否死锁"""
         row, col = box_pos
         
-        # 检查角落死锁
-        if self._is_corner_deadlock(row, col):
+        # 检查死格（包含所有角落死锁，以及没有目标的墙边等静态死锁）；
+        # 开局就摆在死格上且从未推动过的箱子不算，否则这类关卡一开始就判负
+        if self.level.dead_squares[row * self.width + col] and box_pos not in self._untouched_dead_boxes:
             return True
         
         # 检查边缘死锁
@@ -527,39 +548,6 @@ class SokobanGame(BaseGame):
         
         return False
     
-    def _is_corner_deadlock(self, row: int, col: int) -> bool:
-        """检查角落死锁"""
-        # 检查四个方向的墙壁情况
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]  # 上下左右
-        wall_count = 0
-        
-        for dr, dc in directions:
-            new_row, new_col = row + dr, col + dc
-            if (not self._is_valid_position(new_row, new_col) or 
-                self.board[new_row][new_col] == self.WALL):
-                wall_count += 1
-        
-        # 如果被两面或更多面墙围住，且这些墙形成角落，则死锁
-        if wall_count >= 2:
-            # 检查是否真的形成角落（检查相邻的两面墙）
-            wall_positions = []
-            for dr, dc in directions:
-                new_row, new_col = row + dr, col + dc
-                if (not self._is_valid_position(new_row, new_col) or 
-                    self.board[new_row][new_col] == self.WALL):
-                    wall_positions.append((dr, dc))
-            
-            # 检查是否有相邻的墙壁形成角落
-            for i, (dr1, dc1) in enumerate(wall_positions):
-                for j, (dr2, dc2) in enumerate(wall_positions):
-                    if i != j:
-                        # 如果两个方向垂直，则形成角落
-                        if (dr1 * dr2 == 0 and dc1 * dc2 == 0 and 
-                            (dr1 != 0 or dc1 != 0) and (dr2 != 0 or dc2 != 0)):
-                            return True
-        
-        return False
-    
     def _is_edge_deadlock(self, row: int, col: int) -> bool:
         """检查边缘死锁（简化版）"""
         # 检查是否在靠墙的位置且无法推向目标
@@ -589,45 +577,13 @@ class SokobanGame(BaseGame):
 
     def get_winner(self) -> Optional[int]:
         """获取获胜者"""
-        if not self.is_terminal():
-            return None
-        
-        # 首先检查是否完成所有目标（正常胜利）
-        if len(self.boxes_on_targets) == len(self.targets):
-            if self.game_mode == 'cooperative':
-                return 0  # 合作模式：共同获胜
-            else:
-                # 竞争模式：比较分数
-                if self.player1_score > self.player2_score:
-                    return 1
-                elif self.player2_score > self.player1_score:
-                    return 2
-                else:
-                    return 0  # 平局
-        
-        # 检查是否因为死锁而失败
-        if self._check_deadlock():
-            if self.game_mode == 'cooperative':
-                return None  # 合作模式：共同失败
-            else:
-                # 竞争模式：当前回合的玩家失败，对手获胜
-                if self.current_player == 1:
-                    return 2  # 玩家1死锁，玩家2获胜
-                else:
-                    return 1  # 玩家2死锁，玩家1获胜
+        terminal, winner = self._get_status()
+        if terminal:
+            return winner
         
-        # 检查是否超时或达到步数限制
-        if self.is_timeout() or self.move_count >= self.max_steps:
-            if self.game_mode == 'cooperative':
-                return None  # 合作模式：共同失败
-            else:
-                # 竞争模式：比较当前分数
-                if self.player1_score > self.player2_score:
-                    return 1
-                elif self.player2_score > self.player1_score:
-                    return 2
-                else:
-                    return 0  # 平局
+        # 超时：合作模式共同失败，竞争模式比较当前分数
+        if self.is_timeout():
+            return None if self.game_mode == 'cooperative' else self._score_winner()
         
         return None
     
@@ -697,31 +653,17 @@ class SokobanGame(BaseGame):
     
     def clone(self) -> 'SokobanGame':
         """克隆游戏状态"""
-        cloned = SokobanGame(self.level_id, self.game_mode)
-        
-        # 复制基本属性
+        # 不经过构造函数：关卡对象、目标集合等只读数据按引用共享，不重新加载和解析关卡
+        cloned = SokobanGame.__new__(SokobanGame)
+        cloned.__dict__.update(self.__dict__)
+        cloned.game_config = {}
+        cloned.history = []
         cloned.board = [row[:] for row in self.board]
-        cloned.player1_pos = self.player1_pos
-        cloned.player2_pos = self.player2_pos
-        cloned.current_player = self.current_player
-        cloned.player1_score = self.player1_score
-        cloned.player2_score = self.player2_score
-        cloned.player1_steps = self.player1_steps
-        cloned.player2_steps = self.player2_steps
-        cloned.move_count = self.move_count
-        cloned.game_state = self.game_state
-        
-        # 复制集合
         cloned.boxes = self.boxes.copy()
-        cloned.targets = self.targets.copy()
         cloned.boxes_on_targets = self.boxes_on_targets.copy()
-        
-        # 复制其他属性
-        cloned.height = self.height
-        cloned.width = self.width
-        cloned.max_steps = self.max_steps
-        cloned.time_limit = self.time_limit
-        
+        cloned._deadlocked_boxes = self._deadlocked_boxes.copy()
+        cloned._deadlock_dirty = self._deadlock_dirty.copy()
+        cloned._untouched_dead_boxes = self._untouched_dead_boxes.copy()
         return cloned
     
     def get_action_space(self) -> List[str]:
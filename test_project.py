@@ -113,6 +113,512 @@ def test_gomoku_env():
         return False
 
 
+def test_vec_gomoku_env():
+    """测试批量五子棋环境与单局环境逐步一致"""
+    print("\n=== 测试批量五子棋环境 ===")
+    
+    try:
+        import random
+        import numpy as np
+        from games.gomoku import GomokuEnv, VecGomokuEnv
+        
+        num_envs, board_size = 8, 7
+        vec_env = VecGomokuEnv(num_envs, board_size=board_size, win_length=5)
+        vec_env.reset()
+        envs = [GomokuEnv(board_size, 5) for _ in range(num_envs)]
+        for env in envs:
+            env.reset()
+        
+        rng = random.Random(0)
+        finished_games = 0
+        for _ in range(150):
+            actions = [rng.choice(env.get_valid_actions()) for env in envs]
+            observations, rewards, dones, truncated, info = vec_env.step(np.array(actions))
+            
+            for i, env in enumerate(envs):
+                _, reward, done, _, _ = env.step(actions[i])
+                assert reward == rewards[i] and done == dones[i]
+                if done:
+                    assert (env.game.board == info['final_observation'][i]).all()
+                    assert (env.get_winner() or 0) == info['winner'][i]
+                    finished_games += 1
+                    env.reset()
+                assert (env.game.board == observations[i]).all()
+        
+        assert (vec_env.get_action_mask() == (vec_env.boards == 0)).all()
+        print(f"✓ 批量环境与单局环境逐步一致（{finished_games} 局结束）")
+        return True
+        
+    except Exception as e:
+        print(f"✗ 批量五子棋环境测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+
+def test_observation_planes():
+    """测试多通道观察平面（预分配、只读、可传入缓冲区）"""
+    print("\n=== 测试多通道观察平面 ===")
+    
+    try:
+        import numpy as np
+        from games.gomoku import GomokuEnv
+        from games.snake import SnakeEnv
+        from games.sokoban import SokobanEnv
+        
+        for env in (GomokuEnv(board_size=9, observation_mode='planes'),
+                    SnakeEnv(board_size=8, observation_mode='planes'),
+                    SokobanEnv(observation_mode='planes')):
+            observation, _ = env.reset()
+            assert observation.dtype == np.uint8 and observation.shape[0] == len(env.PLANE_NAMES)
+            assert not observation.flags.writeable
+            
+            action = env.get_valid_actions()[0]
+            next_observation, _, _, _, _ = env.step(action)
+            # 同一个预分配缓冲区被原地更新
+            assert np.shares_memory(observation, next_observation)
+            
+            buffer = np.zeros(observation.shape, dtype=np.uint8)
+            view = env.get_observation_planes(out=buffer)
+            assert np.shares_memory(view, buffer) and (buffer == next_observation).all()
+            assert (env.clone().get_observation_planes() == buffer).all()
+        
+        env = GomokuEnv(board_size=9, observation_mode='planes')
+        env.reset()
+        env.step((4, 4))
+        planes = env.get_observation_planes()
+        # 轮到玩家2：对方通道与对方最近一手都在(4, 4)
+        assert planes[1, 4, 4] == 1 and planes[3, 4, 4] == 1 and planes[0].sum() == 0
+        assert planes[8].sum() == 0
+        print("✓ 观察平面原地更新且只读")
+        return True
+        
+    except Exception as e:
+        print(f"✗ 多通道观察平面测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+
+def test_snake_game():
+    """测试贪吃蛇游戏（占用网格、状态视图、可复现的食物生成）"""
+    print("\n=== 测试贪吃蛇游戏 ===")
+    
+    try:
+        import copy
+        import pickle
+        import random
+        from games.snake import SnakeGame
+        
+        def play(seed):
+            game = SnakeGame(board_size=8, food_count=6, seed=seed)
+            rng = random.Random(seed)
+            trace = []
+            for _ in range(300):
+                action = rng.choice(game.get_valid_actions())
+                observation, reward, done, info = game.step(action)
+                
+                # 占用网格和空闲格子索引必须与蛇身/食物同步
+                n = game.board_size
+                free = sorted(i for i in range(n * n) if game._grid[i] == SnakeGame.CELL_EMPTY)
+                assert free == sorted(game._free_cells)
+                assert all(game._grid[x * n + y] == SnakeGame.CELL_FOOD for x, y in game.foods)
+                occupied = [x * n + y for snake in (game.snake1, game.snake2) for x, y in snake]
+                zobrist = 0
+                for index in occupied:
+                    zobrist ^= game._zobrist[index]
+                assert zobrist == game.occupancy_hash
+                
+                # 完整局面哈希的增量部分与从头计算一致，克隆后不变
+                keys = game._state_keys
+                cells_hash = 0
+                for player, snake in ((1, game.snake1), (2, game.snake2)):
+                    for i, (x, y) in enumerate(snake):
+                        cells_hash ^= (keys['head'] if i == 0 else keys['body'])[player][x * n + y]
+                for x, y in game.foods:
+                    cells_hash ^= keys['food'][x * n + y]
+                assert cells_hash == game._cells_hash
+                assert game.clone().state_hash == game.state_hash
+                trace.append((observation['snake1'], observation['snake2'], observation['foods']))
+                if done:
+                    break
+            return trace
+        
+        assert play(7) == play(7)
+        print("✓ 相同种子结果可复现")
+        
+        game = SnakeGame(board_size=10, seed=1)
+        state = game.get_state()
+        board = state['board'].copy()
+        assert game.get_state() is state
+        game.step((0, 1))
+        assert (state['board'] == board).all()
+        assert not state['board'].flags.writeable
+        
+        # 只读视图仍是字典；游戏和状态都能复制、序列化
+        state = game.get_state()
+        assert isinstance(state, dict)
+        try:
+            state['move_count'] = 0
+            assert False, "状态视图不应可修改"
+        except TypeError:
+            pass
+        copied = copy.deepcopy(state)
+        copied['move_count'] = 0
+        restored = pickle.loads(pickle.dumps(game))
+        assert copy.deepcopy(game).get_state()['snake1'] == state['snake1']
+        assert restored.get_state()['snake1'] == state['snake1'] and restored.rng.random() == game.rng.random()
+        print("✓ 状态视图缓存且只读")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ 贪吃蛇游戏测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+
+def test_vec_snake_env():
+    """测试批量贪吃蛇环境与单局引擎逐步一致"""
+    print("\n=== 测试批量贪吃蛇环境 ===")
+    
+    try:
+        import random
+        import numpy as np
+        from games.snake import SnakeEnv, VecSnakeEnv
+        
+        num_envs, board_size = 16, 8
+        vec_env = VecSnakeEnv(num_envs, board_size=board_size, food_count=4, seed=0)
+        envs = [SnakeEnv(board_size) for _ in range(num_envs)]
+        for i, env in enumerate(envs):
+            env.reset()
+            env.game.set_foods(vec_env.get_foods(i))
+        
+        rng = random.Random(0)
+        finished_games = 0
+        for _ in range(300):
+            actions = [rng.randrange(4) for _ in range(num_envs)]
+            observations, rewards, dones, truncated, info = vec_env.step(actions)
+            
+            for i, env in enumerate(envs):
+                _, reward, done, _, _ = env.step(VecSnakeEnv.ACTIONS[actions[i]])
+                assert reward == rewards[i] and done == dones[i]
+                
+                if done:
+                    # 结束时的棋盘一致，然后两边都重置
+                    assert (env.game.get_state()['board'] == info['final_observation'][i]).all()
+                    finished_games += 1
+                    env.reset()
+                else:
+                    assert list(env.game.snake1) == vec_env.get_snake(i, 1)
+                    assert list(env.game.snake2) == vec_env.get_snake(i, 2)
+                    assert env.game.current_player == vec_env.current_player[i]
+                # 新生成的食物以批量环境为准
+                env.game.set_foods(vec_env.get_foods(i))
+                assert (env.game.get_state()['board'] == observations[i]).all()
+        
+        print(f"✓ 批量环境与单局引擎逐步一致（{finished_games} 局结束）")
+        return True
+        
+    except Exception as e:
+        print(f"✗ 批量贪吃蛇环境测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+
+def test_multi_snake_game():
+    """测试多人同时移动贪吃蛇"""
+    print("\n=== 测试多人贪吃蛇 ===")
+    
+    try:
+        import pickle
+        import random
+        from games.snake import MultiSnakeGame, SnakeEnv
+        
+        # 等长蛇迎面相撞同归于尽
+        game = MultiSnakeGame(board_size=5, num_players=2, food_count=0, seed=0)
+        _, rewards, done, info = game.step([None, None])
+        assert done and rewards == [-1.0, -1.0] and info['died'] == [1, 2]
+        
+        rng = random.Random(0)
+        game = MultiSnakeGame(board_size=12, num_players=6, seed=1)
+        for _ in range(300):
+            actions = [rng.choice(game.get_valid_actions(p)) if game.alive[p] else None
+                       for p in range(1, game.num_players + 1)]
+            state, rewards, done, info = game.step(actions)
+            # 占用网格、空格索引和蛇身一致
+            cells = [x * 12 + y for p in range(1, 7) for x, y in game.snakes[p]]
+            assert len(cells) == len(set(cells))
+            assert sorted(game._free_cells) == [i for i in range(144) if game._grid[i] == 0]
+            # 增量维护的棋盘与占用网格一致
+            board = state['board'].ravel().tolist()
+            assert [cell != 0 for cell in board] == [cell != 0 for cell in game._grid]
+            assert all(board[x * 12 + y] == 2 * p - 1 for p in range(1, 7) if game.snakes[p]
+                       for x, y in [game.snakes[p][0]])
+            if done:
+                break
+        assert done and game.get_winner() in (None, 1, 2, 3, 4, 5, 6)
+        assert isinstance(game.get_state(), dict)
+        assert pickle.loads(pickle.dumps(game)).get_state()['snakes'] == game.get_state()['snakes']
+        
+        env = SnakeEnv(board_size=32, num_players=8, observation_mode='planes', seed=1)
+        observation, _ = env.reset()
+        observation, rewards, done, truncated, info = env.step([None] * 8)
+        assert env.is_multiplayer and len(rewards) == 8 and observation.shape == (9, 32, 32)
+        
+        # 编号大于2的玩家获胜时记录为对应玩家获胜，而不是平局
+        env = SnakeEnv(board_size=10, num_players=4, seed=4)
+        env.reset()
+        rng = random.Random(4)
+        done = False
+        while not done:
+            game = env.game
+            _, _, done, _, _ = env.step([rng.choice(game.get_valid_actions(p)) if game.alive[p] else None
+                                         for p in range(1, 5)])
+        assert env.get_winner() == 4 and env.game.game_state == 'player4_win'
+        
+        print("✓ 多人贪吃蛇规则与占用索引正确")
+        return True
+        
+    except Exception as e:
+        print(f"✗ 多人贪吃蛇测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+
+def test_async_vector_env():
+    """测试子进程向量环境与本地环境一致"""
+    print("\n=== 测试子进程向量环境 ===")
+    
+    try:
+        from games import AsyncVectorEnv
+        from games.snake import SnakeEnv
+        
+        def make_env():
+            return SnakeEnv(board_size=8, observation_mode='planes')
+        
+        num_envs = 4
+        vec_env = AsyncVectorEnv([make_env] * num_envs, num_workers=2)
+        try:
+            observations, _ = vec_env.reset(seed=3)
+            local_envs = []
+            for i in range(num_envs):
+                env = make_env()
+                env.seed(3 + i)
+                env.reset()
+                local_envs.append(env)
+            
+            for _ in range(10):
+                actions = [env.get_valid_actions()[0] for env in local_envs]
+                observations, rewards, terminated, truncated, info = vec_env.step(actions)
+                for i, env in enumerate(local_envs):
+                    _, reward, done, _, _ = env.step(actions[i])
+                    assert reward == rewards[i] and done == terminated[i]
+                    if done:
+                        assert (env.get_observation_planes() == info['final_observation'][i]).all()
+                        env.reset()
+                    assert (env.get_observation_planes() == observations[i]).all()
+            
+            vec_env.step()  # 子进程随机选择有效动作
+            assert vec_env.total_steps == 11 * num_envs and vec_env.get_throughput() > 0
+        finally:
+            vec_env.close()
+        
+        # 构造时的种子作用于环境本身：不带种子的reset和随机动作都可复现
+        runs = []
+        for _ in range(2):
+            vec_env = AsyncVectorEnv([make_env] * num_envs, num_workers=2, seed=5)
+            try:
+                vec_env.reset()
+                for _ in range(5):
+                    vec_env.step()
+                runs.append(vec_env.observations.copy())
+            finally:
+                vec_env.close()
+        assert (runs[0] == runs[1]).all()
+        
+        print("✓ 共享内存观察与本地环境一致")
+        return True
+        
+    except Exception as e:
+        print(f"✗ 子进程向量环境测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+
+def test_sokoban_level_registry():
+    """测试推箱子关卡注册表"""
+    print("\n=== 测试关卡注册表 ===")
+    
+    try:
+        import json
+        import os
+        import tempfile
+        from games.sokoban import SokobanGame, LevelRegistry, level_registry
+        
+        game = SokobanGame(level_id=1)
+        clone = game.clone()
+        assert clone.level is game.level is level_registry.get_level(1)
+        assert clone.targets is game.level.targets and clone.boxes is not game.boxes
+        assert game.level.is_wall(0, 0) and game.level.is_wall(-1, 0)
+        
+        # 死格：关卡1中贴墙一圈的格子都推不到目标，观察棋盘得到的结果与关卡对象一致
+        from utils.sokoban_analysis import get_dead_squares
+        level = game.level
+        dead_squares = {(r, c) for r in range(level.height) for c in range(level.width)
+                        if level.is_dead_square(r, c) and not level.is_wall(r, c)}
+        ring = {(r, c) for r in range(1, level.height - 1) for c in range(1, level.width - 1)
+                if r in (1, level.height - 2) or c in (1, level.width - 2)}
+        assert dead_squares == ring and not dead_squares & level.targets
+        observation = game.get_state()
+        assert get_dead_squares(observation['board_array'], level.targets) == dead_squares
+        
+        # 增量更新的棋盘与整盘重绘一致
+        for action in ['LEFT', 'UP', 'RIGHT', 'RIGHT', 'DOWN', 'LEFT', 'DOWN', 'RIGHT'] * 3:
+            if game.is_terminal():
+                break
+            game.step(action)
+        board = [row[:] for row in game.board]
+        game._update_board_display()
+        assert board == game.board
+        # 增量死锁检查与逐个箱子检查一致
+        game._check_deadlock()
+        assert game._deadlocked_boxes == {box for box in game.boxes
+                                          if box not in game.targets and game._is_box_deadlocked(box)}
+        # 只有开局就在死格上、且从未推动过的箱子才免判死锁；推到同一死格的其他箱子照常判负
+        dead_cell = min(dead_squares)
+        fresh = SokobanGame(level_id=1)
+        fresh._untouched_dead_boxes = {dead_cell}
+        assert not fresh._is_box_deadlocked(dead_cell)
+        fresh._untouched_dead_boxes.discard(dead_cell)
+        assert fresh._is_box_deadlocked(dead_cell)
+        
+        # 文件修改时间变化后重新加载
+        registry = LevelRegistry()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'levels.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'levels': [{'id': 1, 'map': ['#####', '#@$.#', '#####']}]}, f)
+            level = registry.get_level(1, path)
+            assert registry.get_level(1, path) is level and registry.loads == 1
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'levels': [{'id': 1, 'map': ['######', '#@$ .#', '######']}]}, f)
+            os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10 ** 9))
+            assert registry.get_level(1, path).width == 6 and registry.loads == 2
+        
+        print("✓ 关卡对象在实例与克隆间共享，死格与增量棋盘正确，文件修改后自动重新加载")
+        return True
+        
+    except Exception as e:
+        print(f"✗ 关卡注册表测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+
+def test_sokoban_search_state():
+    """测试推箱子紧凑搜索状态"""
+    print("\n=== 测试紧凑搜索状态 ===")
+    
+    try:
+        import contextlib
+        import io
+        import sys
+        import time
+        from games.sokoban import SokobanEnv
+        from agents.ai_bots.sokoban_ai import SokobanAI
+        
+        env = SokobanEnv(level_id=1, game_mode='cooperative')
+        observation, _ = env.reset()
+        ai = SokobanAI(player_id=1)
+        state = ai._to_search_state(ai._observation_to_state(observation))
+        same = ai._to_search_state(ai._observation_to_state(observation))
+        assert state == same and hash(state) == hash(same) and state.static is same.static
+        assert sys.getsizeof(state) + sys.getsizeof(state.boxes) < 200
+        
+        # 死格免检按箱子而不是按格子：开局停在死格上的箱子被推走后，推到同一格子的箱子照常判死锁；
+        # 静态数据只取决于墙壁和目标，箱子移动不会换掉静态数据
+        tracker = SokobanAI(player_id=1)
+        board = observation['board'].copy()
+        board[1, 2] = 3
+        first = tracker._observation_to_state(dict(observation, board=board))
+        start = tracker._to_search_state(first)
+        assert first['untouched_dead_boxes'] == {(1, 2)} and not start.has_dead_box()
+        assert start.static is state.static and (1, 2) not in tracker._get_dead_squares(first)
+        pushed = start.static.state((1, 1), start.box_positions(), {(1, 2)}).move(3)  # 向右推走免检箱子
+        assert pushed.exempt == 0 and pushed.has_dead_box()
+        board[1, 2], board[1, 3] = 0, 3
+        tracker._observation_to_state(dict(observation, board=board))
+        board[1, 2] = 3
+        third = tracker._observation_to_state(dict(observation, board=board))
+        assert not third['untouched_dead_boxes'] and (1, 2) in tracker._get_dead_squares(third)
+        assert tracker._to_search_state(third).has_dead_box()
+        
+        # A*搜索节点为紧凑状态
+        assert ai._layered_astar_search(state, 10, time.time()) in ('UP', 'DOWN', 'LEFT', 'RIGHT')
+        
+        # 后继状态与真实游戏逐步一致，最后一推完成关卡
+        for action in ['DOWN', 'LEFT', 'LEFT', 'UP', 'RIGHT', 'RIGHT', 'RIGHT', 'UP', 'RIGHT', 'DOWN']:
+            state, success = ai._simulate_action(state, action)
+            env.step(action)
+            assert success and state.box_positions() == set(env.game.boxes)
+            assert state.player_pos == tuple(env.game.player1_pos)
+        assert state.is_solved() and ai._is_solved(state)
+        pushed = state.move(1)
+        assert pushed.box_positions() == {(4, 5)} and pushed.move(1) is None  # 箱子贴墙推不动
+        
+        # 推动级搜索：展开后的逐步动作在真实游戏中完成关卡2
+        env = SokobanEnv(level_id=2, game_mode='cooperative')
+        observation, _ = env.reset()
+        root = ai._to_search_state(ai._observation_to_state(observation))
+        plan = ai._push_level_search(root, time.time())
+        
+        # 匹配下界增量更新与重新求解一致，且不超过实际推动次数
+        static = root.static
+        bound = static.assignment_bound(root.boxes)
+        box = min(root.box_positions())
+        moved = bound.moved(static.index(box), static.index((box[0] + 1, box[1])))
+        boxes = root.boxes ^ (1 << static.index(box)) ^ (1 << static.index((box[0] + 1, box[1])))
+        assert moved.total == static.assignment_bound(boxes).total
+        state, pushes = root, 0
+        for action in plan:
+            direction = ['UP', 'DOWN', 'LEFT', 'RIGHT'].index(action)
+            pushes += state.pushes_box(direction)
+            state = state.move(direction)
+        assert state.all_boxes_placed() and 2 <= bound.total <= pushes
+        for action in plan:
+            env.step(action)
+        assert env.game.is_terminal() and env.game.get_winner() == 0
+        
+        # 缓存容量有界，换关卡时整体作废
+        small = SokobanAI(player_id=1, cache_size=8)
+        small._layered_astar_search(root, 10, time.time())
+        caches = small.get_info()['caches']
+        assert all(stats['size'] <= 8 for stats in caches.values())
+        assert caches['heuristic']['evictions'] + caches['deadlock']['evictions'] > 0
+        small._heuristic(same)
+        assert small.heuristic_cache.clears == 2 and len(small.heuristic_cache) == 1
+        
+        # 计划缓存：与预期不符时重新规划，之后整局按计划逐步取动作
+        env = SokobanEnv(level_id=2, game_mode='cooperative')
+        observation, _ = env.reset()
+        player = SokobanAI(player_id=1)
+        with contextlib.redirect_stdout(io.StringIO()):
+            player.get_action(observation, env)
+            stale = player._plan
+            action = player.get_action(observation, env)  # 状态仍是第一步之前的，与预期不符
+            cached = player._plan
+            while not env.game.is_terminal():
+                observation, _, _, _, _ = env.step(action)
+                action = player.get_action(observation, env)
+        assert cached is not stale and player._plan is cached and cached['index'] == len(cached['actions'])
+        assert env.game.get_winner() == 0
+        
+        print(f"✓ 紧凑状态可哈希且共享静态数据，后继与游戏一致，推动级搜索 {len(plan)} 步完成关卡2")
+        return True
+    
+    except Exception as e:
+        print(f"✗ 紧凑搜索状态测试失败: {e}")
+        traceback.print_exc()
+        return False
+
 def test_agents():
     """测试智能体"""
     print("\n=== 测试智能体 ===")
@@ -148,6 +654,282 @@ def test_agents():
         return False
 
 
+def test_snake_ai():
+    """测试贪吃蛇AI（共享的BFS距离图）"""
+    print("\n=== 测试贪吃蛇AI ===")
+    
+    try:
+        from games.snake import SnakeEnv
+        from agents import SnakeAI, SmartSnakeAI
+        from utils.grid_pathfinding import get_pathfinder
+        
+        # 5x5棋盘，第2列除最后一行外都是墙
+        size = 5
+        grid = bytearray(size * size)
+        for row in range(size - 1):
+            grid[row * size + 2] = 1
+        pathfinder = get_pathfinder(size, size)
+        dist, order = pathfinder.distance_map(grid, [0], max_depth=100)
+        assert dist[4] == 4 + 2 * (size - 1) and dist[2] == -1
+        assert len(order) == size * size - (size - 1)
+        # 多源、深度上限和提前结束
+        dist, _ = pathfinder.distance_map(grid, [0, 4], max_depth=2)
+        assert dist[1] == 1 and dist[3] == 1 and dist[10] == 2 and dist[24] == -1
+        dist, order = pathfinder.distance_map(grid, [0], targets=[5])
+        assert dist[5] == 1 and order[-1] == 5
+        print("✓ BFS距离图正确")
+        
+        env = SnakeEnv(board_size=12, seed=0)
+        env.reset()
+        agents = {1: SnakeAI(player_id=1), 2: SmartSnakeAI(player_id=2)}
+        for _ in range(200):
+            action = agents[env.game.current_player].get_action(None, env)
+            assert action in env.get_valid_actions()
+            _, _, done, _, _ = env.step(action)
+            if done:
+                break
+        print(f"✓ 对局进行 {env.game.move_count} 步")
+        return True
+        
+    except Exception as e:
+        print(f"✗ 贪吃蛇AI测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+
+def test_path_cache():
+    """测试有界LRU路径缓存"""
+    print("\n=== 测试路径缓存 ===")
+    
+    try:
+        from utils.path_cache import PathCache
+        
+        cache = PathCache(max_size=2)
+        path = [(0, 0), (0, 1), (0, 2), (1, 2)]
+        cache.store('a', (0, 0), 1, path)
+        
+        # 起点在缓存路径上时复用后半段
+        assert cache.lookup('a', (0, 1), 1) == (True, path[1:])
+        assert cache.lookup('a', (5, 5), 1) == (False, None)
+        
+        # 局面变化但路径仍可走：命中；路径上有格子被占据：作废
+        assert cache.lookup('a', (0, 0), 2, lambda pos: False) == (True, path)
+        assert cache.lookup('a', (0, 0), 3, lambda pos: pos == (0, 2)) == (False, None)
+        assert len(cache) == 0 and cache.invalidations == 1
+        
+        # 超过容量时淘汰最久未使用的条目
+        for key in ('a', 'b', 'c'):
+            cache.store(key, (0, 0), 1, path)
+        stats = cache.get_stats()
+        assert stats['size'] == 2 and stats['evictions'] == 1
+        assert stats['hits'] == 2 and stats['misses'] == 2  # 作废的条目计为未命中
+        assert cache.lookup('a', (0, 0), 1) == (False, None)
+        print(f"✓ 路径缓存命中率 {stats['hit_rate']:.2f}，淘汰 {stats['evictions']} 条")
+        return True
+        
+    except Exception as e:
+        print(f"✗ 路径缓存测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+
+def test_grid_pathfinding():
+    """测试网格寻路器"""
+    print("\n=== 测试网格寻路 ===")
+    
+    try:
+        import random
+        from utils.grid_pathfinding import GridPathfinder
+        
+        # 随机网格上各算法与BFS的可达性一致，最短路径算法的长度相同
+        rng = random.Random(0)
+        pathfinder = GridPathfinder(12, 12)
+        for _ in range(200):
+            blocked = bytearray(1 if rng.random() < 0.3 else 0 for _ in range(144))
+            start, goal = (rng.randrange(12), rng.randrange(12)), (rng.randrange(12), rng.randrange(12))
+            expected = pathfinder.bfs(blocked, start, goal)
+            for algorithm in ('astar', 'bidirectional', 'jps', 'dfs'):
+                path = pathfinder.search(algorithm, blocked, start, goal)
+                assert bool(path) == bool(expected), algorithm
+                if path:
+                    assert path[0] == start and path[-1] == goal
+                    assert all(abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 for a, b in zip(path, path[1:]))
+                    assert all(not blocked[r * 12 + c] for r, c in path[1:])
+                    if algorithm != 'dfs':
+                        assert len(path) == len(expected), algorithm
+        
+        # 步数限制
+        open_grid = bytearray(144)
+        assert len(pathfinder.bfs(open_grid, (0, 0), (0, 5))) == 6
+        assert pathfinder.bfs(open_grid, (0, 0), (0, 5), max_depth=4) == []
+        assert len(pathfinder.dfs(open_grid, (0, 0), (0, 5), max_depth=5)) == 6
+        print("✓ BFS、A*、双向BFS、JPS、DFS结果一致")
+        return True
+    
+    except Exception as e:
+        print(f"✗ 网格寻路测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+
+def test_transposition_table():
+    """测试固定容量置换表"""
+    print("\n=== 测试置换表 ===")
+    
+    try:
+        from utils.transposition_table import TranspositionTable
+        
+        table = TranspositionTable(capacity=8)
+        table.store(3, 2, TranspositionTable.LOWER, 1.5, (0, 1))
+        assert table.probe(3) == (2, TranspositionTable.LOWER, 1.5, (0, 1))
+        assert table.probe(11) is None  # 同槽位的其他局面
+        
+        # 本轮搜索中浅的结果不覆盖深的结果，新一轮搜索后可以覆盖
+        table.store(11, 1, TranspositionTable.EXACT, 0.0)
+        assert table.probe(3) is not None
+        table.new_search()
+        table.store(11, 1, TranspositionTable.EXACT, 0.0)
+        assert table.probe(3) is None and table.probe(11)[2] == 0.0
+        
+        # 容量固定
+        for key in range(100):
+            table.store(key, 0, TranspositionTable.EXACT, key)
+        stats = table.get_stats()
+        assert stats['size'] <= 8
+        print(f"✓ 置换表占用 {stats['size']}/{stats['capacity']}，覆盖 {stats['overwrites']} 次")
+        return True
+        
+    except Exception as e:
+        print(f"✗ 置换表测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+
+def test_gomoku_mcts():
+    """测试五子棋MCTS（候选裁剪 + RAVE）"""
+    print("\n=== 测试五子棋MCTS ===")
+    
+    try:
+        from agents import MCTSBot
+        from games.gomoku import GomokuEnv
+        
+        env = GomokuEnv(board_size=9, win_length=5)
+        env.reset()
+        bot = MCTSBot(name="测试MCTSBot", player_id=1)
+        bot.simulation_count = 200
+        
+        # 空棋盘应下在中心
+        assert bot.get_action(None, env) == (4, 4)
+        
+        # 己方四连应直接取胜
+        for move in [(4, 0), (0, 0), (4, 1), (0, 2), (4, 2), (0, 4), (4, 3), (0, 6)]:
+            env.game.step(move)
+        assert bot.get_action(None, env) == (4, 4)
+        print("✓ 直接获胜检测成功")
+        
+        # 对手四连应封堵
+        env.reset()
+        for move in [(0, 0), (4, 1), (0, 2), (4, 2), (0, 4), (4, 3), (8, 8), (4, 4)]:
+            env.game.step(move)
+        assert bot.get_action(None, env) in [(4, 0), (4, 5)]
+        print("✓ 封堵检测成功")
+        
+        return True
+        
+    except Exception as e:
+        print(f"✗ 五子棋MCTS测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+
+def test_mcts_early_stop():
+    """测试MCTS提前终止（访问次数优势 + 置信界）"""
+    print("\n=== 测试MCTS提前终止 ===")
+    
+    try:
+        import contextlib
+        import io
+        from agents import MCTSBot
+        from games.gomoku import GomokuEnv
+        from games.snake import SnakeEnv
+        
+        # 跳三填空成活四是唯一好棋，领先者很快拉开差距
+        env = GomokuEnv(board_size=9, win_length=5)
+        env.reset()
+        for move in [(4, 2), (0, 0), (4, 3), (0, 8), (4, 5), (8, 0)]:
+            env.game.step(move)
+        bot = MCTSBot(name="测试MCTSBot", player_id=1)
+        bot.simulation_count = 2000
+        bot.timeout = 30.0
+        with contextlib.redirect_stdout(io.StringIO()):
+            assert bot.get_action(None, env) == (4, 4)
+        stats = bot.last_search_stats
+        assert stats['stop_reason'] == 'visit_margin' and stats['simulations'] < bot.simulation_count
+        assert stats['simulations_saved'] > 0
+        
+        # 只开置信界停止
+        env = SnakeEnv(board_size=8, seed=1)
+        env.reset()
+        bot.early_stop = False
+        bot.confidence_stop = 0.5
+        with contextlib.redirect_stdout(io.StringIO()):
+            bot.get_action(None, env)
+        stats = bot.last_search_stats
+        assert stats['stop_reason'] == 'confidence' and stats['simulations'] < bot.simulation_count
+        assert bot.get_info()['total_simulations_saved'] > stats['simulations_saved'] > 0
+        
+        print(f"✓ 提前终止生效，共节省约 {bot.total_simulations_saved} 次模拟")
+        return True
+    
+    except Exception as e:
+        print(f"✗ MCTS提前终止测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+
+def test_snake_simultaneous_mcts():
+    """测试贪吃蛇同时行动搜索（联合动作状态 + 解耦UCT）"""
+    print("\n=== 测试贪吃蛇同时行动MCTS ===")
+    
+    try:
+        import random
+        from agents import MCTSBot
+        from agents.ai_bots.mcts_bot import SnakeJointState
+        from games.snake import SnakeEnv, SnakeGame
+        
+        # 一层联合动作与真实对局的两步结果一致（不吃到食物时）
+        rng = random.Random(0)
+        game = SnakeGame(board_size=10, food_count=0, seed=0)
+        state = SnakeJointState.from_game(game)
+        for _ in range(20):
+            action1 = rng.choice(state.legal_actions(1))
+            assert sorted(state.legal_actions(1)) == sorted(game.get_valid_actions())
+            game.step(action1)
+            action2 = rng.choice(state.legal_actions(2))
+            if not game.is_terminal():
+                game.step(action2)
+            state.step(action1, action2)
+            assert [divmod(i, 10) for i in state.bodies[1]] == list(game.snake1)
+            assert [divmod(i, 10) for i in state.bodies[2]] == list(game.snake2)
+            assert state.get_winner() == game.get_winner()
+            if game.is_terminal():
+                break
+        
+        env = SnakeEnv(board_size=10, seed=1)
+        observation, _ = env.reset()
+        bot = MCTSBot(player_id=1, simultaneous_mode=True)
+        bot.simulation_count = 200
+        action = bot.get_action(observation, env)
+        assert action in env.get_valid_actions()
+        print(f"✓ 解耦UCT {bot.last_search_stats['simulations']} 次模拟，选择 {action}")
+        return True
+    
+    except Exception as e:
+        print(f"✗ 贪吃蛇同时行动MCTS测试失败: {e}")
+        traceback.print_exc()
+        return False
+
+
 def test_game_play():
     """测试游戏对战"""
     print("\n=== 测试游戏对战 ===")
@@ -259,7 +1041,22 @@ def run_all_tests():
         test_imports,
         test_gomoku_game,
         test_gomoku_env,
+        test_vec_gomoku_env,
+        test_observation_planes,
+        test_snake_game,
+        test_vec_snake_env,
+        test_multi_snake_game,
+        test_async_vector_env,
+        test_sokoban_level_registry,
+        test_sokoban_search_state,
         test_agents,
+        test_snake_ai,
+        test_path_cache,
+        test_grid_pathfinding,
+        test_transposition_table,
+        test_gomoku_mcts,
+        test_mcts_early_stop,
+        test_snake_simultaneous_mcts,
         test_game_play,
         test_evaluation,
         test_custom_agents
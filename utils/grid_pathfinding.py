@@ -0,0 +1,557 @@
+"""
+均匀网格寻路
+父指针数组和预分配的扁平缓冲区，提供BFS、A*、双向BFS、跳点搜索(JPS)、深度受限DFS
+以及多源有界BFS距离图
+"""
+
+import heapq
+import random
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+class GridPathfinder:
+    """
+    均匀网格（4邻接、每步代价1）上的寻路器
+    
+    格子用扁平下标 row * width + col 表示。父指针、距离和访问标记都保存在
+    预分配的列表中，用"代数"标记代替每次搜索前的清空，队列中只存下标，
+    不再为每个节点复制路径。
+    
+    blocked 参数为长度 height * width 的序列（bytearray、bytes、list等），非0表示障碍；
+    起点本身不检查是否为障碍。找不到路径时返回空列表。
+    """
+    
+    # 上、下、左、右
+    DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+    
+    def __init__(self, height: int, width: int):
+        """
+        初始化寻路器
+        
+        Args:
+            height: 网格行数
+            width: 网格列数
+        """
+        self.height = height
+        self.width = width
+        self.cell_count = height * width
+        
+        cells = self.cell_count
+        self._parent = [-1] * cells
+        self._dist = [0] * cells
+        self._stamp = [0] * cells
+        self._parent_back = [-1] * cells  # 双向BFS的反向搜索
+        self._dist_back = [0] * cells
+        self._stamp_back = [0] * cells
+        self._queue = [0] * cells
+        self._generation = 0
+        self.expanded = 0  # 最近一次搜索展开的节点数
+        
+        # 预先计算每个格子的邻居下标（按DIRECTIONS顺序）
+        self._neighbors = []
+        for row in range(height):
+            for col in range(width):
+                index = row * width + col
+                neighbors = []
+                if row > 0:
+                    neighbors.append(index - width)
+                if row < height - 1:
+                    neighbors.append(index + width)
+                if col > 0:
+                    neighbors.append(index - 1)
+                if col < width - 1:
+                    neighbors.append(index + 1)
+                self._neighbors.append(tuple(neighbors))
+    
+    def _next_generation(self) -> int:
+        """开始一次新的搜索"""
+        self._generation += 1
+        self.expanded = 0
+        return self._generation
+    
+    def _trace(self, parent: List[int], index: int) -> List[int]:
+        """沿父指针回溯到起点（返回从起点开始的下标列表）"""
+        path = []
+        while index >= 0:
+            path.append(index)
+            index = parent[index]
+        path.reverse()
+        return path
+    
+    def _to_positions(self, indices: List[int]) -> List[Tuple[int, int]]:
+        width = self.width
+        return [divmod(index, width) for index in indices]
+    
+    def bfs(self, blocked: Sequence[int], start: Tuple[int, int], goal: Tuple[int, int],
+            max_depth: Optional[int] = None) -> List[Tuple[int, int]]:
+        """
+        广度优先搜索
+        
+        Args:
+            blocked: 扁平障碍网格
+            start: 起点
+            goal: 终点
+            max_depth: 最多移动步数（None表示不限制）
+        
+        Returns:
+            从起点到终点的路径（含两端），不可达时为空列表
+        """
+        width = self.width
+        source = start[0] * width + start[1]
+        target = goal[0] * width + goal[1]
+        if source == target:
+            return [start]
+        if blocked[target]:
+            return []
+        
+        generation = self._next_generation()
+        stamp, parent, dist, queue = self._stamp, self._parent, self._dist, self._queue
+        neighbors = self._neighbors
+        limit = self.cell_count if max_depth is None else max_depth
+        
+        stamp[source] = generation
+        parent[source] = -1
+        dist[source] = 0
+        queue[0] = source
+        head, tail = 0, 1
+        
+        while head < tail:
+            index = queue[head]
+            head += 1
+            d = dist[index]
+            if d >= limit:
+                break
+            self.expanded += 1
+            
+            for neighbor in neighbors[index]:
+                if stamp[neighbor] != generation and not blocked[neighbor]:
+                    stamp[neighbor] = generation
+                    parent[neighbor] = index
+                    dist[neighbor] = d + 1
+                    if neighbor == target:
+                        return self._to_positions(self._trace(parent, neighbor))
+                    queue[tail] = neighbor
+                    tail += 1
+        
+        return []
+    
+    def distance_map(self, blocked: Sequence[int], sources: Iterable[int], max_depth: Optional[int] = None,
+                     targets: Optional[Iterable[int]] = None) -> Tuple[List[int], List[int]]:
+        """
+        多源有界BFS距离图
+        
+        返回的列表每次新建，调用方可以长期保存。
+        
+        Args:
+            blocked: 扁平障碍网格（起点本身不检查）
+            sources: 起点下标
+            max_depth: 最大距离（None表示不限制）
+            targets: 可选的目标下标，全部到达后提前结束
+        
+        Returns:
+            (每个格子到最近起点的距离（-1表示未到达）, 按距离递增访问的格子下标)
+        """
+        self._next_generation()
+        neighbors = self._neighbors
+        limit = self.cell_count if max_depth is None else max_depth
+        dist = [-1] * self.cell_count
+        order = []
+        for index in sources:
+            if dist[index] < 0:
+                dist[index] = 0
+                order.append(index)
+        
+        remaining = None
+        if targets is not None:
+            remaining = set(targets).difference(order)
+            if not remaining:
+                return dist, order
+        
+        head = 0
+        while head < len(order):
+            index = order[head]
+            head += 1
+            d = dist[index]
+            if d >= limit:
+                break  # 按距离递增出队，之后的格子都已到达深度上限
+            self.expanded += 1
+            
+            for neighbor in neighbors[index]:
+                if dist[neighbor] < 0 and not blocked[neighbor]:
+                    dist[neighbor] = d + 1
+                    order.append(neighbor)
+                    if remaining is not None:
+                        remaining.discard(neighbor)
+                        if not remaining:
+                            return dist, order
+        
+        return dist, order
+    
+    def astar(self, blocked: Sequence[int], start: Tuple[int, int], goal: Tuple[int, int],
+              max_depth: Optional[int] = None) -> List[Tuple[int, int]]:
+        """
+        A*搜索（曼哈顿距离启发）
+        
+        Args:
+            blocked: 扁平障碍网格
+            start: 起点
+            goal: 终点
+            max_depth: 最多移动步数（None表示不限制）
+        
+        Returns:
+            从起点到终点的最短路径，不可达时为空列表
+        """
+        width = self.width
+        source = start[0] * width + start[1]
+        target = goal[0] * width + goal[1]
+        if source == target:
+            return [start]
+        if blocked[target]:
+            return []
+        
+        generation = self._next_generation()
+        stamp, parent, dist = self._stamp, self._parent, self._dist
+        neighbors = self._neighbors
+        limit = self.cell_count if max_depth is None else max_depth
+        goal_row, goal_col = goal
+        
+        stamp[source] = generation
+        parent[source] = -1
+        dist[source] = 0
+        h = abs(start[0] - goal_row) + abs(start[1] - goal_col)
+        heap = [(h, h, source)]
+        
+        while heap:
+            f, h, index = heapq.heappop(heap)
+            g = f - h
+            if g > dist[index]:
+                continue  # 过期的堆条目
+            if index == target:
+                return self._to_positions(self._trace(parent, index))
+            if g >= limit:
+                continue
+            self.expanded += 1
+            
+            for neighbor in neighbors[index]:
+                if blocked[neighbor]:
+                    continue
+                if stamp[neighbor] != generation or g + 1 < dist[neighbor]:
+                    stamp[neighbor] = generation
+                    parent[neighbor] = index
+                    dist[neighbor] = g + 1
+                    row, col = divmod(neighbor, width)
+                    nh = abs(row - goal_row) + abs(col - goal_col)
+                    heapq.heappush(heap, (g + 1 + nh, nh, neighbor))
+        
+        return []
+    
+    def bidirectional_bfs(self, blocked: Sequence[int], start: Tuple[int, int], goal: Tuple[int, int],
+                          max_depth: Optional[int] = None) -> List[Tuple[int, int]]:
+        """
+        双向BFS：每次扩展较小的一侧的一整层，两侧相遇后取最短的连接
+        
+        Args:
+            blocked: 扁平障碍网格
+            start: 起点
+            goal: 终点
+            max_depth: 最多移动步数（None表示不限制）
+        
+        Returns:
+            从起点到终点的最短路径，不可达时为空列表
+        """
+        width = self.width
+        source = start[0] * width + start[1]
+        target = goal[0] * width + goal[1]
+        if source == target:
+            return [start]
+        if blocked[target]:
+            return []
+        
+        generation = self._next_generation()
+        neighbors = self._neighbors
+        limit = self.cell_count if max_depth is None else max_depth
+        sides = [
+            (self._stamp, self._parent, self._dist, [source]),
+            (self._stamp_back, self._parent_back, self._dist_back, [target])
+        ]
+        for stamp, parent, dist, frontier in sides:
+            stamp[frontier[0]] = generation
+            parent[frontier[0]] = -1
+            dist[frontier[0]] = 0
+        depth = [0, 0]
+        
+        while sides[0][3] and sides[1][3] and depth[0] + depth[1] < limit:
+            side = 0 if len(sides[0][3]) <= len(sides[1][3]) else 1
+            stamp, parent, dist, frontier = sides[side]
+            other_stamp, _, other_dist, _ = sides[1 - side]
+            
+            best_length, meeting = None, None
+            next_frontier = []
+            for index in frontier:
+                self.expanded += 1
+                d = dist[index] + 1
+                for neighbor in neighbors[index]:
+                    if blocked[neighbor] or stamp[neighbor] == generation:
+                        continue
+                    stamp[neighbor] = generation
+                    parent[neighbor] = index
+                    dist[neighbor] = d
+                    next_frontier.append(neighbor)
+                    if other_stamp[neighbor] == generation:
+                        length = d + other_dist[neighbor]
+                        if best_length is None or length < best_length:
+                            best_length, meeting = length, neighbor
+            sides[side] = (stamp, parent, dist, next_frontier)
+            depth[side] += 1
+            
+            if meeting is not None:
+                if best_length > limit:
+                    return []
+                forward = self._trace(self._parent, meeting)
+                backward = self._trace(self._parent_back, meeting)
+                backward.reverse()
+                return self._to_positions(forward + backward[1:])
+        
+        return []
+    
+    def jps(self, blocked: Sequence[int], start: Tuple[int, int], goal: Tuple[int, int],
+            max_depth: Optional[int] = None) -> List[Tuple[int, int]]:
+        """
+        4邻接网格上的跳点搜索
+        
+        水平方向一直跳到遇到强制邻居（上/下方的障碍在此结束）或终点为止；
+        垂直方向每走一格都向左右做一次水平跳跃，能找到跳点时停下。
+        只把跳点放进开放列表，跳点之间是直线，代价为曼哈顿距离。
+        
+        Args:
+            blocked: 扁平障碍网格
+            start: 起点
+            goal: 终点
+            max_depth: 最多移动步数（None表示不限制）
+        
+        Returns:
+            从起点到终点的最短路径（展开为逐格路径），不可达时为空列表
+        """
+        width, height = self.width, self.height
+        source = start[0] * width + start[1]
+        target = goal[0] * width + goal[1]
+        if source == target:
+            return [start]
+        if blocked[target]:
+            return []
+        
+        generation = self._next_generation()
+        stamp, parent, dist = self._stamp, self._parent, self._dist
+        limit = self.cell_count if max_depth is None else max_depth
+        goal_row, goal_col = goal
+        
+        def free(row, col):
+            return 0 <= row < height and 0 <= col < width and not blocked[row * width + col]
+        
+        def jump_horizontal(row, col, dc):
+            while True:
+                col += dc
+                if not free(row, col):
+                    return None
+                if row == goal_row and col == goal_col:
+                    return col
+                # 强制邻居：上/下方的障碍在这里结束
+                if ((free(row - 1, col) and not free(row - 1, col - dc)) or
+                        (free(row + 1, col) and not free(row + 1, col - dc))):
+                    return col
+        
+        def jump_vertical(row, col, dr):
+            while True:
+                row += dr
+                if not free(row, col):
+                    return None
+                if row == goal_row and col == goal_col:
+                    return row
+                if ((free(row, col - 1) and not free(row - dr, col - 1)) or
+                        (free(row, col + 1) and not free(row - dr, col + 1))):
+                    return row
+                if jump_horizontal(row, col, 1) is not None or jump_horizontal(row, col, -1) is not None:
+                    return row
+        
+        stamp[source] = generation
+        parent[source] = -1
+        dist[source] = 0
+        h = abs(start[0] - goal_row) + abs(start[1] - goal_col)
+        heap = [(h, h, source)]
+        
+        while heap:
+            f, h, index = heapq.heappop(heap)
+            g = f - h
+            if g > dist[index]:
+                continue
+            if index == target:
+                # 把跳点之间的直线段展开成逐格路径
+                jump_points = self._trace(parent, index)
+                path = [divmod(jump_points[0], width)]
+                for point in jump_points[1:]:
+                    row, col = divmod(point, width)
+                    last_row, last_col = path[-1]
+                    step_row = (row > last_row) - (row < last_row)
+                    step_col = (col > last_col) - (col < last_col)
+                    while (last_row, last_col) != (row, col):
+                        last_row += step_row
+                        last_col += step_col
+                        path.append((last_row, last_col))
+                return path
+            self.expanded += 1
+            
+            row, col = divmod(index, width)
+            from_index = parent[index]
+            back = None
+            if from_index >= 0:
+                from_row, from_col = divmod(from_index, width)
+                back = ((from_row > row) - (from_row < row), (from_col > col) - (from_col < col))
+            
+            for dr, dc in self.DIRECTIONS:
+                if (dr, dc) == back:
+                    continue
+                if dr == 0:
+                    jump_col = jump_horizontal(row, col, dc)
+                    if jump_col is None:
+                        continue
+                    point = row * width + jump_col
+                    cost = abs(jump_col - col)
+                else:
+                    jump_row = jump_vertical(row, col, dr)
+                    if jump_row is None:
+                        continue
+                    point = jump_row * width + col
+                    cost = abs(jump_row - row)
+                
+                new_g = g + cost
+                if new_g > limit:
+                    continue
+                if stamp[point] != generation or new_g < dist[point]:
+                    stamp[point] = generation
+                    parent[point] = index
+                    dist[point] = new_g
+                    point_row, point_col = divmod(point, width)
+                    nh = abs(point_row - goal_row) + abs(point_col - goal_col)
+                    heapq.heappush(heap, (new_g + nh, nh, point))
+        
+        return []
+    
+    def dfs(self, blocked: Sequence[int], start: Tuple[int, int], goal: Tuple[int, int],
+            max_depth: Optional[int] = None) -> List[Tuple[int, int]]:
+        """
+        深度受限DFS（显式栈，不受递归深度限制）
+        
+        记录每个格子被访问时的最小深度，有深度限制时只在以更小的深度到达时重新展开，
+        不会漏掉限制内可达的终点，也不会枚举所有简单路径；不限深度时每个格子只展开一次。
+        
+        Args:
+            blocked: 扁平障碍网格
+            start: 起点
+            goal: 终点
+            max_depth: 最多移动步数（None表示不限制）
+        
+        Returns:
+            找到的第一条路径（不保证最短），不可达时为空列表
+        """
+        width = self.width
+        source = start[0] * width + start[1]
+        target = goal[0] * width + goal[1]
+        if source == target:
+            return [start]
+        if blocked[target]:
+            return []
+        
+        generation = self._next_generation()
+        stamp, parent, dist = self._stamp, self._parent, self._dist
+        neighbors = self._neighbors
+        bounded = max_depth is not None
+        limit = max_depth if bounded else self.cell_count
+        
+        stamp[source] = generation
+        parent[source] = -1
+        dist[source] = 0
+        stack = [source]
+        
+        while stack:
+            index = stack.pop()
+            d = dist[index]
+            if d >= limit:
+                continue
+            self.expanded += 1
+            
+            # 逆序入栈，使DIRECTIONS中靠前的方向先被探索
+            for neighbor in reversed(neighbors[index]):
+                if blocked[neighbor]:
+                    continue
+                if stamp[neighbor] != generation or (bounded and d + 1 < dist[neighbor]):
+                    stamp[neighbor] = generation
+                    parent[neighbor] = index
+                    dist[neighbor] = d + 1
+                    if neighbor == target:
+                        return self._to_positions(self._trace(parent, neighbor))
+                    stack.append(neighbor)
+        
+        return []
+    
+    def search(self, algorithm: str, blocked: Sequence[int], start: Tuple[int, int],
+               goal: Tuple[int, int], max_depth: Optional[int] = None) -> List[Tuple[int, int]]:
+        """按名称调用搜索算法（"bfs"、"astar"、"bidirectional"、"jps"、"dfs"）"""
+        method = {
+            'bfs': self.bfs,
+            'astar': self.astar,
+            'bidirectional': self.bidirectional_bfs,
+            'jps': self.jps,
+            'dfs': self.dfs
+        }.get(algorithm, self.bfs)
+        return method(blocked, start, goal, max_depth)
+
+
+# 按网格尺寸缓存的寻路器，缓冲区在同尺寸的搜索之间复用
+_pathfinders: Dict[Tuple[int, int], GridPathfinder] = {}
+
+
+def get_pathfinder(height: int, width: int) -> GridPathfinder:
+    """获取某个网格尺寸的共享寻路器"""
+    pathfinder = _pathfinders.get((height, width))
+    if pathfinder is None:
+        pathfinder = GridPathfinder(height, width)
+        _pathfinders[(height, width)] = pathfinder
+    return pathfinder
+
+
+def benchmark_pathfinding(sizes: Sequence[int] = (20, 200), density: float = 0.25,
+                          queries: int = 50, seed: int = 0) -> Dict[int, Dict[str, float]]:
+    """
+    在随机障碍网格上比较各算法的平均耗时
+    
+    Args:
+        sizes: 网格边长列表
+        density: 障碍比例
+        queries: 每种尺寸的随机起终点对数
+        seed: 随机种子
+    
+    Returns:
+        {边长: {算法: 平均毫秒}}
+    """
+    rng = random.Random(seed)
+    results = {}
+    for size in sizes:
+        blocked = bytearray(1 if rng.random() < density else 0 for _ in range(size * size))
+        free_cells = [divmod(i, size) for i in range(size * size) if not blocked[i]]
+        pairs = [(rng.choice(free_cells), rng.choice(free_cells)) for _ in range(queries)]
+        pathfinder = GridPathfinder(size, size)
+        
+        results[size] = {}
+        for algorithm in ('bfs', 'astar', 'bidirectional', 'jps', 'dfs'):
+            start_time = time.perf_counter()
+            for start, goal in pairs:
+                pathfinder.search(algorithm, blocked, start, goal)
+            elapsed = (time.perf_counter() - start_time) / len(pairs) * 1000
+            results[size][algorithm] = elapsed
+            print(f"{size}x{size} {algorithm:>13}: {elapsed:.3f} ms/次")
+    return results
+
+
+if __name__ == '__main__':
+    benchmark_pathfinding()
@@ -0,0 +1,86 @@
+"""
+有界LRU缓存
+供搜索类智能体缓存启发值、评估值、死锁判定等结果，容量固定，带命中/未命中/淘汰统计；
+路径缓存PathCache也用它做存储和统计
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Hashable
+
+
+class LRUCache:
+    """
+    有界LRU缓存
+    
+    超过容量时淘汰最久未使用的条目。clear()用于整体作废（如切换关卡），统计保留。
+    """
+    
+    def __init__(self, max_size: int = 50000):
+        """
+        初始化缓存
+        
+        Args:
+            max_size: 最多保存的条目数
+        """
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.clears = 0
+    
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """查询条目，未命中时返回default"""
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+    
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """查询条目但不计入统计、不更新使用顺序（调用方校验条目后再用get计数）"""
+        return self._entries.get(key, default)
+    
+    def record_miss(self):
+        """记一次未命中（如条目存在但调用方校验后判定不可用）"""
+        self.misses += 1
+    
+    def discard(self, key: Hashable):
+        """删除条目（不存在时忽略）"""
+        self._entries.pop(key, None)
+    
+    def put(self, key: Hashable, value: Any):
+        """保存条目，超过容量时淘汰最久未使用的条目"""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def clear(self):
+        """清空缓存（统计保留）"""
+        if self._entries:
+            self._entries.clear()
+        self.clears += 1
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """获取命中率、大小和淘汰统计"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'evictions': self.evictions,
+            'clears': self.clears
+        }
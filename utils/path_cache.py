@@ -0,0 +1,102 @@
+"""
+有界LRU路径缓存
+目前由SearchAI使用（默认共享同一个实例），进程内长期运行时内存保持有界
+"""
+
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+from utils.lru_cache import LRUCache
+
+
+class PathCache:
+    """
+    有界LRU路径缓存
+    
+    键为稳定的查询描述（如 (算法, 棋盘大小, 终点)），条目记录路径和计算时的局面标记
+    （如SnakeGame.occupancy_hash）。查询时：
+        - 起点在缓存路径上即可复用其后半段（最短路径的子路径仍是最短路径）；
+        - 局面标记相同直接命中；标记不同时检查路径上的格子，
+          仍然全部可走则命中，有格子被占据则作废该条目。
+    """
+    
+    def __init__(self, max_size: int = 4096):
+        """
+        初始化缓存
+        
+        Args:
+            max_size: 最多保存的条目数，超过后淘汰最久未使用的条目
+        """
+        self._cache = LRUCache(max_size)  # 存储、淘汰和命中统计
+        self.invalidations = 0
+    
+    def lookup(self, key: Hashable, start: Tuple[int, int], token: Hashable,
+               is_blocked: Optional[Callable[[Tuple[int, int]], bool]] = None) -> Tuple[bool, Optional[List]]:
+        """
+        查询缓存
+        
+        Args:
+            key: 查询键
+            start: 当前起点
+            token: 当前局面标记
+            is_blocked: 判断格子是否被占据的函数；为None时只接受标记完全相同的条目
+        
+        Returns:
+            (是否命中, 从start出发的路径)
+        """
+        entry = self._cache.peek(key)
+        if entry is None:
+            self._cache.record_miss()
+            return False, None
+        
+        cached_token, origin, path = entry
+        if not path:
+            # 不可达的结果只能在同一起点、同一局面下复用
+            if origin != start or cached_token != token:
+                self._cache.record_miss()
+                return False, None
+        else:
+            try:
+                offset = path.index(start)
+            except ValueError:
+                self._cache.record_miss()
+                return False, None
+            path = path[offset:]
+            
+            if cached_token != token:
+                # 局面变了：路径上有格子被占据则作废
+                if is_blocked is None or any(is_blocked(pos) for pos in path[1:]):
+                    self._cache.discard(key)
+                    self.invalidations += 1
+                    self._cache.record_miss()
+                    return False, None
+        
+        self._cache.get(key)  # 计一次命中并更新使用顺序
+        return True, path
+    
+    def store(self, key: Hashable, start: Tuple[int, int], token: Hashable, path: Optional[List]):
+        """
+        保存路径
+        
+        Args:
+            key: 查询键
+            start: 查询的起点
+            token: 计算时的局面标记
+            path: 路径（None或空列表表示不可达）
+        """
+        self._cache.put(key, (token, start, path))
+    
+    def clear(self):
+        """清空缓存（统计保留）"""
+        self._cache.clear()
+    
+    def __len__(self) -> int:
+        return len(self._cache)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """获取命中率、大小、淘汰和作废统计"""
+        stats = self._cache.get_stats()
+        stats['invalidations'] = self.invalidations
+        return stats
+
+
+# 进程内共享的路径缓存，SearchAI默认使用
+shared_path_cache = PathCache()
@@ -0,0 +1,250 @@
+"""
+推箱子关卡静态分析
+死格（箱子无论如何都推不到任何目标的格子）和推动距离表只由墙壁和目标决定，每个关卡计算一次；
+推动距离上的最小代价匹配给出解所需推动次数的下界
+"""
+
+from collections import OrderedDict, deque
+from typing import FrozenSet, Iterable, Sequence, Tuple
+
+import numpy as np
+
+
+# 上、下、左、右
+DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+
+def compute_dead_squares(walls: Sequence[int], height: int, width: int,
+                         targets: Iterable[Tuple[int, int]]) -> bytes:
+    """
+    计算死格位图
+    
+    从每个目标出发做反向"拉箱子"洪泛：箱子能从格子b推到相邻格子c，
+    要求b和推箱时玩家所站的格子(b再往反方向一格)都不是墙。能被拉到的格子是活格，
+    其余非墙格子都是死格。只考虑墙壁，不考虑其他箱子，因此箱子停在死格上必然无解。
+    
+    Args:
+        walls: 墙壁位图，长度 height * width，下标为 row * width + col，非0为墙
+        height: 行数
+        width: 列数
+        targets: 目标位置
+    
+    Returns:
+        死格位图，1为死格（墙壁为0）
+    """
+    cells = height * width
+    live = bytearray(cells)
+    queue = deque()
+    for row, col in targets:
+        if 0 <= row < height and 0 <= col < width and not walls[row * width + col]:
+            index = row * width + col
+            if not live[index]:
+                live[index] = 1
+                queue.append(index)
+    
+    while queue:
+        index = queue.popleft()
+        row, col = divmod(index, width)
+        for dr, dc in DIRECTIONS:
+            # 箱子从 (row-dr, col-dc) 推到 (row, col)，玩家站在 (row-2dr, col-2dc)
+            player_row, player_col = row - 2 * dr, col - 2 * dc
+            if not (0 <= player_row < height and 0 <= player_col < width):
+                continue
+            box_index = index - dr * width - dc
+            if live[box_index] or walls[box_index] or walls[player_row * width + player_col]:
+                continue
+            live[box_index] = 1
+            queue.append(box_index)
+    
+    dead = bytearray(cells)
+    for index in range(cells):
+        if not live[index] and not walls[index]:
+            dead[index] = 1
+    return bytes(dead)
+
+
+# 观察棋盘 -> 死格集合，按 (墙壁字节, 形状, 目标) 缓存
+_dead_square_cache = OrderedDict()
+_DEAD_SQUARE_CACHE_SIZE = 64
+
+
+def get_dead_squares(board: np.ndarray, targets: Iterable[Tuple[int, int]]) -> FrozenSet[Tuple[int, int]]:
+    """
+    从数字棋盘（1为墙壁）获取死格集合，同一关卡只计算一次
+    
+    Args:
+        board: 观察中的数字棋盘
+        targets: 目标位置
+    
+    Returns:
+        死格坐标集合
+    """
+    walls = np.ascontiguousarray(board == 1)
+    targets = frozenset(targets)
+    key = (walls.tobytes(), walls.shape, targets)
+    dead_squares = _dead_square_cache.get(key)
+    if dead_squares is not None:
+        _dead_square_cache.move_to_end(key)
+        return dead_squares
+    
+    height, width = walls.shape
+    bitmap = compute_dead_squares(key[0], height, width, targets)
+    dead_squares = frozenset(divmod(index, width) for index, dead in enumerate(bitmap) if dead)
+    _dead_square_cache[key] = dead_squares
+    if len(_dead_square_cache) > _DEAD_SQUARE_CACHE_SIZE:
+        _dead_square_cache.popitem(last=False)
+    return dead_squares
+
+
+# 推不到目标的距离
+INF_DISTANCE = 1 << 20
+
+
+def compute_push_distances(walls: Sequence[int], height: int, width: int,
+                           targets: Sequence[Tuple[int, int]]) -> Tuple[Tuple[int, ...], ...]:
+    """
+    计算推动距离表
+    
+    对每个目标做一次与compute_dead_squares相同的反向"拉箱子"BFS，得到只考虑墙壁时
+    箱子从每个格子推到该目标的最少推动次数。
+    
+    Args:
+        walls: 墙壁位图，长度 height * width，非0为墙
+        height: 行数
+        width: 列数
+        targets: 目标位置（表的顺序与之一致）
+    
+    Returns:
+        tables[k][row * width + col] 为推到第k个目标的最少推动次数，推不到时为INF_DISTANCE
+    """
+    cells = height * width
+    tables = []
+    for row, col in targets:
+        distance = [INF_DISTANCE] * cells
+        if 0 <= row < height and 0 <= col < width and not walls[row * width + col]:
+            distance[row * width + col] = 0
+            queue = deque([row * width + col])
+            while queue:
+                index = queue.popleft()
+                box_row, box_col = divmod(index, width)
+                for dr, dc in DIRECTIONS:
+                    player_row, player_col = box_row - 2 * dr, box_col - 2 * dc
+                    if not (0 <= player_row < height and 0 <= player_col < width):
+                        continue
+                    box_index = index - dr * width - dc
+                    if (distance[box_index] != INF_DISTANCE or walls[box_index]
+                            or walls[player_row * width + player_col]):
+                        continue
+                    distance[box_index] = distance[index] + 1
+                    queue.append(box_index)
+        tables.append(tuple(distance))
+    return tuple(tables)
+
+
+class AssignmentBound:
+    """
+    箱子到目标的最小代价匹配（匈牙利算法）
+    
+    代价为推动距离表中的推动次数，匹配总代价是解所需推动次数的下界。目标多于箱子时
+    补上代价为0的虚拟行凑成方阵，保证每个目标都有匹配。保留对偶变量和匹配结果，
+    单个箱子移动后只需重新增广这一行，复杂度 O(m²)，不必从头求解的 O(m³)。
+    """
+    
+    __slots__ = ('tables', 'rows', 'u', 'v', 'match', 'total')
+    
+    def __init__(self, tables: Sequence[Sequence[int]], boxes: Sequence[int]):
+        """
+        求解匹配
+        
+        Args:
+            tables: compute_push_distances的结果
+            boxes: 箱子的格子下标
+        """
+        self.tables = tables
+        # 虚拟行的格子下标为-1
+        self.rows = list(boxes) + [-1] * (len(tables) - len(boxes))
+        self.u = [0] * (len(self.rows) + 1)
+        self.v = [0] * (len(tables) + 1)
+        # match[j]: 第j个目标（从1开始）匹配的行号（从1开始），0为未匹配
+        self.match = [0] * (len(tables) + 1)
+        self.total = 0
+        if len(boxes) > len(tables):
+            self.total = INF_DISTANCE
+            return
+        for row in range(1, len(self.rows) + 1):
+            self._augment(row)
+        self._update_total()
+    
+    def moved(self, old_cell: int, new_cell: int) -> 'AssignmentBound':
+        """
+        箱子从old_cell移到new_cell后的匹配（返回新对象，原对象不变）
+        
+        只有这一行的代价变化：解除它的匹配后从这一行做一次增广，其余行的对偶可行性和匹配保持不变。
+        """
+        bound = AssignmentBound.__new__(AssignmentBound)
+        bound.tables = self.tables
+        bound.rows = self.rows[:]
+        bound.u = self.u[:]
+        bound.v = self.v[:]
+        bound.match = self.match[:]
+        if len(self.rows) > len(self.tables):
+            bound.total = self.total
+            return bound
+        row = bound.rows.index(old_cell) + 1
+        bound.rows[row - 1] = new_cell
+        bound.match[bound.match.index(row, 1)] = 0
+        bound._augment(row)
+        bound._update_total()
+        return bound
+    
+    def _augment(self, row: int):
+        """从空闲行row出发沿最短增广路增广（对偶变量同步调整）"""
+        tables = self.tables
+        rows = self.rows
+        u, v, match = self.u, self.v, self.match
+        columns = len(tables)
+        match[0] = row
+        minv = [float('inf')] * (columns + 1)
+        way = [0] * (columns + 1)
+        used = [False] * (columns + 1)
+        column = 0
+        while True:
+            used[column] = True
+            current = match[column]
+            cell = rows[current - 1]
+            delta = float('inf')
+            next_column = 0
+            for j in range(1, columns + 1):
+                if used[j]:
+                    continue
+                cost = tables[j - 1][cell] if cell >= 0 else 0
+                reduced = cost - u[current] - v[j]
+                if reduced < minv[j]:
+                    minv[j] = reduced
+                    way[j] = column
+                if minv[j] < delta:
+                    delta = minv[j]
+                    next_column = j
+            for j in range(columns + 1):
+                if used[j]:
+                    u[match[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            column = next_column
+            if match[column] == 0:
+                break
+        while column:
+            previous = way[column]
+            match[column] = match[previous]
+            column = previous
+        match[0] = 0
+    
+    def _update_total(self):
+        """按匹配结果累计真实箱子的代价"""
+        total = 0
+        for j in range(1, len(self.tables) + 1):
+            cell = self.rows[self.match[j] - 1]
+            if cell >= 0:
+                total += self.tables[j - 1][cell]
+        self.total = min(total, INF_DISTANCE)
@@ -0,0 +1,433 @@
+"""
+推箱子紧凑搜索状态
+关卡静态数据（墙壁、目标、死格、移动表）每个关卡只构建一次并按引用共享，
+搜索状态只保存箱子位集、玩家格子下标和预先计算好的哈希
+"""
+
+from array import array
+from collections import OrderedDict, deque
+from typing import Any, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from utils.sokoban_analysis import DIRECTIONS, AssignmentBound, compute_push_distances, get_dead_squares
+
+
+# 与DIRECTIONS顺序一致
+ACTIONS = ('UP', 'DOWN', 'LEFT', 'RIGHT')
+ACTION_INDEX = {action: index for index, action in enumerate(ACTIONS)}
+
+
+class SokobanStaticMap:
+    """
+    推箱子关卡静态数据
+    
+    格子下标为 row * width + col。moves[index][d] 是从格子index沿方向d走一步到达的格子，
+    越界或撞墙时为-1，后继生成因此不需要做边界和墙壁判断。push_distances是每个目标的
+    推动距离表，用于最小匹配下界。
+    """
+    
+    __slots__ = ('board', 'height', 'width', 'walls', 'open_bits', 'left_mask', 'right_mask',
+                 'moves', 'targets', 'target_bits', 'dead_squares', 'dead_bits', 'push_distances')
+    
+    def __init__(self, board: np.ndarray, targets: Iterable[Tuple[int, int]]):
+        """
+        构建静态数据
+        
+        Args:
+            board: 观察中的数字棋盘（1为墙壁）
+            targets: 目标位置
+        """
+        walls = np.ascontiguousarray(board == 1)
+        height, width = walls.shape
+        targets = frozenset(targets)
+        dead_squares = get_dead_squares(board, targets)
+        
+        # 只保留墙壁，供评估函数按 board[row, col] == 1 判断
+        self.board = walls.astype(np.int8)
+        self.height = height
+        self.width = width
+        self.targets = targets
+        self.target_bits = self.encode(targets)
+        self.dead_squares = dead_squares
+        self.dead_bits = self.encode(self.dead_squares)
+        
+        wall_bytes = walls.tobytes()
+        self.walls = wall_bytes
+        self.open_bits = sum(1 << index for index, wall in enumerate(wall_bytes) if not wall)
+        # 整体平移时挡住跨行回绕：向右一格（下标+1）的结果不能落在第一列，向左一格的结果不能落在最后一列
+        self.left_mask = sum(1 << index for index in range(height * width) if index % width != width - 1)
+        self.right_mask = sum(1 << index for index in range(height * width) if index % width != 0)
+        moves = []
+        for index in range(height * width):
+            row, col = divmod(index, width)
+            neighbors = []
+            for dr, dc in DIRECTIONS:
+                new_row, new_col = row + dr, col + dc
+                if (0 <= new_row < height and 0 <= new_col < width
+                        and not wall_bytes[new_row * width + new_col]):
+                    neighbors.append(new_row * width + new_col)
+                else:
+                    neighbors.append(-1)
+            moves.append(tuple(neighbors))
+        self.moves = tuple(moves)
+        # 推动距离表，列顺序为按坐标排序的目标
+        self.push_distances = compute_push_distances(wall_bytes, height, width, sorted(targets))
+    
+    def index(self, pos: Tuple[int, int]) -> int:
+        """坐标 -> 格子下标"""
+        return int(pos[0]) * self.width + int(pos[1])
+    
+    def position(self, index: int) -> Tuple[int, int]:
+        """格子下标 -> 坐标"""
+        return divmod(index, self.width)
+    
+    def encode(self, positions: Iterable[Tuple[int, int]]) -> int:
+        """坐标集合 -> 位集（越界坐标忽略）"""
+        bits = 0
+        for row, col in positions:
+            if 0 <= row < self.height and 0 <= col < self.width:
+                bits |= 1 << int(row * self.width + col)
+        return bits
+    
+    def decode(self, bits: int) -> Set[Tuple[int, int]]:
+        """位集 -> 坐标集合"""
+        positions = set()
+        width = self.width
+        while bits:
+            low = bits & -bits
+            positions.add(divmod(low.bit_length() - 1, width))
+            bits ^= low
+        return positions
+    
+    def reachable(self, start: int, boxes: int) -> int:
+        """
+        从格子start出发、不穿过箱子能走到的格子位集
+        
+        整个位集一起向四个方向平移扩张，每轮扩张一层，不需要逐格出入队列。
+        """
+        free = (self.open_bits & ~boxes) | (1 << start)
+        width = self.width
+        left_mask = self.left_mask
+        right_mask = self.right_mask
+        reach = 1 << start
+        while True:
+            grown = (reach | (reach << width) | (reach >> width)
+                     | ((reach << 1) & right_mask) | ((reach >> 1) & left_mask)) & free
+            if grown == reach:
+                return reach
+            reach = grown
+    
+    def walk_path(self, start: int, goal: int, boxes: int) -> Optional[List[int]]:
+        """
+        不推箱子从start走到goal的最短路径
+        
+        Returns:
+            方向下标列表，走不到时为None
+        """
+        if start == goal:
+            return []
+        moves = self.moves
+        parents = {start: None}
+        queue = deque([start])
+        while queue:
+            index = queue.popleft()
+            for direction, step in enumerate(moves[index]):
+                if step < 0 or step in parents or boxes >> step & 1:
+                    continue
+                parents[step] = (index, direction)
+                if step == goal:
+                    path = []
+                    while parents[step] is not None:
+                        step, direction = parents[step]
+                        path.append(direction)
+                    path.reverse()
+                    return path
+                queue.append(step)
+        return None
+    
+    def assignment_bound(self, boxes: int) -> AssignmentBound:
+        """箱子位集到目标的最小推动次数匹配"""
+        cells = []
+        while boxes:
+            low = boxes & -boxes
+            cells.append(low.bit_length() - 1)
+            boxes ^= low
+        return AssignmentBound(self.push_distances, cells)
+    
+    def state(self, player_pos: Optional[Tuple[int, int]], boxes: Iterable[Tuple[int, int]],
+              exempt: Iterable[Tuple[int, int]] = ()) -> 'SokobanSearchState':
+        """由坐标创建搜索状态（没有玩家时玩家下标为-1；exempt为开局就在死格上、从未推动过的箱子）"""
+        player = self.index(player_pos) if player_pos else -1
+        return SokobanSearchState(self, self.encode(boxes), player, self.encode(exempt))
+
+
+class SokobanSearchState:
+    """
+    紧凑的推箱子搜索状态
+    
+    只包含静态数据引用、箱子位集、玩家格子下标和哈希，可直接放进集合或作为字典键。
+    相等只比较箱子、玩家和免检箱子（同一次搜索中静态数据相同）。
+    exempt是开局就停在死格上、之后从未推动过的箱子位集：这些箱子不按死格判死锁，
+    被推动后对应的位清除，之后推到同一格子的箱子照常判死锁。
+    为兼容按字典读取状态的评估函数，支持 state['board'] / ['boxes'] / ['targets'] /
+    ['player_pos'] / ['dead_squares'] 只读访问，其中'boxes'每次按位集解码。
+    """
+    
+    __slots__ = ('static', 'boxes', 'player', 'exempt', '_hash')
+    
+    def __init__(self, static: SokobanStaticMap, boxes: int, player: int, exempt: int = 0):
+        self.static = static
+        self.boxes = boxes
+        self.player = player
+        self.exempt = exempt
+        self._hash = hash((boxes, player, exempt))
+    
+    def move(self, direction: int) -> Optional['SokobanSearchState']:
+        """
+        沿方向移动玩家（必要时推箱子）
+        
+        Args:
+            direction: 方向下标，对应ACTIONS
+        
+        Returns:
+            后继状态，动作不合法时为None
+        """
+        if self.player < 0:
+            return None
+        moves = self.static.moves
+        step = moves[self.player][direction]
+        if step < 0:
+            return None
+        boxes = self.boxes
+        exempt = self.exempt
+        if boxes >> step & 1:
+            beyond = moves[step][direction]
+            if beyond < 0 or boxes >> beyond & 1:
+                return None
+            boxes ^= (1 << step) | (1 << beyond)
+            exempt &= ~(1 << step)
+        return SokobanSearchState(self.static, boxes, step, exempt)
+    
+    def pushes_box(self, direction: int) -> bool:
+        """该方向的移动是否会推动箱子"""
+        if self.player < 0:
+            return False
+        step = self.static.moves[self.player][direction]
+        return step >= 0 and bool(self.boxes >> step & 1)
+    
+    def region(self, obstacles: int = 0) -> int:
+        """玩家不推箱子能到达的格子位集（obstacles为额外不可进入的格子，如另一名玩家）"""
+        return self.static.reachable(self.player, self.boxes | obstacles)
+    
+    def normalized(self, region: Optional[int] = None) -> 'SokobanSearchState':
+        """
+        玩家换成可达区域内下标最小的格子
+        
+        同一箱子布局下玩家在同一连通区域内的状态可以互相到达，归一化后视为同一个推动级节点。
+        """
+        if self.player < 0:
+            return self
+        if region is None:
+            region = self.region()
+        player = (region & -region).bit_length() - 1
+        if player == self.player:
+            return self
+        return SokobanSearchState(self.static, self.boxes, player, self.exempt)
+    
+    def pushes(self, region: Optional[int] = None, obstacles: int = 0) -> List[Tuple[int, int, 'SokobanSearchState']]:
+        """
+        玩家可达区域内的所有合法推动
+        
+        Args:
+            region: 玩家可达区域，默认现算
+            obstacles: 额外不可进入的格子位集（箱子也不能推进去）
+        
+        Returns:
+            [(推箱时玩家所站格子, 方向下标, 推动后的状态), ...]，推动后玩家站在箱子原来的格子
+        """
+        if self.player < 0:
+            return []
+        if region is None:
+            region = self.region(obstacles)
+        moves = self.static.moves
+        boxes = self.boxes
+        exempt = self.exempt
+        blocked = boxes | obstacles
+        result = []
+        bits = boxes
+        while bits:
+            low = bits & -bits
+            bits ^= low
+            box = low.bit_length() - 1
+            for direction in range(4):
+                # 方向下标两两相反：UP/DOWN、LEFT/RIGHT
+                stand = moves[box][direction ^ 1]
+                beyond = moves[box][direction]
+                if stand < 0 or beyond < 0 or not (region >> stand & 1) or blocked >> beyond & 1:
+                    continue
+                result.append((stand, direction,
+                               SokobanSearchState(self.static, boxes ^ low ^ (1 << beyond), box, exempt & ~low)))
+        return result
+    
+    def is_solved(self) -> bool:
+        """箱子是否正好占满所有目标"""
+        return self.boxes == self.static.target_bits
+    
+    def all_boxes_placed(self) -> bool:
+        """是否所有箱子都在目标上（目标多于箱子时这是能达到的最好结果）"""
+        return not self.boxes & ~self.static.target_bits
+    
+    def has_dead_box(self) -> bool:
+        """是否有箱子停在死格上（目标不会是死格；免检箱子除外）"""
+        return bool(self.boxes & ~self.exempt & self.static.dead_bits)
+    
+    def has_frozen_square(self, box: int) -> bool:
+        """
+        格子box上的箱子是否与墙壁、其他箱子组成2x2方块
+        
+        方块里的箱子谁都推不动，只要其中有一个箱子不在目标上就是死锁。
+        """
+        static = self.static
+        width = static.width
+        row, col = divmod(box, width)
+        
+        def blocked(r, c):
+            if not (0 <= r < static.height and 0 <= c < width):
+                return True
+            index = r * width + c
+            return bool(static.walls[index] or self.boxes >> index & 1)
+        
+        for dr in (-1, 1):
+            for dc in (-1, 1):
+                if not (blocked(row + dr, col) and blocked(row, col + dc) and blocked(row + dr, col + dc)):
+                    continue
+                square = 1 << box
+                for r, c in ((row + dr, col), (row, col + dc), (row + dr, col + dc)):
+                    if 0 <= r < static.height and 0 <= c < width:
+                        square |= 1 << (r * width + c)
+                if self.boxes & square & ~static.target_bits:
+                    return True
+        return False
+    
+    @property
+    def player_pos(self) -> Optional[Tuple[int, int]]:
+        """玩家坐标"""
+        return self.static.position(self.player) if self.player >= 0 else None
+    
+    def box_positions(self) -> Set[Tuple[int, int]]:
+        """箱子坐标集合"""
+        return self.static.decode(self.boxes)
+    
+    def __getitem__(self, key: str) -> Any:
+        if key == 'boxes':
+            return self.box_positions()
+        if key == 'player_pos':
+            return self.player_pos
+        if key == 'targets':
+            return self.static.targets
+        if key == 'board':
+            return self.static.board
+        if key == 'dead_squares':
+            # 免检箱子所在的格子在本状态中不算死格
+            if self.exempt:
+                return self.static.dead_squares - self.static.decode(self.exempt)
+            return self.static.dead_squares
+        raise KeyError(key)
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+    
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, SokobanSearchState):
+            return NotImplemented
+        return self.boxes == other.boxes and self.player == other.player and self.exempt == other.exempt
+    
+    def __hash__(self) -> int:
+        return self._hash
+    
+    def __repr__(self) -> str:
+        return f"SokobanSearchState(player={self.player_pos}, boxes={sorted(self.box_positions())})"
+
+
+class SearchNodeTable:
+    """
+    A*搜索节点表
+    
+    每个状态驻留为一个整数ID，父节点ID、到达该节点的动作编码和代价存放在平行的紧凑数组中，
+    堆中只放 (f, 次序, ID)。路径只在找到解时沿父指针回溯一次，扩展时不复制路径列表。
+    """
+    
+    __slots__ = ('states', 'ids', 'parents', 'moves', 'costs')
+    
+    def __init__(self):
+        self.states = []
+        self.ids = {}
+        self.parents = array('i')
+        self.moves = array('i')
+        self.costs = array('i')
+    
+    def add(self, state: SokobanSearchState, parent: int = -1, move: int = -1, cost: int = 0) -> int:
+        """驻留新状态，返回其ID"""
+        node = len(self.states)
+        self.states.append(state)
+        self.ids[state] = node
+        self.parents.append(parent)
+        self.moves.append(move)
+        self.costs.append(cost)
+        return node
+    
+    def relink(self, node: int, parent: int, move: int, cost: int):
+        """找到代价更低的到达方式时更新父指针"""
+        self.parents[node] = parent
+        self.moves[node] = move
+        self.costs[node] = cost
+    
+    def get(self, state: SokobanSearchState) -> Optional[int]:
+        """状态的ID，未驻留时为None"""
+        return self.ids.get(state)
+    
+    def path(self, node: int) -> List[int]:
+        """从根节点到node的动作编码序列"""
+        moves = []
+        while self.parents[node] >= 0:
+            moves.append(self.moves[node])
+            node = self.parents[node]
+        moves.reverse()
+        return moves
+    
+    def __len__(self) -> int:
+        return len(self.states)
+
+# (墙壁字节, 形状, 目标) -> 静态数据
+_static_map_cache = OrderedDict()
+_STATIC_MAP_CACHE_SIZE = 64
+
+
+def get_static_map(board: np.ndarray, targets: Iterable[Tuple[int, int]]) -> SokobanStaticMap:
+    """
+    获取关卡静态数据，同一关卡（墙壁和目标相同）只构建一次
+    
+    Args:
+        board: 观察中的数字棋盘（1为墙壁）
+        targets: 目标位置
+    
+    Returns:
+        共享的静态数据
+    """
+    walls = np.ascontiguousarray(board == 1)
+    targets = frozenset(targets)
+    key = (walls.tobytes(), walls.shape, targets)
+    static = _static_map_cache.get(key)
+    if static is not None:
+        _static_map_cache.move_to_end(key)
+        return static
+    
+    static = SokobanStaticMap(board, targets)
+    _static_map_cache[key] = static
+    if len(_static_map_cache) > _STATIC_MAP_CACHE_SIZE:
+        _static_map_cache.popitem(last=False)
+    return static
@@ -0,0 +1,113 @@
+"""
+固定容量置换表
+供Alpha-Beta搜索缓存局面的搜索结果，条目带有界标记，内存不随搜索规模增长
+"""
+
+from typing import Any, Dict, Optional, Tuple
+
+
+class TranspositionTable:
+    """
+    固定容量置换表
+    
+    槽位数组在创建时一次性分配，局面哈希对容量取模定位槽位。每个条目记录
+    完整哈希（校验冲突）、搜索深度、分值、界标记和最佳动作：
+        - EXACT: 分值为精确值
+        - LOWER: 发生beta截断，真实值 >= 分值
+        - UPPER: 所有动作都未超过alpha，真实值 <= 分值
+    替换策略：空槽、同一局面、旧搜索留下的条目，或新条目深度不低于旧条目时覆盖。
+    """
+    
+    EXACT = 0
+    LOWER = 1
+    UPPER = 2
+    
+    def __init__(self, capacity: int = 1 << 16):
+        """
+        初始化置换表
+        
+        Args:
+            capacity: 槽位数
+        """
+        self.capacity = capacity
+        self._keys = [None] * capacity
+        self._depths = [0] * capacity
+        self._values = [0.0] * capacity
+        self._flags = [0] * capacity
+        self._moves = [None] * capacity
+        self._ages = [0] * capacity
+        self._age = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.overwrites = 0
+    
+    def new_search(self):
+        """开始新一轮搜索：旧条目保留可用，但会被优先替换"""
+        self._age += 1
+    
+    def probe(self, key: int) -> Optional[Tuple[int, int, float, Any]]:
+        """
+        查询局面
+        
+        Args:
+            key: 局面哈希
+        
+        Returns:
+            (深度, 界标记, 分值, 最佳动作)，未命中时为None
+        """
+        slot = key % self.capacity
+        if self._keys[slot] != key:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._depths[slot], self._flags[slot], self._values[slot], self._moves[slot]
+    
+    def store(self, key: int, depth: int, flag: int, value: float, move: Any = None):
+        """
+        保存搜索结果
+        
+        Args:
+            key: 局面哈希
+            depth: 剩余搜索深度
+            flag: 界标记（EXACT/LOWER/UPPER）
+            value: 分值
+            move: 最佳动作
+        """
+        slot = key % self.capacity
+        stored_key = self._keys[slot]
+        if stored_key is not None and stored_key != key:
+            if self._ages[slot] == self._age and depth < self._depths[slot]:
+                return  # 保留本轮搜索中更深的结果
+            self.overwrites += 1
+        elif stored_key == key and move is None:
+            move = self._moves[slot]  # 没有新的最佳动作时保留原来的
+        
+        self._keys[slot] = key
+        self._depths[slot] = depth
+        self._flags[slot] = flag
+        self._values[slot] = value
+        self._moves[slot] = move
+        self._ages[slot] = self._age
+        self.stores += 1
+    
+    def clear(self):
+        """清空所有条目（统计保留）"""
+        self._keys = [None] * self.capacity
+        self._moves = [None] * self.capacity
+    
+    def __len__(self) -> int:
+        return self.capacity - self._keys.count(None)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """获取命中率、占用和覆盖统计"""
+        probes = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / probes if probes else 0.0,
+            'size': len(self),
+            'capacity': self.capacity,
+            'stores': self.stores,
+            'overwrites': self.overwrites
+        }